@@ -0,0 +1,231 @@
+from django.conf import settings
+from django.db.models import Model, QuerySet
+from django.db.models.functions import Collate, Lower
+from django.db.models.signals import post_delete, post_save
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+import threading
+import time
+
+CACHE_SIZE: int = getattr(settings, 'AUTOCOMPLETE_CACHE_SIZE', 1024)
+CACHE_TIMEOUT: float = getattr(settings, 'AUTOCOMPLETE_CACHE_TIMEOUT', 30)
+
+
+class PrefixCache:
+    """
+    Least recently used cache of autocomplete results, held in process
+    memory with a timeout. Hot prefixes are answered without a database
+    or cache server round trip; entries written by other processes are
+    picked up once they expire.
+    """
+
+    def __init__(
+        self,
+        size: int = CACHE_SIZE,
+        timeout: float = CACHE_TIMEOUT
+    ):
+        self.size = size
+        self.timeout = timeout
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value, marking it as recently used.
+
+        Args:
+            key: Key of the value
+
+        Returns:
+            Any: Cached value, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Cache a value, evicting the least recently used one when full.
+
+        Args:
+            key: Key of the value
+            value: Value to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every cached value."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Prefix caches, by model label
+_caches: Dict[str, PrefixCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_prefix_cache(model: type[Model], field: str) -> PrefixCache:
+    """
+    Get the prefix cache of a model's autocompleted field.
+    Created on first use, along with the receivers clearing it when
+    the model's rows change, so other models keep their fast deletes.
+
+    Args:
+        model: Autocompleted model
+        field: Autocompleted field
+
+    Returns:
+        PrefixCache: Cache shared by every view of the model
+    """
+    label = model._meta.label
+
+    with _caches_lock:
+        if label not in _caches:
+            prefix_cache = PrefixCache()
+
+            def clear(sender, update_fields=None, **kwargs):
+                if update_fields is None or field in update_fields:
+                    prefix_cache.clear()
+
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    clear,
+                    sender=model,
+                    weak=False,
+                    dispatch_uid=f'autocomplete:{label}'
+                )
+
+            _caches[label] = prefix_cache
+
+    return _caches[label]
+
+
+class AutocompleteMixin:
+    """
+    Mixin adding an `autocomplete` list action to a ViewSet.
+    Suggests the objects whose field starts with the `q` prefix,
+    case-insensitively and in alphabetical order, so the top matches
+    are read straight from an index on the lowercased field.
+    """
+    queryset: QuerySet
+    autocomplete_field: str
+    autocomplete_columns: Sequence[str]
+    autocomplete_limit = 10
+    max_autocomplete_limit = 50
+    max_autocomplete_length = 50
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request: Request) -> Response:
+        """
+        Suggest objects matching a prefix.
+
+        Args:
+            request: Request object with the `q` prefix
+                and an optional `limit`
+
+        Returns:
+            Response: Matching objects, at most `limit`
+        """
+        prefix = self.get_autocomplete_prefix(request)
+        limit = self.get_autocomplete_limit(request)
+
+        prefix_cache = get_prefix_cache(
+            self.queryset.model,
+            self.autocomplete_field
+        )
+        key = (prefix, limit)
+
+        suggestions = prefix_cache.get(key)
+        if suggestions is None:
+            suggestions = self.get_suggestions(prefix, limit)
+            prefix_cache.set(key, suggestions)
+
+        return Response(suggestions)
+
+    def get_suggestions(self, prefix: str, limit: int) -> List[Dict]:
+        """
+        Fetch the objects whose field starts with a prefix.
+
+        Args:
+            prefix: Lowercased prefix
+            limit: Maximum number of objects
+
+        Returns:
+            list: Serialized objects, ordered by their lowercased field
+        """
+        rows = self.queryset.model.objects.annotate(
+            autocomplete_key=Collate(Lower(self.autocomplete_field), 'C')
+        ).filter(
+            autocomplete_key__startswith=prefix
+        ).order_by(
+            'autocomplete_key'
+        ).values(*self.autocomplete_columns)[:limit]
+
+        return [{**row, 'id': str(row['id'])} for row in rows]
+
+    def get_autocomplete_prefix(self, request: Request) -> str:
+        """
+        Get the prefix given by the `q` query parameter.
+
+        Args:
+            request: Request object with the `q` prefix
+
+        Returns:
+            str: Lowercased prefix
+
+        Raises:
+            ValidationError: If the prefix is missing or too long
+        """
+        prefix = request.query_params.get('q', '').strip().lower()
+
+        if not prefix:
+            raise ValidationError({'q': 'A prefix is required.'})
+
+        if len(prefix) > self.max_autocomplete_length:
+            raise ValidationError({
+                'q': f'At most {self.max_autocomplete_length} characters '
+                     'can be completed.'
+            })
+
+        return prefix
+
+    def get_autocomplete_limit(self, request: Request) -> int:
+        """
+        Get the number of suggestions requested through `limit`,
+        within bounds.
+
+        Args:
+            request: Request object with an optional `limit`
+
+        Returns:
+            int: Number of suggestions
+        """
+        try:
+            limit = int(request.query_params['limit'])
+        except (KeyError, ValueError):
+            return self.autocomplete_limit
+
+        if limit <= 0:
+            return self.autocomplete_limit
+
+        return min(limit, self.max_autocomplete_limit)
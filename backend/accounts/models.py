@@ -92,3 +92,5 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         ordering = ['-created_at']
         db_table = 'users'
+        # Case-insensitive prefix index created by migration 0002,
+        # on PostgreSQL only
@@ -0,0 +1,54 @@
+from django.contrib.auth.models import Group
+from django.db.models.signals import post_delete
+from django.test import SimpleTestCase
+from accounts.autocomplete import PrefixCache, get_prefix_cache
+from accounts.models import User
+from unittest.mock import patch
+
+
+class PrefixCacheTests(SimpleTestCase):
+    """Test suite for the in-process prefix cache."""
+
+    def test_get_missing_value(self):
+        """Test missing keys are not found."""
+        self.assertIsNone(PrefixCache().get('missing'))
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used value is evicted when full."""
+        prefix_cache = PrefixCache(size=2)
+        prefix_cache.set('a', 1)
+        prefix_cache.set('b', 2)
+        prefix_cache.get('a')
+        prefix_cache.set('c', 3)
+
+        self.assertEqual(prefix_cache.get('a'), 1)
+        self.assertIsNone(prefix_cache.get('b'))
+        self.assertEqual(prefix_cache.get('c'), 3)
+
+    @patch('accounts.autocomplete.time.monotonic')
+    def test_expires_values(self, monotonic):
+        """Test values expire after the timeout."""
+        monotonic.return_value = 100
+        prefix_cache = PrefixCache(timeout=30)
+        prefix_cache.set('a', 1)
+
+        monotonic.return_value = 129
+        self.assertEqual(prefix_cache.get('a'), 1)
+
+        monotonic.return_value = 130
+        self.assertIsNone(prefix_cache.get('a'))
+
+    def test_clear(self):
+        """Test clearing removes every value."""
+        prefix_cache = PrefixCache()
+        prefix_cache.set('a', 1)
+        prefix_cache.clear()
+
+        self.assertIsNone(prefix_cache.get('a'))
+
+    def test_receivers_limited_to_model(self):
+        """Test only the autocompleted model gets cache receivers."""
+        get_prefix_cache(User, 'username')
+
+        self.assertTrue(post_delete.has_listeners(User))
+        self.assertFalse(post_delete.has_listeners(Group))
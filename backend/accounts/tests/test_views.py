@@ -140,3 +140,68 @@ class UserDetailViewTests(APITestSetup):
             User.objects.get(pk=self.user1.pk).username,
             'newname'
         )
+
+
+class UserAutocompleteViewTests(APITestSetup):
+    """Test suite for username autocompletion."""
+
+    def setUp(self):
+        super().setUp()
+        self.autocomplete_url = reverse('user-autocomplete')
+        for username in ('Alice', 'alfred', 'albert_2', 'bob'):
+            User.objects.create_user(
+                username=username,
+                email=f'{username}@example.com',
+                password='TestPass123!'
+            )
+
+    def get_usernames(self, response):
+        """Get the suggested usernames of a response."""
+        return [user['username'] for user in response.data]
+
+    def test_autocomplete_usernames(self):
+        """Test usernames are suggested by prefix, alphabetically."""
+        response = self.client.get(self.autocomplete_url, {'q': 'AL'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.get_usernames(response),
+            ['albert_2', 'alfred', 'Alice']
+        )
+        self.assertEqual(set(response.data[0]), {'id', 'username'})
+
+    def test_autocomplete_limit(self):
+        """Test the number of suggestions can be limited."""
+        response = self.client.get(
+            self.autocomplete_url,
+            {'q': 'al', 'limit': 1}
+        )
+        self.assertEqual(self.get_usernames(response), ['albert_2'])
+
+    def test_autocomplete_matches_literally(self):
+        """Test pattern characters in prefixes are matched literally."""
+        response = self.client.get(self.autocomplete_url, {'q': 'albert_'})
+        self.assertEqual(self.get_usernames(response), ['albert_2'])
+
+        response = self.client.get(self.autocomplete_url, {'q': '%'})
+        self.assertEqual(response.data, [])
+
+    def test_autocomplete_cached(self):
+        """Test hot prefixes are served from memory until users change."""
+        self.client.get(self.autocomplete_url, {'q': 'b'})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.autocomplete_url, {'q': 'b'})
+        self.assertEqual(self.get_usernames(response), ['bob'])
+
+        User.objects.create_user(
+            username='bella',
+            email='bella@example.com',
+            password='TestPass123!'
+        )
+        response = self.client.get(self.autocomplete_url, {'q': 'b'})
+        self.assertEqual(self.get_usernames(response), ['bella', 'bob'])
+
+    def test_autocomplete_without_prefix(self):
+        """Test autocompletion requires a prefix."""
+        response = self.client.get(self.autocomplete_url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -5,19 +5,23 @@ from rest_framework import views, viewsets, permissions, status
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.response import Response
 from rest_framework.request import Request
+from .autocomplete import AutocompleteMixin
 from .permissions import IsSelfOrReadOnly
 from .models import User
 from .serializers import UserSerializer, UserLoginSerializer
 from .emails.email_service import send_welcome_email
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(AutocompleteMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing User objects.
-    Provides CRUD operations with owner-based permissions.
+    Provides CRUD operations with owner-based permissions,
+    and username suggestions through `autocomplete`.
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    autocomplete_field = 'username'
+    autocomplete_columns = ('id', 'username')
     authentication_classes = (TokenAuthentication,)
     permission_classes = [IsSelfOrReadOnly]
 
@@ -94,6 +94,35 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': env(
+            'CACHE_BACKEND',
+            cast=str,
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': env('CACHE_LOCATION', cast=str, default='loop'),
+    }
+}
+POSTS_CACHE_TIMEOUT: int = env('POSTS_CACHE_TIMEOUT', cast=int, default=60)
+POSTS_VOTE_BUFFER: bool = env('POSTS_VOTE_BUFFER', cast=bool, default=False)
+POSTS_VOTE_BUFFER_INTERVAL: float = env(
+    'POSTS_VOTE_BUFFER_INTERVAL',
+    cast=float,
+    default=0.25
+)
+POSTS_IMAGE_VARIANT_WIDTHS: list[int] = env(
+    'POSTS_IMAGE_VARIANT_WIDTHS',
+    cast=Csv(cast=int),
+    default=[320, 640, 1280]
+)
+POSTS_IMAGE_WORKERS: int = env('POSTS_IMAGE_WORKERS', cast=int, default=2)
+AUTOCOMPLETE_CACHE_TIMEOUT: int = env(
+    'AUTOCOMPLETE_CACHE_TIMEOUT',
+    cast=int,
+    default=30
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -160,6 +189,42 @@ STATIC_URL = 'static/'
 
 MEDIA_URL = 'http://localhost:8001/media/'
 DEFAULT_FILE_STORAGE = 'posts.storage.NginxStorage'
+MEDIA_STORAGE_POOL_SIZE: int = env(
+    'MEDIA_STORAGE_POOL_SIZE',
+    cast=int,
+    default=10
+)
+MEDIA_STORAGE_CHUNK_SIZE: int = env(
+    'MEDIA_STORAGE_CHUNK_SIZE',
+    cast=int,
+    default=64 * 1024
+)
+MEDIA_STORAGE_CONNECT_TIMEOUT: float = env(
+    'MEDIA_STORAGE_CONNECT_TIMEOUT',
+    cast=float,
+    default=3.05
+)
+MEDIA_STORAGE_READ_TIMEOUT: float = env(
+    'MEDIA_STORAGE_READ_TIMEOUT',
+    cast=float,
+    default=30.0
+)
+MEDIA_STORAGE_RETRIES: int = env('MEDIA_STORAGE_RETRIES', cast=int, default=2)
+MEDIA_STORAGE_RETRY_BACKOFF: float = env(
+    'MEDIA_STORAGE_RETRY_BACKOFF',
+    cast=float,
+    default=0.1
+)
+MEDIA_STORAGE_BREAKER_THRESHOLD: int = env(
+    'MEDIA_STORAGE_BREAKER_THRESHOLD',
+    cast=int,
+    default=5
+)
+MEDIA_STORAGE_BREAKER_RESET_TIMEOUT: float = env(
+    'MEDIA_STORAGE_BREAKER_RESET_TIMEOUT',
+    cast=float,
+    default=30.0
+)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -0,0 +1,225 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from uuid import UUID
+import hashlib
+import time
+
+FEED_VERSION_KEY = 'posts:feed:version'
+RANKING_VERSION_KEY = 'posts:ranking:version'
+POST_VERSION_KEY = 'posts:post:{post_id}:version'
+LIST_KEY = 'posts:list:{version}:{digest}'
+DETAIL_KEY = 'posts:detail:{version}:{post_id}:{post_version}'
+LOCK_KEY = '{key}:lock'
+
+CACHE_TIMEOUT: int = getattr(settings, 'POSTS_CACHE_TIMEOUT', 60)
+LOCK_TIMEOUT: int = getattr(settings, 'POSTS_CACHE_LOCK_TIMEOUT', 10)
+LOCK_WAIT: float = getattr(settings, 'POSTS_CACHE_LOCK_WAIT', 2.0)
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _new_version() -> int:
+    """
+    Build a version for a key missing from the cache.
+    Time based, so a version evicted and created again never
+    matches entries cached under its previous values.
+
+    Returns:
+        int: New version
+    """
+    return time.time_ns()
+
+
+def _post_version_key(post_id: Any) -> str:
+    """Build the version key of a post."""
+    return POST_VERSION_KEY.format(post_id=post_id)
+
+
+def _get_version(key: str) -> int:
+    """Get a global version, creating it if it is missing."""
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def get_feed_version() -> int:
+    """
+    Get the global version shared by every cached post payload.
+
+    Returns:
+        int: Current feed version
+    """
+    return _get_version(FEED_VERSION_KEY)
+
+
+def get_ranking_version() -> int:
+    """
+    Get the global version of the post ranking scores, checked by
+    cached pages of the feeds ordered by them.
+
+    Returns:
+        int: Current ranking version
+    """
+    return _get_version(RANKING_VERSION_KEY)
+
+
+def get_post_versions(post_ids: Iterable[Any]) -> Dict[str, int]:
+    """
+    Get the versions of the given posts, creating missing ones.
+
+    Args:
+        post_ids: IDs of the posts
+
+    Returns:
+        dict: Version of each post, by post ID
+    """
+    keys = {_post_version_key(post_id): str(post_id) for post_id in post_ids}
+    versions = cache.get_many(keys)
+
+    missing = set(keys) - set(versions)
+    if missing:
+        for key in missing:
+            cache.add(key, _new_version(), timeout=None)
+        versions.update(cache.get_many(missing))
+
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def _bump(key: str) -> None:
+    """Bump a version, recreating it if it was evicted."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), timeout=None)
+
+
+def _bump_versions(post_ids: List[str], feed: bool, ranking: bool) -> None:
+    """
+    Bump the versions of the given posts and, optionally, the feed
+    and ranking versions.
+    """
+    for post_id in post_ids:
+        _bump(_post_version_key(post_id))
+
+    if feed:
+        _bump(FEED_VERSION_KEY)
+
+    if ranking:
+        _bump(RANKING_VERSION_KEY)
+
+
+def invalidate(
+    post_ids: Iterable[Any] = (),
+    feed: bool = False,
+    ranking: bool = False
+) -> None:
+    """
+    Invalidate the cached payloads of the given posts and, optionally,
+    every cached payload or the cached pages of ranked feeds.
+
+    Versions are bumped right away and once more after the current
+    transaction commits, so payloads rebuilt from uncommitted state
+    by concurrent readers are not served afterwards.
+
+    Args:
+        post_ids: IDs of the changed posts
+        feed: Whether feed membership, ordering or shared data changed
+        ranking: Whether ranking scores changed
+    """
+    post_ids = [str(post_id) for post_id in post_ids]
+
+    _bump_versions(post_ids, feed, ranking)
+    transaction.on_commit(lambda: _bump_versions(post_ids, feed, ranking))
+
+
+def get_or_build(
+    key: str,
+    build: Callable[[], Any],
+    is_fresh: Optional[Callable[[Any], bool]] = None,
+    timeout: int = CACHE_TIMEOUT
+) -> Any:
+    """
+    Get a cached value, building it on a miss.
+
+    Only one caller rebuilds a missing or stale value at a time: the
+    others serve the stale value if there is one, or wait for the
+    rebuild before falling back to building it themselves.
+
+    Args:
+        key: Cache key of the value
+        build: Callable building the value
+        is_fresh: Callable telling whether a cached value is still valid
+        timeout: Seconds the value is kept
+
+    Returns:
+        Any: Cached or built value
+    """
+    def fresh(value: Any) -> bool:
+        return value is not None and (is_fresh is None or is_fresh(value))
+
+    value = cache.get(key)
+    if fresh(value):
+        return value
+
+    lock_key = LOCK_KEY.format(key=key)
+    locked = cache.add(lock_key, 1, timeout=LOCK_TIMEOUT)
+
+    if not locked:
+        if value is not None:
+            return value
+
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+
+            value = cache.get(key)
+            if fresh(value):
+                return value
+
+    try:
+        value = build()
+        cache.set(key, value, timeout=timeout)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+
+    return value
+
+
+def list_key(digest_source: str) -> str:
+    """
+    Build the cache key of a post list payload.
+
+    Args:
+        digest_source: String identifying the listed page
+
+    Returns:
+        str: Cache key under the current feed version
+    """
+    digest = hashlib.sha256(digest_source.encode()).hexdigest()
+
+    return LIST_KEY.format(version=get_feed_version(), digest=digest)
+
+
+def detail_key(post_id: UUID) -> str:
+    """
+    Build the cache key of a post detail payload.
+
+    Args:
+        post_id: ID of the post
+
+    Returns:
+        str: Cache key under the current feed and post versions
+    """
+    post_version = get_post_versions([post_id])[str(post_id)]
+
+    return DETAIL_KEY.format(
+        version=get_feed_version(),
+        post_id=post_id,
+        post_version=post_version
+    )
@@ -0,0 +1,310 @@
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.db import close_old_connections, connection, transaction
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    TypedDict,
+    cast,
+)
+from . import cache
+import io
+import logging
+import os
+import threading
+
+if TYPE_CHECKING:
+    from .models import ImageModel
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS: Sequence[int] = getattr(
+    settings,
+    'POSTS_IMAGE_VARIANT_WIDTHS',
+    (320, 640, 1280)
+)
+WEBP_QUALITY: int = getattr(settings, 'POSTS_IMAGE_WEBP_QUALITY', 80)
+WORKERS: int = getattr(settings, 'POSTS_IMAGE_WORKERS', 2)
+
+# Formats variants are stored in besides WebP, by original format
+ORIGINAL_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+
+
+class ImageMetadata(TypedDict):
+    width: int
+    height: int
+    size: int
+    # Stored variant names, by format and width
+    variants: Dict[str, Dict[str, str]]
+
+
+def get_variant_name(name: str, width: int, extension: str) -> str:
+    """
+    Get the name of an image variant, next to the original image.
+
+    Args:
+        name: Name/path of the original image
+        width: Width of the variant
+        extension: File extension of the variant format
+
+    Returns:
+        str: Name/path of the variant
+    """
+    root, _ = os.path.splitext(name)
+
+    return f'{root}_{width}.{extension}'
+
+
+def get_image_names(
+    name: str,
+    variants: Dict[str, Dict[str, str]]
+) -> List[str]:
+    """
+    Get the names of an image and of its stored variants.
+
+    Args:
+        name: Name/path of the original image
+        variants: Stored variant names, by format and width
+
+    Returns:
+        List[str]: Names/paths of the image files
+    """
+    return [name] + [
+        variant
+        for names in variants.values()
+        for variant in names.values()
+    ]
+
+
+def encode_image(image: Image.Image, image_format: str) -> bytes:
+    """
+    Encode an image, converting its mode when the format requires it.
+
+    Args:
+        image: Image to encode
+        image_format: Pillow format name
+
+    Returns:
+        bytes: Encoded image
+    """
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA', 'L'):
+        image = image.convert('RGBA')
+
+    options = {'quality': WEBP_QUALITY} if image_format == 'WEBP' else {}
+    content = io.BytesIO()
+    image.save(content, format=image_format, **options)
+
+    return content.getvalue()
+
+
+def store_variants(
+    storage: Storage,
+    name: str,
+    image: Image.Image,
+    original_format: Optional[str]
+) -> Dict[str, Dict[str, str]]:
+    """
+    Store the resized variants of an image next to it.
+
+    Variants are only built for the widths smaller than the image, in
+    WebP and in the original format when Pillow can write it, keeping
+    the aspect ratio.
+
+    Args:
+        storage: Storage holding the image
+        name: Name/path of the original image
+        image: Decoded original image
+        original_format: Pillow format name of the original image
+
+    Returns:
+        dict: Stored variant names, by lowercased format and width
+    """
+    formats = {'WEBP': 'webp'}
+    if original_format in ORIGINAL_FORMATS:
+        formats[original_format] = ORIGINAL_FORMATS[original_format]
+
+    variants: Dict[str, Dict[str, str]] = {}
+    for width in sorted(VARIANT_WIDTHS):
+        if width >= image.width:
+            break
+
+        height = max(round(image.height * width / image.width), 1)
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+
+        for image_format, extension in formats.items():
+            variants.setdefault(image_format.lower(), {})[str(width)] = (
+                storage.save(
+                    get_variant_name(name, width, extension),
+                    ContentFile(encode_image(resized, image_format))
+                )
+            )
+
+    return variants
+
+
+def build_variants(instance: 'ImageModel') -> Optional[ImageMetadata]:
+    """
+    Store the resized variants of a model's image and measure it
+    (see store_variants).
+
+    Args:
+        instance: Post or comment with an image
+
+    Returns:
+        ImageMetadata | None: Dimensions, byte size and variant names
+            of the image, or None if it has none
+    """
+    if not instance.image:
+        return None
+
+    name = instance.image.name
+    storage = instance.image.storage
+
+    with storage.open(name) as file:
+        size = file.size
+        with Image.open(file) as original:
+            original_format = original.format
+            # A transposed copy, never None when not transposing in place
+            image = cast(Image.Image, ImageOps.exif_transpose(original))
+
+    return {
+        'width': image.width,
+        'height': image.height,
+        'size': size,
+        'variants': store_variants(storage, name, image, original_format),
+    }
+
+
+def process_image(model: type['ImageModel'], pk: object) -> bool:
+    """
+    Build the variants and metadata of a post or comment image.
+    The metadata is only saved if the image was not replaced meanwhile.
+
+    Args:
+        model: Post or PostComment
+        pk: ID of the post or comment
+
+    Returns:
+        bool: True if the metadata was saved
+    """
+    instance = model._default_manager.filter(pk=pk).first()
+    if instance is None:
+        return False
+
+    metadata = build_variants(instance)
+    if metadata is None:
+        return False
+
+    updated = model._default_manager.filter(
+        pk=pk,
+        image=instance.image.name
+    ).update(
+        image_width=metadata['width'],
+        image_height=metadata['height'],
+        image_size=metadata['size'],
+        image_variants=metadata['variants'],
+    )
+
+    if updated:
+        cache.invalidate([getattr(instance, 'post_id', instance.pk)])
+    else:
+        delete_files(
+            instance.image.storage,
+            get_image_names(instance.image.name, metadata['variants'])[1:]
+        )
+
+    return bool(updated)
+
+
+def run_image_job(model: type['ImageModel'], pk: object) -> None:
+    """
+    Process an image in a worker thread, logging errors instead of
+    raising them, with a database connection of its own.
+
+    Args:
+        model: Post or PostComment
+        pk: ID of the post or comment
+    """
+    close_old_connections()
+    try:
+        process_image(model, pk)
+    except Exception:
+        logger.exception('Error processing image of %s %s', model, pk)
+    finally:
+        connection.close()
+
+
+def delete_files(storage: Storage, names: Sequence[str]) -> None:
+    """
+    Delete files from storage, logging errors instead of raising them.
+
+    Args:
+        storage: Storage holding the files
+        names: Names/paths of the files
+    """
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.exception('Error deleting image file %s', name)
+
+
+# Worker pool shared by the process, created on first use
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Get the worker pool processing images outside requests.
+
+    Returns:
+        ThreadPoolExecutor: Pool of WORKERS threads
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=WORKERS,
+                thread_name_prefix='image-variants'
+            )
+
+    return _executor
+
+
+def schedule_image(instance: 'ImageModel') -> None:
+    """
+    Process the image of a post or comment in the worker pool, once
+    the current transaction commits.
+
+    Args:
+        instance: Saved post or comment with a new image
+    """
+    model, pk = type(instance), instance.pk
+
+    transaction.on_commit(
+        lambda: get_executor().submit(run_image_job, model, pk)
+    )
+
+
+def schedule_delete(storage: Storage, names: Sequence[str]) -> None:
+    """
+    Delete files from storage in the worker pool, once the current
+    transaction commits, so a rolled back save keeps its files.
+
+    Args:
+        storage: Storage holding the files
+        names: Names/paths of the files
+    """
+    transaction.on_commit(
+        lambda: get_executor().submit(delete_files, storage, names)
+    )
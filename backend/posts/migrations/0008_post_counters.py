@@ -0,0 +1,62 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:52
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_rows(model, **filters):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**filters)
+            .order_by()
+            .values(*filters)
+            .annotate(count=Count('pk'))
+            .values('count')
+        ),
+        Value(0),
+    )
+
+
+def populate_post_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostComment = apps.get_model('posts', 'PostComment')
+
+    Post.objects.update(
+        upvote_count=count_rows(
+            Post.upvoted_by.through, post_id=OuterRef('pk')
+        ),
+        downvote_count=count_rows(
+            Post.downvoted_by.through, post_id=OuterRef('pk')
+        ),
+        comment_count=count_rows(PostComment, post_id=OuterRef('pk')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_post_created_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='downvote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='upvote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            populate_post_counters,
+            migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:58
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+UPVOTE = 1
+DOWNVOTE = -1
+BATCH_SIZE = 1000
+
+
+def copy_votes(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Vote = apps.get_model('posts', 'Vote')
+
+    # Upvotes go first so the unique constraint keeps them if a user
+    # somehow ended up in both tables.
+    for through, value in (
+        (Post.upvoted_by.through, UPVOTE),
+        (Post.downvoted_by.through, DOWNVOTE),
+    ):
+        rows = through.objects.values_list('user_id', 'post_id')
+        batch = []
+
+        for user_id, post_id in rows.iterator(chunk_size=BATCH_SIZE):
+            batch.append(Vote(user_id=user_id, post_id=post_id, value=value))
+
+            if len(batch) >= BATCH_SIZE:
+                Vote.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+
+        Vote.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def restore_votes(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Vote = apps.get_model('posts', 'Vote')
+
+    for through, value in (
+        (Post.upvoted_by.through, UPVOTE),
+        (Post.downvoted_by.through, DOWNVOTE),
+    ):
+        rows = Vote.objects.filter(value=value).values_list(
+            'user_id',
+            'post_id'
+        )
+        through.objects.bulk_create(
+            (
+                through(user_id=user_id, post_id=post_id)
+                for user_id, post_id in rows.iterator(chunk_size=BATCH_SIZE)
+            ),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_post_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Vote',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('value', models.SmallIntegerField(choices=[(1, 'Upvote'), (-1, 'Downvote')])),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='posts.post')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'votes',
+                'constraints': [models.UniqueConstraint(fields=('user', 'post'), name='votes_user_post_unique'), models.CheckConstraint(condition=models.Q(('value__in', [1, -1])), name='votes_value_valid')],
+            },
+        ),
+        migrations.RunPython(copy_votes, restore_votes),
+        migrations.RemoveField(
+            model_name='post',
+            name='downvoted_by',
+        ),
+        migrations.RemoveField(
+            model_name='post',
+            name='upvoted_by',
+        ),
+    ]
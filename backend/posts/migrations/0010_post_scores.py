@@ -0,0 +1,49 @@
+# Generated by Django 5.1.2 on 2026-10-18 18:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+POPULATE_SCORES_SQL = """
+    UPDATE posts SET
+        top_score = upvote_count - downvote_count,
+        hot_score = SIGN(upvote_count - downvote_count)
+            * LOG(10, GREATEST(ABS(upvote_count - downvote_count), 1))
+            + (EXTRACT(EPOCH FROM created_at) - 1704067200) / 45000
+"""
+
+
+def populate_scores(apps, schema_editor):
+    # Scores are computed with PostgreSQL functions, so existing posts
+    # of other databases keep the default ones
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POPULATE_SCORES_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_vote'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='top_score',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_scores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-hot_score', '-id'], name='posts_hot_score_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-top_score', '-id'], name='posts_top_score_id_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.1.2 on 2026-10-18 18:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+POPULATE_POST_CREATED_AT_SQL = """
+    UPDATE posts_topics SET post_created_at = (
+        SELECT created_at FROM posts
+        WHERE posts.id = posts_topics.post_id
+    )
+"""
+
+POPULATE_POST_COUNT_SQL = """
+    UPDATE topics SET post_count = (
+        SELECT COUNT(*) FROM posts_topics
+        WHERE posts_topics.topic_id = topics.id
+    )
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_scores'),
+    ]
+
+    operations = [
+        # Adopt the auto-created posts_topics table as an explicit model
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='PostTopic',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_topics', to='posts.post')),
+                        ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_topics', to='posts.topic')),
+                    ],
+                    options={
+                        'db_table': 'posts_topics',
+                        'unique_together': {('post', 'topic')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='post',
+                    name='topics',
+                    field=models.ManyToManyField(through='posts.PostTopic', to='posts.topic'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='posttopic',
+            name='post_created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunSQL(POPULATE_POST_CREATED_AT_SQL, migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name='posttopic',
+            name='post',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='post_topics', to='posts.post'),
+        ),
+        migrations.AlterField(
+            model_name='posttopic',
+            name='topic',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='post_topics', to='posts.topic'),
+        ),
+        migrations.AddIndex(
+            model_name='posttopic',
+            index=models.Index(fields=['topic', '-post_created_at', '-post'], name='posts_topics_feed_idx'),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(POPULATE_POST_COUNT_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.1.2 on 2026-10-18 18:56
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRESQL_INSTALL_SQL = [
+    """
+    CREATE TRIGGER posts_search_vector_update
+    BEFORE INSERT OR UPDATE OF content ON posts
+    FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger(
+        search_vector, 'pg_catalog.english', content
+    )
+    """,
+    """
+    UPDATE posts SET search_vector = to_tsvector('pg_catalog.english', content)
+    """,
+    """
+    CREATE INDEX posts_search_vector_idx ON posts USING gin (search_vector)
+    """,
+]
+
+POSTGRESQL_REMOVE_SQL = [
+    'DROP INDEX IF EXISTS posts_search_vector_idx',
+    'DROP TRIGGER IF EXISTS posts_search_vector_update ON posts',
+]
+
+# External content FTS5 table over posts, keyed by the posts rowid
+SQLITE_INSTALL_SQL = [
+    """
+    CREATE VIRTUAL TABLE posts_search USING fts5(
+        content, content='posts', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER posts_search_insert AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_search (rowid, content)
+        VALUES (new.rowid, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_search_delete AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_search (posts_search, rowid, content)
+        VALUES ('delete', old.rowid, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_search_update AFTER UPDATE OF content ON posts BEGIN
+        INSERT INTO posts_search (posts_search, rowid, content)
+        VALUES ('delete', old.rowid, old.content);
+        INSERT INTO posts_search (rowid, content)
+        VALUES (new.rowid, new.content);
+    END
+    """,
+    "INSERT INTO posts_search (posts_search) VALUES ('rebuild')",
+]
+
+SQLITE_REMOVE_SQL = [
+    'DROP TRIGGER IF EXISTS posts_search_insert',
+    'DROP TRIGGER IF EXISTS posts_search_delete',
+    'DROP TRIGGER IF EXISTS posts_search_update',
+    'DROP TABLE IF EXISTS posts_search',
+]
+
+
+def run_vendor_sql(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def install_search_index(apps, schema_editor):
+    run_vendor_sql(schema_editor, {
+        'postgresql': POSTGRESQL_INSTALL_SQL,
+        'sqlite': SQLITE_INSTALL_SQL,
+    })
+
+
+def remove_search_index(apps, schema_editor):
+    run_vendor_sql(schema_editor, {
+        'postgresql': POSTGRESQL_REMOVE_SQL,
+        'sqlite': SQLITE_REMOVE_SQL,
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_posttopic_topic_post_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(install_search_index, remove_search_index),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.2 on 2026-10-18 19:03
+
+from django.db import migrations
+
+# Serves case-insensitive prefix lookups in index order, compared
+# bytewise through the "C" collation built into PostgreSQL
+POSTGRESQL_INSTALL_SQL = """
+    CREATE INDEX topics_name_prefix_idx ON topics ((lower(name) COLLATE "C"))
+"""
+
+POSTGRESQL_REMOVE_SQL = 'DROP INDEX IF EXISTS topics_name_prefix_idx'
+
+
+def add_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRESQL_INSTALL_SQL)
+
+
+def remove_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRESQL_REMOVE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_prefix_index, remove_prefix_index),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.1.2 on 2026-10-18 19:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# Existing comments are top-level, so their path is their own segment:
+# creation time in zero-padded microseconds, then 8 hex digits of the ID
+POSTGRESQL_POPULATE_SQL = """
+    UPDATE post_comments SET path = lpad(
+        (EXTRACT(EPOCH FROM created_at) * 1000000)::bigint::text, 16, '0'
+    ) || left(replace(id::text, '-', ''), 8)
+"""
+
+SQLITE_POPULATE_SQL = """
+    UPDATE post_comments SET path = printf(
+        '%016d',
+        CAST(strftime('%s', created_at) AS INTEGER) * 1000000 +
+        CAST(substr(created_at || '.000000', 21, 6) AS INTEGER)
+    ) || substr(id, 1, 8)
+"""
+
+
+def populate_paths(apps, schema_editor):
+    statement = {
+        'postgresql': POSTGRESQL_POPULATE_SQL,
+        'sqlite': SQLITE_POPULATE_SQL,
+    }.get(schema_editor.connection.vendor)
+
+    if statement:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_post_comments_listing_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='postcomment',
+            name='post_comments_listing_idx',
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='posts.postcomment'),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='path',
+            field=models.CharField(db_collation='C', default='', editable=False, max_length=250),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='postcomment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='postcomment',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(condition=models.Q(('parent__isnull', True)), fields=['post', '-created_at', '-id'], name='post_comments_listing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['post', 'path'], name='post_comments_thread_idx'),
+        ),
+    ]
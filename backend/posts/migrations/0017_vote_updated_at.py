@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-18 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_postcomment_thread'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        # Existing votes were cast with their current value
+        migrations.RunSQL(
+            'UPDATE votes SET updated_at = created_at',
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.1.2 on 2026-10-18 20:20
+
+from django.db import migrations
+from importlib import import_module
+
+search_vector = import_module('posts.migrations.0012_post_search_vector')
+
+# FTS5 table over post content, keyed by the rows of posts_search_ids
+# rather than by the rowid of posts, which VACUUM may renumber since
+# posts has a UUID primary key
+SQLITE_INSTALL_SQL = [
+    *search_vector.SQLITE_REMOVE_SQL,
+    """
+    CREATE TABLE posts_search_ids (
+        id INTEGER PRIMARY KEY,
+        post_id TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE posts_search USING fts5(
+        content, tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER posts_search_insert AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_search_ids (post_id) VALUES (new.id);
+        INSERT INTO posts_search (rowid, content)
+        VALUES (last_insert_rowid(), new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_search_delete AFTER DELETE ON posts BEGIN
+        DELETE FROM posts_search WHERE rowid = (
+            SELECT id FROM posts_search_ids WHERE post_id = old.id
+        );
+        DELETE FROM posts_search_ids WHERE post_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER posts_search_update AFTER UPDATE OF content ON posts BEGIN
+        UPDATE posts_search SET content = new.content WHERE rowid = (
+            SELECT id FROM posts_search_ids WHERE post_id = new.id
+        );
+    END
+    """,
+    "INSERT INTO posts_search_ids (post_id) SELECT id FROM posts",
+    """
+    INSERT INTO posts_search (rowid, content)
+    SELECT posts_search_ids.id, posts.content
+    FROM posts JOIN posts_search_ids ON posts_search_ids.post_id = posts.id
+    """,
+]
+
+SQLITE_REMOVE_SQL = [
+    'DROP TRIGGER IF EXISTS posts_search_insert',
+    'DROP TRIGGER IF EXISTS posts_search_delete',
+    'DROP TRIGGER IF EXISTS posts_search_update',
+    'DROP TABLE IF EXISTS posts_search',
+    'DROP TABLE IF EXISTS posts_search_ids',
+    *search_vector.SQLITE_INSTALL_SQL,
+]
+
+
+def install_search_ids(apps, schema_editor):
+    search_vector.run_vendor_sql(schema_editor, {
+        'sqlite': SQLITE_INSTALL_SQL,
+    })
+
+
+def remove_search_ids(apps, schema_editor):
+    search_vector.run_vendor_sql(schema_editor, {
+        'sqlite': SQLITE_REMOVE_SQL,
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_image_metadata'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_ids, remove_search_ids),
+    ]
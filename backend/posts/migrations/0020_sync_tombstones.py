@@ -0,0 +1,36 @@
+# Generated by Django 5.1.2 on 2026-10-18 20:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_post_search_ids'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='vote',
+            name='votes_value_valid',
+        ),
+        migrations.RemoveIndex(
+            model_name='save',
+            name='posts_saved_by_user_idx',
+        ),
+        migrations.AddField(
+            model_name='save',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='save',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['user', '-saved_at', '-post'], name='posts_saved_by_user_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='vote',
+            constraint=models.CheckConstraint(condition=models.Q(('value__in', [1, -1, 0])), name='votes_value_valid'),
+        ),
+    ]
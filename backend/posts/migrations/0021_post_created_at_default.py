@@ -0,0 +1,26 @@
+# Generated by Django 5.1.2 on 2026-10-18 21:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_sync_tombstones'),
+    ]
+
+    # Defaults are set by Django, so the column is left as is; altering
+    # it would rebuild the posts table and drop its search triggers on
+    # SQLite
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='post',
+                    name='created_at',
+                    field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+                ),
+            ],
+        ),
+    ]
@@ -1,29 +1,37 @@
-from django.db.models import Exists, OuterRef, QuerySet
+from django.db.models import Exists, OuterRef, QuerySet, Subquery, Value
 from rest_framework import viewsets
 from rest_framework.serializers import BaseSerializer
 from rest_framework.request import Request
-from typing import Type, Set
+from rest_framework.response import Response
+from typing import Any, Dict, List, Sequence, Type, Set
+from urllib.parse import urlencode
 from uuid import UUID
+from .models import Vote
+from .serializers import PostReadSerializer
+from .vote_buffer import merge_pending_votes
+from . import cache
 
 
 class PostActionsMixin(viewsets.ModelViewSet):
     """
     Mixin for adding post actions functionality to a ViewSet.
-    Requires the model to have upvoted_by, downvoted_by, and saved_by fields.
+    Requires the model to be referenced by Vote and to have a saved_by field.
     """
     serializer_class: Type[BaseSerializer]
+    read_serializer_class: Type[PostReadSerializer]
     queryset: QuerySet
     request: Request
     select_related_fields: Set[str] = {'user'}
-    prefetch_related_fields: Set[str] = {
-        'comments',
-        'upvoted_by',
-        'downvoted_by'
-    }
+    prefetch_related_fields: Set[str] = set()
+    read_actions: Sequence[str] = ('list', 'retrieve')
+    shared_payload: bool = False
+    saved_marker = 0
 
     def get_queryset(self) -> QuerySet:
         """
         Get optimized queryset with user action annotations.
+        Annotations are left out while building payloads shared between
+        users, whose actions are overlaid afterwards instead.
 
         Returns:
             QuerySet: Queryset with prefetched relations
@@ -32,11 +40,124 @@ class PostActionsMixin(viewsets.ModelViewSet):
         queryset = super().get_queryset()
 
         user = self.request.user
-        if user.is_authenticated and user.id:
+        if user.is_authenticated and user.id and not self.shared_payload:
             queryset = self._annotate_user_actions(queryset, user.id)
 
         return self._optimize_queryset(queryset)
 
+    def overlay_user_actions(
+        self,
+        items: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Merge the requesting user's actions into serialized posts.
+        Votes and saves of the whole page are read in a single query
+        restricted to the listed posts.
+
+        Args:
+            items: Serialized posts, without user actions
+
+        Returns:
+            list: Copies of the posts with the user's actions
+        """
+        user = self.request.user
+        if not (user.is_authenticated and user.id) or not items:
+            return items
+
+        model = self.queryset.model
+        post_ids = [item['id'] for item in items]
+
+        votes = Vote.objects.filter(
+            user_id=user.id,
+            post_id__in=post_ids
+        ).exclude(value=0).values_list('post_id', 'value')
+        saves = model.saved_by.through.objects.filter(
+            user_id=user.id,
+            post_id__in=post_ids,
+            deleted_at__isnull=True
+        ).values_list('post_id', Value(self.saved_marker))
+
+        user_votes = {}
+        saved = set()
+        for post_id, value in votes.union(saves, all=True):
+            if value == self.saved_marker:
+                saved.add(str(post_id))
+            else:
+                user_votes[str(post_id)] = value
+
+        return [
+            {
+                **item,
+                'actions': {
+                    **item['actions'],
+                    'is_upvoted': user_votes.get(item['id']) == Vote.UPVOTE,
+                    'is_downvoted': (
+                        user_votes.get(item['id']) == Vote.DOWNVOTE
+                    ),
+                    'is_saved': item['id'] in saved,
+                },
+            }
+            for item in items
+        ]
+
+    def finalize_response(
+        self,
+        request: Request,
+        response: Response,
+        *args,
+        **kwargs
+    ) -> Response:
+        """
+        Merge the votes still held in the vote buffer into read
+        responses. Done on the final response only, so cached payloads
+        never include them.
+
+        Args:
+            request: Request object
+            response: Response of the action
+
+        Returns:
+            Response: Response with the pending votes counted
+        """
+        data = getattr(response, 'data', None)
+
+        if self.action in self.read_actions and response.status_code == 200:
+            user = request.user
+            user_id = user.pk if user.is_authenticated else None
+
+            if isinstance(data, list):
+                response.data = merge_pending_votes(data, user_id)
+            elif isinstance(data, dict) and 'results' in data:
+                response.data = {
+                    **data,
+                    'results': merge_pending_votes(data['results'], user_id),
+                }
+            elif isinstance(data, dict) and 'actions' in data:
+                response.data = merge_pending_votes([data], user_id)[0]
+
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def get_read_queryset(self, queryset: QuerySet) -> QuerySet:
+        """
+        Fetch posts as flat rows for the read serializer.
+        Relations are joined or loaded by the serializer instead of
+        being prefetched as model instances.
+
+        Args:
+            queryset: Annotated and ordered posts
+
+        Returns:
+            QuerySet: Post rows with their annotations and ordering values
+        """
+        ordering = [field.lstrip('-') for field in queryset.query.order_by]
+        fields = dict.fromkeys([
+            *self.read_serializer_class.columns,
+            *queryset.query.annotations,
+            *ordering,
+        ])
+
+        return queryset.prefetch_related(None).values(*fields)
+
     def _annotate_user_actions(
         self,
         queryset: QuerySet,
@@ -44,6 +165,8 @@ class PostActionsMixin(viewsets.ModelViewSet):
     ) -> QuerySet:
         """
         Add user-specific action annotations to the queryset.
+        The user's vote is annotated as its value (or None) with a single
+        lookup on the unique (user, post) vote index.
 
         Args:
             queryset: Base queryset to annotate
@@ -55,22 +178,17 @@ class PostActionsMixin(viewsets.ModelViewSet):
         model = self.queryset.model
 
         return queryset.annotate(
-            is_upvoted=Exists(
-                model.upvoted_by.through.objects.filter(
-                    post_id=OuterRef('id'),
-                    user_id=user_id
-                )
-            ),
-            is_downvoted=Exists(
-                model.downvoted_by.through.objects.filter(
+            user_vote=Subquery(
+                Vote.objects.filter(
                     post_id=OuterRef('id'),
                     user_id=user_id
-                )
+                ).exclude(value=0).values_list('value')[:1]
             ),
             is_saved=Exists(
                 model.saved_by.through.objects.filter(
                     post_id=OuterRef('id'),
-                    user_id=user_id
+                    user_id=user_id,
+                    deleted_at__isnull=True
                 )
             )
         )
@@ -106,3 +224,139 @@ class PostActionsMixin(viewsets.ModelViewSet):
             return PostActionsSummarySerializer
 
         return super().get_serializer_class()
+
+
+class SharedCacheMixin(PostActionsMixin):
+    """
+    Mixin caching list and retrieve payloads shared by every user.
+    Payloads are built without user actions, which are overlaid per
+    request, and invalidated through the per-post and global versions
+    bumped on writes (see posts.cache). Pages of lists ordered by the
+    ranking scores are also rebuilt once any score changes.
+    """
+
+    def get_cache_source(self) -> str:
+        """
+        Get the string identifying the requested page in cache keys.
+        Includes the host, as pagination links are absolute.
+
+        Returns:
+            str: Absolute path with its query parameters sorted
+        """
+        params = sorted(self.request.query_params.lists())
+
+        return '?'.join([
+            self.request.build_absolute_uri(self.request.path),
+            urlencode(params, doseq=True)
+        ])
+
+    def list(self, request, *args, **kwargs) -> Response:
+        """
+        List objects from the shared cache.
+        Cached pages keep the versions their posts had before the page
+        was read, and are rebuilt once any of them changes.
+
+        Returns:
+            Response: Listed objects with the user's actions
+        """
+        build_list = super().list
+
+        def build() -> Dict[str, Any]:
+            self.shared_payload = True
+            # Read first, so writes committed while the page is built
+            # leave it stale rather than cached under their versions
+            ranking = (
+                cache.get_ranking_version() if self.is_ranked_list()
+                else None
+            )
+            versions = cache.get_post_versions(self.get_page_ids())
+            data = build_list(request, *args, **kwargs).data
+            return {
+                'data': data,
+                'versions': {
+                    item['id']: versions.get(item['id'])
+                    for item in self._get_list_items(data)
+                },
+                'ranking': ranking,
+            }
+
+        def is_fresh(entry: Dict[str, Any]) -> bool:
+            versions = entry['versions']
+            return cache.get_post_versions(versions) == versions and (
+                entry['ranking'] is None
+                or entry['ranking'] == cache.get_ranking_version()
+            )
+
+        data = cache.get_or_build(
+            cache.list_key(self.get_cache_source()),
+            build,
+            is_fresh
+        )['data']
+
+        items = self.overlay_user_actions(self._get_list_items(data))
+        if isinstance(data, dict):
+            return Response({**data, 'results': items})
+
+        return Response(items)
+
+    def is_ranked_list(self) -> bool:
+        """
+        Tell whether the requested list is ordered by ranking scores.
+
+        Returns:
+            bool: False, lists being ordered by stable fields by default
+        """
+        return False
+
+    def get_page_ids(self) -> List[str]:
+        """
+        Get the IDs of the objects on the requested page, reading only
+        their keys and ordering values.
+
+        Returns:
+            list: IDs of the listed objects
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = [field.lstrip('-') for field in queryset.query.order_by]
+        rows = queryset.values('pk', *ordering)
+        page = self.paginate_queryset(rows)
+
+        return [str(row['pk']) for row in (rows if page is None else page)]
+
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        """
+        Retrieve an object from the shared cache.
+
+        Returns:
+            Response: Retrieved object with the user's actions
+        """
+        try:
+            post_id = UUID(str(self.kwargs[self.lookup_field]))
+        except ValueError:
+            return super().retrieve(request, *args, **kwargs)
+
+        build_detail = super().retrieve
+
+        def build() -> Dict[str, Any]:
+            self.shared_payload = True
+            return build_detail(request, *args, **kwargs).data
+
+        data = cache.get_or_build(cache.detail_key(post_id), build)
+
+        return Response(self.overlay_user_actions([data])[0])
+
+    @staticmethod
+    def _get_list_items(data: Any) -> List[Dict[str, Any]]:
+        """
+        Get the listed items of a payload, paginated or not.
+
+        Args:
+            data: List payload
+
+        Returns:
+            list: Serialized items
+        """
+        if isinstance(data, dict):
+            return data['results']
+
+        return data
@@ -1,9 +1,34 @@
-from django.db import models, transaction
-from django.core.exceptions import ValidationError
-from django.db.models.signals import m2m_changed
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+from django.db.models import (
+    Expression,
+    ExpressionWrapper,
+    F,
+    Func,
+    OuterRef,
+    Q,
+    Subquery,
+    Window,
+)
+from django.db.models.functions import (
+    Abs,
+    Greatest,
+    Left,
+    Log,
+    RowNumber,
+    Sign,
+)
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
+from django.utils import timezone
 from accounts.models import User
+from .images import get_image_names, schedule_delete, schedule_image
 from .storage import MediaStorage
+from . import cache
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterable, Optional, Sequence
+import math
 import uuid
 import os
 
@@ -14,12 +39,15 @@ class Topic(models.Model):
     """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=100, unique=True)
+    post_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
         db_table = 'topics'
+        # Case-insensitive prefix index created by migration 0013,
+        # on PostgreSQL only
 
 
 def post_image_path(_, filename: str) -> str:
@@ -39,7 +67,186 @@ def post_image_path(_, filename: str) -> str:
     return os.path.join('posts', filename)
 
 
-class Post(models.Model):
+def count_post_rows(model: type[models.Model], **filters) -> Subquery:
+    """
+    Build a subquery counting the rows of a model for the outer post.
+
+    Args:
+        model: Model with a post_id foreign key column
+        **filters: Additional filters for the counted rows
+
+    Returns:
+        Subquery: Row count expression, 0 when there are no rows
+    """
+    return Subquery(
+        model._default_manager.filter(post_id=OuterRef('pk'), **filters)
+        .order_by()
+        .values_list(
+            Func(F('pk'), function='COUNT', output_field=models.IntegerField())
+        )
+    )
+
+
+# 2024-01-01 UTC, the reference point of post ages in hot scores
+HOT_SCORE_EPOCH = 1704067200
+# Seconds of recency worth one order of magnitude of net votes
+HOT_SCORE_INTERVAL = 45000
+
+
+def build_hot_score(net_votes: Expression) -> ExpressionWrapper:
+    """
+    Build the time-decayed hot score of a post.
+
+    Newer posts start from a higher baseline instead of older posts
+    decaying, so the score only changes when the votes do and the
+    ranking stays consistent between refreshes.
+
+    Args:
+        net_votes: Expression for the post's net votes
+
+    Returns:
+        ExpressionWrapper: Hot score expression
+    """
+    age = Func(
+        F('created_at'),
+        template='EXTRACT(EPOCH FROM %(expressions)s)',
+        output_field=models.FloatField(),
+    )
+
+    return ExpressionWrapper(
+        Sign(net_votes) * Log(10, Greatest(Abs(net_votes), 1)) +
+        (age - HOT_SCORE_EPOCH) / HOT_SCORE_INTERVAL,
+        output_field=models.FloatField(),
+    )
+
+
+def get_hot_score(net_votes: int, created_at: datetime) -> float:
+    """
+    Compute the hot score of a post in Python, as build_hot_score does
+    in the database.
+
+    Args:
+        net_votes: Net votes of the post
+        created_at: Creation date of the post
+
+    Returns:
+        float: Hot score
+    """
+    sign = (net_votes > 0) - (net_votes < 0)
+
+    return (
+        sign * math.log10(max(abs(net_votes), 1)) +
+        (created_at.timestamp() - HOT_SCORE_EPOCH) / HOT_SCORE_INTERVAL
+    )
+
+
+class PostQuerySet(models.QuerySet):
+    """
+    QuerySet for Post model.
+    """
+
+    def refresh_scores(self) -> int:
+        """
+        Recompute the stored ranking scores of the posts in the queryset
+        from their vote counters, invalidating the cached pages of the
+        ranked feeds.
+
+        Returns:
+            int: Number of posts updated
+        """
+        net_votes = F('upvote_count') - F('downvote_count')
+        updated = self.update(
+            top_score=net_votes,
+            hot_score=build_hot_score(net_votes)
+        )
+        # Posts may move into or out of any page of the ranked feeds
+        cache.invalidate(ranking=True)
+
+        return updated
+
+    def rebuild_counters(self) -> int:
+        """
+        Recompute the denormalized vote and comment counters
+        of the posts in the queryset.
+
+        Returns:
+            int: Number of posts updated
+        """
+        return self.update(
+            upvote_count=count_post_rows(Vote, value=Vote.UPVOTE),
+            downvote_count=count_post_rows(Vote, value=Vote.DOWNVOTE),
+            comment_count=count_post_rows(PostComment),
+        )
+
+
+class ImageModel(models.Model):
+    """
+    Abstract model for posts and comments with an optional image.
+    Resized variants, dimensions and byte size of new images are filled
+    in by a worker pool after the save commits (see posts.images).
+    """
+    # Overridden by each model, with its own upload path
+    image = models.ImageField(storage=MediaStorage, blank=True, null=True)
+    image_width = models.PositiveIntegerField(null=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, editable=False)
+    image_size = models.PositiveIntegerField(null=True, editable=False)
+    # Stored variant names, by lowercased format and width
+    image_variants = models.JSONField(default=dict, editable=False)
+
+    class Meta:
+        abstract = True
+
+    # Name of the stored image as last loaded or saved, '' for none,
+    # or None if it was not loaded
+    _stored_image: Optional[str] = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Load a row, recording the name of its stored image."""
+        instance = super().from_db(db, field_names, values)
+        if 'image' in field_names:
+            instance._stored_image = values[field_names.index('image')] or ''
+
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        """Reload the row, recording the name of its stored image."""
+        super().refresh_from_db(using, fields, from_queryset)
+        if fields is None or 'image' in fields:
+            self._stored_image = self.image.name or ''
+
+    def save(self, *args, **kwargs) -> None:
+        """
+        Reset the image metadata when the image changes, and delete
+        the previous image and its variants once the save commits.
+        The previous image is only read back when one was stored.
+        """
+        image_changed = bool(self.image) and not self.image._committed
+        previous = None
+
+        if image_changed or not self.image:
+            self.image_width = self.image_height = self.image_size = None
+            self.image_variants = {}
+
+            if not self._state.adding and self._stored_image != '':
+                previous = type(self)._default_manager.filter(
+                    pk=self.pk
+                ).values_list('image', 'image_variants').first()
+
+        super().save(*args, **kwargs)
+        self._stored_image = self.image.name or ''
+
+        if previous and previous[0]:
+            schedule_delete(
+                self.image.storage,
+                get_image_names(previous[0], previous[1])
+            )
+
+        if image_changed:
+            schedule_image(self)
+
+
+class Post(ImageModel):
     """
     Post model representing user posts.
     Includes relationships for user interactions and content categorization.
@@ -53,45 +260,140 @@ class Post(models.Model):
         blank=True,
         null=True,
     )
-    topics = models.ManyToManyField(Topic)
-    upvoted_by = models.ManyToManyField(
-        User,
-        related_name='upvoted_posts',
-        blank=True
+    topics: 'models.ManyToManyField[Topic, PostTopic]' = (
+        models.ManyToManyField(Topic, through='PostTopic')
     )
-    downvoted_by = models.ManyToManyField(
-        User,
-        related_name='downvoted_posts',
-        blank=True
-    )
-    saved_by = models.ManyToManyField(
+    # Also relates unsaved posts, whose saves are kept as tombstones
+    # (see Save.deleted_at)
+    saved_by: 'models.ManyToManyField[User, Save]' = models.ManyToManyField(
         User,
+        through='Save',
         related_name='saved_posts',
         blank=True
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    upvote_count = models.PositiveIntegerField(default=0, editable=False)
+    downvote_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    top_score = models.IntegerField(default=0, editable=False)
+    hot_score = models.FloatField(default=0, editable=False)
+    # Filled from the content by a database trigger on write, and
+    # GIN-indexed on PostgreSQL (see posts.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Set before the insert, so the initial hot score can be computed
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PostQuerySet.as_manager()
+
+    def save(self, *args, **kwargs) -> None:
+        """
+        Compute the initial ranking scores of a new post,
+        so it is created in a single INSERT.
+        """
+        if self._state.adding:
+            self.top_score = self.votes
+            self.hot_score = get_hot_score(self.votes, self.created_at)
+
+        super().save(*args, **kwargs)
+
     @property
     def votes(self) -> int:
         """
-        Calculate net votes (upvotes - downvotes).
+        Calculate net votes (upvotes - downvotes)
+        from the denormalized counters.
 
         Returns:
             int: Net vote count
         """
-        return self.upvoted_by.count() - self.downvoted_by.count()
+        return self.upvote_count - self.downvote_count
 
     class Meta:
         ordering = ['-created_at']
         db_table = 'posts'
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='posts_created_at_id_idx'
+            ),
+            models.Index(
+                fields=['-hot_score', '-id'],
+                name='posts_hot_score_id_idx'
+            ),
+            models.Index(
+                fields=['-top_score', '-id'],
+                name='posts_top_score_id_idx'
+            ),
+        ]
+
+
+class PostTopic(models.Model):
+    """
+    Through model linking posts to their topics.
+    Carries the post creation date so topic feeds can be read
+    in order from a single (topic, post_created_at) index range.
+    """
+    # Lookups by post are served by the (post, topic) unique index
+    post = models.ForeignKey(
+        Post,
+        related_name='post_topics',
+        on_delete=models.CASCADE,
+        db_index=False
+    )
+    # Lookups by topic are served by the topic feed index
+    topic = models.ForeignKey(
+        Topic,
+        related_name='post_topics',
+        on_delete=models.CASCADE,
+        db_index=False
+    )
+    post_created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'posts_topics'
+        unique_together = [('post', 'topic')]
+        indexes = [
+            models.Index(
+                fields=['topic', '-post_created_at', '-post'],
+                name='posts_topics_feed_idx'
+            ),
+        ]
 
-    def delete(self, *args, **kwargs):
-        """Override delete to ensure image is deleted from storage."""
-        if self.image:
-            self.image.delete(save=False)
 
-        super().delete(*args, **kwargs)
+class Save(models.Model):
+    """
+    Through model recording when a user saved a post.
+    Indexed by user and save date so a user's saved posts are read
+    most recent first from a single index range.
+    """
+    # Lookups by post are served by the (post, user) unique index
+    post = models.ForeignKey(
+        Post,
+        related_name='saves',
+        on_delete=models.CASCADE,
+        db_index=False
+    )
+    # Lookups by user are served by the saved posts index
+    user = models.ForeignKey(
+        User,
+        related_name='saves',
+        on_delete=models.CASCADE,
+        db_index=False
+    )
+    saved_at = models.DateTimeField(default=timezone.now)
+    # Time the post was unsaved, the row being kept as a tombstone
+    # compared by last-write-wins syncs; reads skip unsaved rows
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'posts_saved_by'
+        unique_together = [('post', 'user')]
+        indexes = [
+            models.Index(
+                fields=['user', '-saved_at', '-post'],
+                name='posts_saved_by_user_idx',
+                condition=Q(deleted_at__isnull=True)
+            ),
+        ]
 
 
 def post_comment_image_path(_, filename: str) -> str:
@@ -111,17 +413,161 @@ def post_comment_image_path(_, filename: str) -> str:
     return os.path.join('posts', 'comments', filename)
 
 
-class PostComment(models.Model):
+# Width of a comment's segment in a thread path: creation time in
+# zero-padded microseconds since the epoch, then 8 hex digits of the ID
+COMMENT_PATH_SEGMENT_LENGTH = 24
+COMMENT_PATH_SEPARATOR = '.'
+# Deepest reply level, keeping paths within their column
+MAX_COMMENT_DEPTH = 9
+
+
+def build_comment_path_segment(
+    created_at: datetime,
+    comment_id: uuid.UUID
+) -> str:
+    """
+    Build the thread path segment of a comment.
+    Segments sort by creation time, so sibling replies sort
+    chronologically and a thread sorts depth-first by path.
+
+    Args:
+        created_at: Creation time of the comment
+        comment_id: ID of the comment
+
+    Returns:
+        str: Fixed-width path segment
+    """
+    epoch = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+    microseconds = (created_at - epoch) // timedelta(microseconds=1)
+
+    return f'{microseconds:016d}{comment_id.hex[:8]}'
+
+
+class PostCommentQuerySet(models.QuerySet):
+    """
+    QuerySet for PostComment model.
+    """
+
+    def subtree(self, comment: 'PostComment') -> 'PostCommentQuerySet':
+        """
+        Restrict comments to a comment and all of its replies,
+        a single range of the (post, path) thread index.
+
+        Args:
+            comment: Root of the subtree
+
+        Returns:
+            QuerySet: Comments of the subtree, depth-first
+        """
+        return self.filter(
+            post_id=comment.post_id,
+            path__startswith=comment.path
+        ).order_by('path')
+
+    def top_replies(
+        self,
+        roots: Sequence['PostComment'],
+        limit: int
+    ) -> 'PostCommentQuerySet':
+        """
+        Restrict comments to the first replies under each root comment.
+        Roots sort by creation time like their paths, so the replies of
+        a page of roots are read from one range of the thread index and
+        numbered per root in path order.
+
+        Args:
+            roots: Top-level comments of a single post
+            limit: Maximum number of replies per root
+
+        Returns:
+            QuerySet: Replies annotated with their `root_path`,
+                depth-first
+        """
+        if not roots:
+            return self.none()
+
+        paths = sorted(root.path for root in roots)
+        root_path = Left('path', COMMENT_PATH_SEGMENT_LENGTH)
+
+        return self.filter(
+            post_id=roots[0].post_id,
+            path__gt=paths[0] + COMMENT_PATH_SEPARATOR,
+            path__lt=paths[-1] + chr(ord(COMMENT_PATH_SEPARATOR) + 1),
+            parent__isnull=False,
+        ).annotate(
+            root_path=root_path,
+            reply_rank=Window(
+                RowNumber(),
+                partition_by=root_path,
+                order_by=F('path').asc()
+            ),
+        ).filter(
+            root_path__in=paths,
+            reply_rank__lte=limit
+        ).order_by('path')
+
+    def latest_per_post(
+        self,
+        post_ids: Iterable[uuid.UUID],
+        limit: int
+    ) -> 'PostCommentQuerySet':
+        """
+        Restrict comments to the newest top-level comments of each post.
+        Comments are numbered per post by a window over the comment
+        listing index, so any number of posts is served by one query.
+
+        Args:
+            post_ids: IDs of the posts
+            limit: Maximum number of comments per post
+
+        Returns:
+            QuerySet: Comments annotated with their `preview_rank`,
+                newest first
+        """
+        return self.filter(
+            post_id__in=list(post_ids),
+            parent__isnull=True
+        ).annotate(
+            preview_rank=Window(
+                RowNumber(),
+                partition_by=F('post_id'),
+                order_by=[F('created_at').desc(), F('id').desc()]
+            )
+        ).filter(
+            preview_rank__lte=limit
+        ).order_by('-created_at', '-id')
+
+
+class PostComment(ImageModel):
     """
     PostComment model for user comments on posts.
     Includes support for text content and optional images.
+    Replies form threads stored as materialized paths: a comment's path
+    is its parent's path followed by its own segment, so the comments
+    of a thread are contiguous in the (post, path) index.
     """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    parent = models.ForeignKey(
+        'self',
+        related_name='replies',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True
+    )
+    # Compared bytewise, so prefixes are index ranges and order is stable
+    path = models.CharField(
+        max_length=(COMMENT_PATH_SEGMENT_LENGTH + 1) * (MAX_COMMENT_DEPTH + 1),
+        db_collation='C',
+        editable=False
+    )
+    reply_count = models.PositiveIntegerField(default=0, editable=False)
+    # Lookups by post are served by the comment listing index
     post = models.ForeignKey(
         Post,
         related_name='comments',
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False
     )
     content = models.TextField(max_length=500)
     image = models.ImageField(
@@ -130,33 +576,299 @@ class PostComment(models.Model):
         null=True,
         blank=True
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PostCommentQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         db_table = 'post_comments'
+        indexes = [
+            # Serves the top-level comment listing only
+            models.Index(
+                fields=['post', '-created_at', '-id'],
+                name='post_comments_listing_idx',
+                condition=Q(parent__isnull=True)
+            ),
+            models.Index(
+                fields=['post', 'path'],
+                name='post_comments_thread_idx'
+            ),
+        ]
+
+    @property
+    def depth(self) -> int:
+        """Reply level of the comment, 0 for top-level comments."""
+        return self.path.count(COMMENT_PATH_SEPARATOR)
+
+    def build_path(self) -> str:
+        """
+        Build the thread path of the comment from its parent's.
+
+        Returns:
+            str: Materialized path of the comment
+        """
+        segment = build_comment_path_segment(self.created_at, self.id)
+
+        if self.parent is None:
+            return segment
+
+        return self.parent.path + COMMENT_PATH_SEPARATOR + segment
+
+    def save(self, *args, **kwargs) -> None:
+        """Set the thread path of new comments before saving."""
+        if not self.path:
+            self.path = self.build_path()
+
+        super().save(*args, **kwargs)
+
+
+class Vote(models.Model):
+    """
+    Vote model holding a user's single up or down vote on a post.
+    The unique (user, post) constraint guarantees one vote per user.
+    Cleared votes are kept with a value of 0, as tombstones compared by
+    last-write-wins syncs; reads skip them.
+    """
+    UPVOTE = 1
+    DOWNVOTE = -1
+    VALUE_CHOICES = [
+        (UPVOTE, 'Upvote'),
+        (DOWNVOTE, 'Downvote'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Lookups by user are served by the (user, post) unique index
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    value = models.SmallIntegerField(choices=VALUE_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Time the current value was cast, compared by last-write-wins syncs
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'votes'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='votes_user_post_unique'
+            ),
+            models.CheckConstraint(
+                condition=Q(value__in=[1, -1, 0]),
+                name='votes_value_valid'
+            ),
+        ]
+
+    @property
+    def counter_field(self) -> Optional[str]:
+        """
+        Get the post counter field tracking this vote.
+
+        Returns:
+            str | None: Name of the post counter field,
+                or None for a cleared vote
+        """
+        if self.value == self.UPVOTE:
+            return 'upvote_count'
+
+        if self.value == self.DOWNVOTE:
+            return 'downvote_count'
+
+        return None
+
+
+@receiver(connection_created)
+def register_collation(sender, connection, **kwargs):
+    """
+    Register the bytewise "C" collation, built into PostgreSQL, on
+    SQLite connections, for comment paths and prefix lookups.
+    """
+    if connection.vendor == 'sqlite':
+        connection.connection.create_collation(
+            'C',
+            lambda left, right: (left > right) - (left < right)
+        )
+
+
+@receiver(post_save, sender=Vote)
+def count_saved_vote(sender, instance, created, **kwargs):
+    """Update the post vote counters when a vote is cast or changed."""
+    posts = Post.objects.filter(pk=instance.post_id)
+    field = instance.counter_field
+
+    if not created:
+        posts.rebuild_counters()
+    elif field:
+        posts.update(**{field: F(field) + 1})
+
+    posts.refresh_scores()
+
+
+@receiver(post_delete, sender=Vote)
+def count_deleted_vote(sender, instance, **kwargs):
+    """Decrement the post vote counter when a vote is removed."""
+    field = instance.counter_field
+    if not field:
+        return
+
+    posts = Post.objects.filter(pk=instance.post_id)
+
+    posts.update(**{field: Greatest(F(field) - 1, 0)})
+    posts.refresh_scores()
+
+
+def _link_post_topics(
+    rows: models.QuerySet,
+    topics: models.QuerySet,
+    delta: int
+) -> None:
+    """
+    Copy the post creation date onto new post topics
+    and increment the topic post counters.
+
+    Args:
+        rows: New PostTopic rows
+        topics: Topics the rows were added to
+        delta: Number of posts added to each topic
+    """
+    rows.update(
+        post_created_at=Subquery(
+            Post.objects.filter(pk=OuterRef('post_id')).values('created_at')
+        )
+    )
+    topics.update(post_count=F('post_count') + delta)
+
+
+@receiver(m2m_changed, sender=PostTopic)
+def add_post_topics(sender, instance, action, reverse, pk_set, **kwargs):
+    """Link topics added through Post.topics or Topic.post_set."""
+    if action != 'post_add' or not pk_set:
+        return
+
+    if reverse:
+        _link_post_topics(
+            PostTopic.objects.filter(
+                topic_id=instance.pk,
+                post_id__in=pk_set
+            ),
+            Topic.objects.filter(pk=instance.pk),
+            len(pk_set)
+        )
+    else:
+        _link_post_topics(
+            PostTopic.objects.filter(
+                post_id=instance.pk,
+                topic_id__in=pk_set
+            ),
+            Topic.objects.filter(pk__in=pk_set),
+            1
+        )
+
+
+@receiver(post_save, sender=PostTopic)
+def create_post_topic(sender, instance, created, **kwargs):
+    """Link a post topic created directly rather than through a relation."""
+    if created:
+        _link_post_topics(
+            PostTopic.objects.filter(pk=instance.pk),
+            Topic.objects.filter(pk=instance.topic_id),
+            1
+        )
+
+
+@receiver(post_delete, sender=PostTopic)
+def count_deleted_post_topic(sender, instance, **kwargs):
+    """Decrement the topic post counter when a post loses the topic."""
+    Topic.objects.filter(pk=instance.topic_id).update(
+        post_count=Greatest(F('post_count') - 1, 0)
+    )
+
+
+@receiver(post_save, sender=PostComment)
+def count_created_comment(sender, instance, created, **kwargs):
+    """Increment the post comment counter when a comment is created."""
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=PostComment)
+def count_deleted_comment(sender, instance, **kwargs):
+    """Decrement the post comment counter when a comment is deleted."""
+    Post.objects.filter(pk=instance.post_id).update(
+        comment_count=Greatest(F('comment_count') - 1, 0)
+    )
+
+
+@receiver(post_save, sender=PostComment)
+def count_created_reply(sender, instance, created, **kwargs):
+    """Increment the parent reply counter when a reply is created."""
+    if created and instance.parent_id:
+        PostComment.objects.filter(pk=instance.parent_id).update(
+            reply_count=F('reply_count') + 1
+        )
+
+
+@receiver(post_delete, sender=PostComment)
+def count_deleted_reply(sender, instance, **kwargs):
+    """Decrement the parent reply counter when a reply is deleted."""
+    if instance.parent_id:
+        PostComment.objects.filter(pk=instance.parent_id).update(
+            reply_count=Greatest(F('reply_count') - 1, 0)
+        )
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=PostComment)
+def delete_image_files(sender, instance, **kwargs):
+    """
+    Delete the image and its variants of a deleted post or comment once
+    the deletion commits, comments deleted by cascade included.
+    """
+    if instance.image:
+        schedule_delete(
+            instance.image.storage,
+            get_image_names(instance.image.name, instance.image_variants)
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, created=True, **kwargs):
+    """Invalidate cached payloads of a post, and feeds if it came or went."""
+    cache.invalidate([instance.pk], feed=created)
+
+
+@receiver(post_save, sender=Vote)
+@receiver(post_delete, sender=Vote)
+@receiver(post_save, sender=PostComment)
+@receiver(post_delete, sender=PostComment)
+def invalidate_post_activity(sender, instance, **kwargs):
+    """Invalidate cached payloads of a post when it is voted or commented."""
+    cache.invalidate([instance.post_id])
+
+
+@receiver(post_save, sender=PostTopic)
+@receiver(post_delete, sender=PostTopic)
+def invalidate_post_topic(sender, instance, **kwargs):
+    """Invalidate cached payloads when a post gains or loses a topic."""
+    cache.invalidate([instance.post_id], feed=True)
+
+
+@receiver(m2m_changed, sender=PostTopic)
+def invalidate_post_topics(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    """Invalidate cached payloads when topics are added through relations."""
+    if action != 'post_add' or not pk_set:
+        return
+
+    cache.invalidate(pk_set if reverse else [instance.pk], feed=True)
 
 
-@receiver(m2m_changed, sender=Post.upvoted_by.through)
-def validate_upvote(sender, instance, action, pk_set, **kwargs):
-    """Prevent upvoting if user has downvoted."""
-    if action == "pre_add":
-        # Check if any of the users being added have already downvoted
-        with transaction.atomic():
-            if instance.downvoted_by.filter(pk__in=pk_set).exists():
-                raise ValidationError(
-                    "Cannot upvote a post you have already downvoted"
-                )
-
-
-@receiver(m2m_changed, sender=Post.downvoted_by.through)
-def validate_downvote(sender, instance, action, pk_set, **kwargs):
-    """Prevent downvoting if user has upvoted."""
-    if action == "pre_add":
-        # Check if any of the users being added have already upvoted
-        with transaction.atomic():
-            if instance.upvoted_by.filter(pk__in=pk_set).exists():
-                raise ValidationError(
-                    "Cannot downvote a post you have already upvoted"
-                )
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def invalidate_topic(sender, instance, **kwargs):
+    """Invalidate every cached payload when a topic changes."""
+    cache.invalidate(feed=True)
@@ -0,0 +1,347 @@
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from datetime import datetime
+from typing import Any, Optional, Sequence
+from uuid import UUID
+import base64
+import binascii
+import json
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Opaque cursor pagination over a composite keyset.
+
+    Pages are fetched with a range condition on the ordering columns
+    instead of an OFFSET, so every page costs a single index range scan
+    no matter how deep the client scrolls. Pagination is opt-in by
+    default: it is only applied when the request carries a cursor or
+    a page size.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 20
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+    opt_in = True
+
+    # Every field must share the same direction and the last one must be
+    # unique, so the keyset gives a total order over the queryset.
+    ordering: Sequence[str] = ('-created_at', '-id')
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        request: Request,
+        view: Any = None
+    ) -> Optional[list]:
+        """
+        Fetch the page of results following the request cursor.
+
+        Args:
+            queryset: Queryset to paginate
+            request: Request carrying the cursor and page size
+            view: View performing the pagination
+
+        Returns:
+            list | None: Page of results, or None if pagination
+                was not requested
+        """
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.ordering = self.get_ordering(view)
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(queryset, position)
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        return self.page
+
+    def get_paginated_response(self, data: Any) -> Response:
+        """
+        Wrap the serialized page with the link to the next page.
+
+        Args:
+            data: Serialized page of results
+
+        Returns:
+            Response: Paginated response payload
+        """
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def is_requested(self, request: Request) -> bool:
+        """
+        Check whether the client asked for a paginated response.
+
+        Args:
+            request: Incoming request
+
+        Returns:
+            bool: True if pagination is not opt-in, or if a cursor
+                or page size was provided
+        """
+        return (
+            not self.opt_in or
+            self.cursor_query_param in request.query_params or
+            self.page_size_query_param in request.query_params
+        )
+
+    def get_ordering(self, view: Any) -> Sequence[str]:
+        """
+        Get the keyset ordering, letting the view override it.
+
+        Args:
+            view: View performing the pagination
+
+        Returns:
+            Sequence[str]: Ordering fields of the keyset
+        """
+        get_ordering = getattr(view, 'get_ordering', None)
+        if get_ordering is None:
+            return self.ordering
+
+        return get_ordering()
+
+    def get_page_size(self, request: Request) -> int:
+        """
+        Get the page size requested by the client, within bounds.
+
+        Args:
+            request: Incoming request
+
+        Returns:
+            int: Number of results per page
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self) -> Optional[str]:
+        """
+        Build the URL of the next page.
+
+        Returns:
+            str | None: Absolute URL of the next page, or None
+                if this is the last one
+        """
+        if not self.has_next or not self.page:
+            return None
+
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor(self.get_position(self.page[-1]))
+
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_position(self, item: Any) -> list:
+        """
+        Extract the keyset values of a result.
+
+        Args:
+            item: Model instance or row mapping
+
+        Returns:
+            list: Values of the ordering fields, in order
+        """
+        names = [field.lstrip('-') for field in self.ordering]
+
+        if isinstance(item, dict):
+            return [item[name] for name in names]
+
+        return [getattr(item, name) for name in names]
+
+    def get_position_filter(
+        self,
+        queryset: QuerySet,
+        position: list
+    ) -> Q:
+        """
+        Build the condition selecting rows strictly after a position.
+
+        Expands the row comparison `(a, b) < (x, y)` into
+        `a <= x AND (a < x OR (a = x AND b < y))`, where the leading
+        bound lets the database use the composite index range.
+
+        Args:
+            queryset: Queryset being paginated
+            position: Keyset values of the last row of the previous page
+
+        Returns:
+            Q: Filter condition for the next page
+        """
+        descending = self.ordering[0].startswith('-')
+        strict = 'lt' if descending else 'gt'
+        bound = 'lte' if descending else 'gte'
+        names = [field.lstrip('-') for field in self.ordering]
+        values = [
+            self.parse_value(queryset, name, value)
+            for name, value in zip(names, position)
+        ]
+
+        condition = Q()
+        for index, (name, value) in enumerate(zip(names, values)):
+            equal = {
+                previous: values[offset]
+                for offset, previous in enumerate(names[:index])
+            }
+            condition |= Q(**equal, **{f'{name}__{strict}': value})
+
+        return Q(**{f'{names[0]}__{bound}': values[0]}) & condition
+
+    def parse_value(self, queryset: QuerySet, name: str, value: Any) -> Any:
+        """
+        Convert a decoded cursor value back to the field's Python type.
+
+        Args:
+            queryset: Queryset being paginated
+            name: Name of the ordering field
+            value: Value decoded from the cursor
+
+        Returns:
+            Any: Value suitable for filtering
+
+        Raises:
+            NotFound: If the value is not valid for the field
+        """
+        try:
+            field = queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value
+
+        try:
+            return field.to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position: list) -> str:
+        """
+        Encode a keyset position as an opaque cursor string.
+
+        Args:
+            position: Keyset values to encode
+
+        Returns:
+            str: URL-safe cursor
+        """
+        values = [
+            value.isoformat() if isinstance(value, datetime)
+            else str(value) if isinstance(value, UUID)
+            else value
+            for value in position
+        ]
+        data = json.dumps(values, separators=(',', ':')).encode('utf-8')
+
+        return base64.urlsafe_b64encode(data).decode('ascii')
+
+    def decode_cursor(self, request: Request) -> Optional[list]:
+        """
+        Decode the cursor provided by the client.
+
+        Args:
+            request: Incoming request
+
+        Returns:
+            list | None: Keyset position, or None for the first page
+
+        Raises:
+            NotFound: If the cursor is malformed
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            data = base64.urlsafe_b64decode(encoded.encode('ascii'))
+            position = json.loads(data)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if (
+            not isinstance(position, list) or
+            len(position) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position
+
+
+class PostCursorPagination(KeysetCursorPagination):
+    """
+    Cursor pagination for the post feed, keyed on (created_at, id)
+    unless the view selects a ranked ordering.
+    """
+    ordering = ('-created_at', '-id')
+
+
+class PostSearchPagination(KeysetCursorPagination):
+    """
+    Cursor pagination for post search results, keyed on (rank, id).
+    Always applied, as a search may match any number of posts.
+    """
+    ordering = ('-search_rank', '-id')
+    opt_in = False
+
+
+class CommentCursorPagination(KeysetCursorPagination):
+    """
+    Cursor pagination for the comments of a post, keyed on
+    (created_at, id), newest first.
+    """
+    ordering = ('-created_at', '-id')
+
+
+class CommentThreadPagination(KeysetCursorPagination):
+    """
+    Cursor pagination for a comment thread, keyed on the unique
+    materialized path, depth-first. Always applied, as a thread may
+    hold any number of replies.
+    """
+    ordering = ('path',)
+    page_size = 50
+    opt_in = False
+
+
+class SavedPostCursorPagination(KeysetCursorPagination):
+    """
+    Cursor pagination for a user's saved posts, keyed on (saved_at, id).
+    Always applied, as a user may save any number of posts.
+    """
+    ordering = ('-saved_at', '-id')
+    opt_in = False
@@ -0,0 +1,104 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField, QuerySet
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+import re
+
+# Text search configuration of the stored post search vectors
+SEARCH_CONFIG = 'english'
+
+# FTS5 table indexing post content when running on SQLite, with the
+# post ID of each of its rows in a table of their own
+SQLITE_SEARCH_TABLE = 'posts_search'
+SQLITE_SEARCH_IDS_TABLE = 'posts_search_ids'
+SQLITE_MATCH_SQL = f"""
+    SELECT {SQLITE_SEARCH_IDS_TABLE}.post_id FROM {SQLITE_SEARCH_TABLE}
+    JOIN {SQLITE_SEARCH_IDS_TABLE}
+    ON {SQLITE_SEARCH_IDS_TABLE}.id = {SQLITE_SEARCH_TABLE}.rowid
+    WHERE {SQLITE_SEARCH_TABLE} MATCH %s
+"""
+SQLITE_RANK_SQL = f"""
+    SELECT -bm25({SQLITE_SEARCH_TABLE}) FROM {SQLITE_SEARCH_TABLE}
+    WHERE {SQLITE_SEARCH_TABLE} MATCH %s AND rowid = (
+        SELECT id FROM {SQLITE_SEARCH_IDS_TABLE}
+        WHERE post_id = {{table}}.id
+    )
+"""
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def build_match_query(text: str) -> str:
+    """
+    Convert free text into an FTS5 query matching every word.
+    Words are quoted, so FTS5 operators typed by users are
+    searched as plain words instead of being interpreted.
+
+    Args:
+        text: Text typed by the user
+
+    Returns:
+        str: FTS5 query, empty if the text has no words
+    """
+    return ' '.join(f'"{word}"' for word in WORD_PATTERN.findall(text))
+
+
+def search_posts(queryset: QuerySet, text: str) -> QuerySet:
+    """
+    Restrict posts to those matching a text search, annotated with
+    their relevance as `search_rank` (higher is more relevant).
+
+    On PostgreSQL, matches are found through the GIN index over the
+    stored search vectors and ranked with ts_rank. On SQLite, they are
+    found and ranked (bm25) through the FTS5 table mirroring post
+    content. Either way only matching posts are read, so the cost
+    grows with the number of matches rather than with the table.
+
+    Args:
+        queryset: Posts to search
+        text: Text typed by the user
+
+    Returns:
+        QuerySet: Matching posts with their rank
+    """
+    if connections[queryset.db].vendor == 'sqlite':
+        return _search_sqlite(queryset, text)
+
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+
+    # ts_rank returns a real, widened so cursors round-trip it exactly
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=Cast(
+            SearchRank(F('search_vector'), query),
+            FloatField()
+        )
+    )
+
+
+def _search_sqlite(queryset: QuerySet, text: str) -> QuerySet:
+    """
+    Search posts through the SQLite FTS5 table.
+
+    Args:
+        queryset: Posts to search
+        text: Text typed by the user
+
+    Returns:
+        QuerySet: Matching posts with their rank
+    """
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+
+    table = queryset.model._meta.db_table
+
+    return queryset.filter(
+        pk__in=RawSQL(SQLITE_MATCH_SQL, (match,))
+    ).annotate(
+        search_rank=RawSQL(
+            SQLITE_RANK_SQL.format(table=table),
+            (match,),
+            output_field=FloatField()
+        )
+    )
@@ -1,18 +1,109 @@
 from rest_framework import serializers
-from .models import Post, Topic, PostComment
+from rest_framework.request import Request
+from django.core.files.storage import Storage
+from .models import (
+    MAX_COMMENT_DEPTH,
+    ImageModel,
+    Post,
+    Topic,
+    PostTopic,
+    PostComment,
+    Vote,
+)
+from .sync import SYNC_ACTIONS
 from .types import PostData
 from accounts.serializers import UserSerializer
 from accounts.models import User
+from typing import Any, Dict, Iterable, List, Optional, Type
+from uuid import UUID
+
+
+def get_media_url(
+    storage: Storage,
+    name: str,
+    request: Optional[Request] = None
+) -> str:
+    """
+    Get the URL of a stored file, absolute when serving a request.
+
+    Args:
+        storage: Storage holding the file
+        name: Stored name of the file
+        request: Request being served, if any
+
+    Returns:
+        str: File URL
+    """
+    url = storage.url(name)
+
+    if request is not None:
+        return request.build_absolute_uri(url)
+
+    return url
+
+
+def get_image_variant_urls(
+    variants: Dict[str, Dict[str, str]],
+    storage: Storage,
+    request: Optional[Request] = None
+) -> Dict[str, Dict[str, str]]:
+    """
+    Get the URLs of stored image variants, keyed like srcset entries.
+
+    Args:
+        variants: Stored variant names, by format and width
+        storage: Storage holding the variants
+        request: Request being served, if any
+
+    Returns:
+        dict: Variant URLs by format, then by width descriptor
+            (e.g. {'webp': {'320w': url, '640w': url}})
+    """
+    return {
+        image_format: {
+            f'{width}w': get_media_url(storage, name, request)
+            for width, name in names.items()
+        }
+        for image_format, names in variants.items()
+    }
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    Field serializing the stored variants of a model's image as URLs
+    (see get_image_variant_urls).
+    """
+
+    def to_representation(self, value: Dict[str, Dict[str, str]]) -> Dict:
+        """
+        Serialize the variants of the image.
+
+        Args:
+            value: Stored variant names, by format and width
+
+        Returns:
+            dict: Variant URLs by format, then by width descriptor
+        """
+        parent = self.parent
+        assert isinstance(parent, serializers.ModelSerializer)
+        model: Type[ImageModel] = parent.Meta.model
+
+        return get_image_variant_urls(
+            value,
+            model._meta.get_field('image').storage,
+            self.context.get('request')
+        )
 
 
 class TopicSerializer(serializers.ModelSerializer):
     """
     Serializer for Topic model.
-    Provides basic topic information.
+    Provides basic topic information and the topic's post count.
     """
     class Meta:
         model = Topic
-        fields = ['id', 'name']
+        fields = ['id', 'name', 'post_count']
+        read_only_fields = ['post_count']
 
 
 class PostSerializer(serializers.ModelSerializer):
@@ -40,13 +131,15 @@ class PostSerializer(serializers.ModelSerializer):
             'empty': 'At least one topic is required.',
         },
     )
+    image_variants = ImageVariantsField()
     actions = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Post
         fields = [
-            'id', 'user', 'user_id', 'created_at',
-            'content', 'image', 'topics', 'topics_ids', 'actions'
+            'id', 'user', 'user_id', 'created_at', 'content',
+            'image', 'image_width', 'image_height', 'image_size',
+            'image_variants', 'topics', 'topics_ids', 'actions'
         ]
         read_only_fields = ['id', 'created_at']
 
@@ -117,37 +210,161 @@ class PostSerializer(serializers.ModelSerializer):
         return PostActionsSummarySerializer(obj, context=self.context).data
 
 
+class PostCommentListSerializer(serializers.ListSerializer):
+    """
+    List serializer for PostCommentSerializer.
+    When the view asks for replies, attaches the first replies under
+    every listed comment, loaded for the whole page in a single query.
+    """
+    child: 'PostCommentSerializer'
+
+    def to_representation(self, data) -> List[Dict[str, Any]]:
+        """
+        Serialize comments along with their first replies.
+
+        Args:
+            data: Top-level comments of a single post
+
+        Returns:
+            list: Serialized comments
+        """
+        comments = list(data)
+        items = super().to_representation(comments)
+        limit = self.context.get('reply_limit')
+
+        if not limit:
+            return items
+
+        replies: Dict[str, List[Dict[str, Any]]] = {}
+        for reply in PostComment.objects.top_replies(
+            comments,
+            limit
+        ).select_related('user'):
+            replies.setdefault(reply.root_path, []).append(
+                self.child.to_representation(reply)
+            )
+
+        for item, comment in zip(items, comments):
+            item['replies'] = replies.get(comment.path, [])
+
+        return items
+
+
 class PostCommentSerializer(serializers.ModelSerializer):
     """
     Serializer for PostComment model.
     Handles comment creation and provides nested user information.
+    The post and parent IDs are read from the foreign key columns,
+    without loading the related rows.
     """
     user = UserSerializer(read_only=True)
-    post_id = serializers.SerializerMethodField()
+    post_id = serializers.UUIDField(read_only=True)
+    parent_id = serializers.PrimaryKeyRelatedField(
+        queryset=PostComment.objects.all(),
+        source='parent',
+        pk_field=serializers.UUIDField(),
+        required=False,
+        allow_null=True,
+    )
+    depth = serializers.IntegerField(read_only=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = PostComment
+        list_serializer_class = PostCommentListSerializer
         fields = [
             'id',
             'user',
             'post_id',
+            'parent_id',
+            'depth',
             'content',
             'image',
+            'image_width',
+            'image_height',
+            'image_size',
+            'image_variants',
+            'reply_count',
             'created_at',
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'reply_count', 'created_at']
 
-    def get_post_id(self, obj: PostComment) -> str:
+    def validate_parent_id(
+        self,
+        parent: Optional[PostComment]
+    ) -> Optional[PostComment]:
         """
-        Get the associated post's ID.
+        Validate the comment being replied to.
 
         Args:
-            obj: PostComment instance
+            parent: Parent comment, or None for a top-level comment
 
         Returns:
-            str: UUID of the associated post
+            PostComment | None: Validated parent comment
+
+        Raises:
+            ValidationError: If the parent is on another post or too
+                deep, or if an existing comment would be moved
         """
-        return str(obj.post.id)
+        if isinstance(self.instance, PostComment):
+            if parent != self.instance.parent:
+                raise serializers.ValidationError(
+                    'A comment cannot be moved to another thread.'
+                )
+            return parent
+
+        if parent is None:
+            return parent
+
+        if str(parent.post_id) != str(self.context.get('post_id')):
+            raise serializers.ValidationError(
+                'Replies must be on the same post as their parent.'
+            )
+
+        if parent.depth >= MAX_COMMENT_DEPTH:
+            raise serializers.ValidationError(
+                f'Replies can be nested at most {MAX_COMMENT_DEPTH} '
+                'levels deep.'
+            )
+
+        return parent
+
+
+class PostBatchSerializer(serializers.Serializer):
+    """
+    Serializer for batch post fetches.
+    Validates the IDs of the requested posts, kept in request order.
+    """
+    max_ids = 100
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=max_ids,
+    )
+
+
+class PostSyncOperationSerializer(serializers.Serializer):
+    """
+    Serializer for a vote or save operation queued by an offline client.
+    """
+    post_id = serializers.UUIDField()
+    action = serializers.ChoiceField(choices=SYNC_ACTIONS)
+    client_ts = serializers.DateTimeField()
+
+
+class PostSyncSerializer(serializers.Serializer):
+    """
+    Serializer for vote and save syncs.
+    Validates the batch of queued operations.
+    """
+    max_operations = 500
+    operations: 'serializers.ListSerializer[Any]' = (
+        serializers.ListSerializer(
+            child=PostSyncOperationSerializer(),
+            allow_empty=False,
+            max_length=max_operations,
+        )
+    )
 
 
 class PostActionsSummarySerializer(serializers.ModelSerializer):
@@ -157,8 +374,8 @@ class PostActionsSummarySerializer(serializers.ModelSerializer):
     (votes, comments, user actions).
     """
     comments = serializers.SerializerMethodField()
-    is_upvoted = serializers.BooleanField(default=False)
-    is_downvoted = serializers.BooleanField(default=False)
+    is_upvoted = serializers.SerializerMethodField()
+    is_downvoted = serializers.SerializerMethodField()
     is_saved = serializers.BooleanField(default=False)
 
     class Meta:
@@ -173,7 +390,8 @@ class PostActionsSummarySerializer(serializers.ModelSerializer):
 
     def get_comments(self, obj) -> int:
         """
-        Get the count of comments for the post.
+        Get the count of comments for the post
+        from its denormalized counter.
 
         Args:
             obj: Post instance
@@ -181,4 +399,221 @@ class PostActionsSummarySerializer(serializers.ModelSerializer):
         Returns:
             int: Number of comments on the post
         """
-        return obj.comments.count()
+        return obj.comment_count
+
+    def get_is_upvoted(self, obj) -> bool:
+        """
+        Check whether the requesting user upvoted the post.
+
+        Args:
+            obj: Post instance, annotated with the user's vote
+
+        Returns:
+            bool: True if the post was upvoted by the user
+        """
+        return getattr(obj, 'user_vote', None) == Vote.UPVOTE
+
+    def get_is_downvoted(self, obj) -> bool:
+        """
+        Check whether the requesting user downvoted the post.
+
+        Args:
+            obj: Post instance, annotated with the user's vote
+
+        Returns:
+            bool: True if the post was downvoted by the user
+        """
+        return getattr(obj, 'user_vote', None) == Vote.DOWNVOTE
+
+
+class PostReadListSerializer(serializers.ListSerializer):
+    """
+    List serializer for PostReadSerializer.
+    Loads the topics of every listed post in a single query and, when
+    the view asks for them, their newest comments in another.
+    """
+    child: 'PostReadSerializer'
+
+    def to_representation(self, data) -> List[Dict[str, Any]]:
+        """
+        Serialize post rows along with their topics and comment previews.
+
+        Args:
+            data: Post rows, as returned by a .values() queryset
+
+        Returns:
+            list: Serialized posts
+        """
+        rows = list(data)
+        topics = self.child.load_topics(row['id'] for row in rows)
+        items = [self.child.represent(row, topics) for row in rows]
+
+        preview_size = self.context.get('comment_preview_size')
+        if preview_size and rows:
+            previews = self.child.load_comment_previews(
+                [row['id'] for row in rows],
+                preview_size
+            )
+            for item, row in zip(items, rows):
+                item['comment_preview'] = previews.get(row['id'], [])
+
+        return items
+
+
+class PostReadSerializer(serializers.BaseSerializer):
+    """
+    Read-only serializer for Post rows fetched with .values().
+    Produces the same output as PostSerializer from flat rows and
+    precomputed counters and annotations, building each post from a
+    fixed field layout instead of per-field serializer machinery.
+    """
+    columns = (
+        'id', 'user_id', 'user__username', 'user__email', 'created_at',
+        'content', 'image', 'image_width', 'image_height', 'image_size',
+        'image_variants', 'upvote_count', 'downvote_count', 'comment_count',
+    )
+    datetime_field = serializers.DateTimeField()
+    image_storage = Post._meta.get_field('image').storage
+
+    class Meta:
+        list_serializer_class = PostReadListSerializer
+
+    def to_representation(self, instance: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Serialize a single post row.
+
+        Args:
+            instance: Post row, as returned by a .values() queryset
+
+        Returns:
+            dict: Serialized post
+        """
+        return self.represent(instance, self.load_topics([instance['id']]))
+
+    def represent(
+        self,
+        row: Dict[str, Any],
+        topics: Dict[UUID, List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Serialize a post row with its preloaded topics.
+
+        Args:
+            row: Post row, optionally annotated with user actions
+            topics: Serialized topics, by post ID
+
+        Returns:
+            dict: Serialized post
+        """
+        user_vote = row.get('user_vote')
+
+        return {
+            'id': str(row['id']),
+            'user': {
+                'id': str(row['user_id']),
+                'username': row['user__username'],
+                'email': row['user__email'],
+            },
+            'created_at': self.datetime_field.to_representation(
+                row['created_at']
+            ),
+            'content': row['content'],
+            'image': self.get_image_url(row['image']),
+            'image_width': row['image_width'],
+            'image_height': row['image_height'],
+            'image_size': row['image_size'],
+            'image_variants': get_image_variant_urls(
+                row['image_variants'],
+                self.image_storage,
+                self.context.get('request')
+            ),
+            'topics': topics.get(row['id'], []),
+            'actions': {
+                'votes': row['upvote_count'] - row['downvote_count'],
+                'comments': row['comment_count'],
+                'is_upvoted': user_vote == Vote.UPVOTE,
+                'is_downvoted': user_vote == Vote.DOWNVOTE,
+                'is_saved': row.get('is_saved', False),
+            },
+        }
+
+    def load_comment_previews(
+        self,
+        post_ids: List[UUID],
+        size: int
+    ) -> Dict[UUID, List[Dict[str, Any]]]:
+        """
+        Load the newest top-level comments of the given posts,
+        along with their authors.
+
+        Args:
+            post_ids: IDs of the posts
+            size: Maximum number of comments per post
+
+        Returns:
+            dict: Serialized comments, newest first, by post ID
+        """
+        comments = PostComment.objects.latest_per_post(
+            post_ids,
+            size
+        ).select_related('user')
+        serializer = PostCommentSerializer(context=self.context)
+
+        previews: Dict[UUID, List[Dict[str, Any]]] = {}
+        for comment in comments:
+            previews.setdefault(comment.post_id, []).append(
+                serializer.to_representation(comment)
+            )
+
+        return previews
+
+    def load_topics(
+        self,
+        post_ids: Iterable[UUID]
+    ) -> Dict[UUID, List[Dict[str, Any]]]:
+        """
+        Load the serialized topics of the given posts.
+
+        Args:
+            post_ids: IDs of the posts
+
+        Returns:
+            dict: Serialized topics ordered by name, by post ID
+        """
+        rows = PostTopic.objects.filter(
+            post_id__in=list(post_ids)
+        ).order_by('topic__name').values_list(
+            'post',
+            'topic_id',
+            'topic__name',
+            'topic__post_count'
+        )
+
+        topics: Dict[UUID, List[Dict[str, Any]]] = {}
+        for post_id, topic_id, name, post_count in rows:
+            topics.setdefault(post_id, []).append({
+                'id': str(topic_id),
+                'name': name,
+                'post_count': post_count,
+            })
+
+        return topics
+
+    def get_image_url(self, name: Optional[str]) -> Optional[str]:
+        """
+        Get the URL of a post image, absolute when serving a request.
+
+        Args:
+            name: Stored name of the image
+
+        Returns:
+            str | None: Image URL, or None if the post has no image
+        """
+        if not name:
+            return None
+
+        return get_media_url(
+            self.image_storage,
+            name,
+            self.context.get('request')
+        )
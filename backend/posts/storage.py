@@ -1,23 +1,333 @@
+from django.core.files import File
 from django.core.files.storage import Storage
 from django.conf import settings
-from typing import BinaryIO, Optional
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from requests.adapters import HTTPAdapter
+from tempfile import SpooledTemporaryFile
+from typing import Iterator, Optional, Set, TypedDict
 import requests
 import os
+import random
+import re
+import threading
+import time
+
+POOL_SIZE: int = getattr(settings, 'MEDIA_STORAGE_POOL_SIZE', 10)
+CHUNK_SIZE: int = getattr(settings, 'MEDIA_STORAGE_CHUNK_SIZE', 64 * 1024)
+CONNECT_TIMEOUT: float = getattr(
+    settings,
+    'MEDIA_STORAGE_CONNECT_TIMEOUT',
+    3.05
+)
+READ_TIMEOUT: float = getattr(settings, 'MEDIA_STORAGE_READ_TIMEOUT', 30)
+RETRIES: int = getattr(settings, 'MEDIA_STORAGE_RETRIES', 2)
+RETRY_BACKOFF: float = getattr(settings, 'MEDIA_STORAGE_RETRY_BACKOFF', 0.1)
+BREAKER_THRESHOLD: int = getattr(
+    settings,
+    'MEDIA_STORAGE_BREAKER_THRESHOLD',
+    5
+)
+BREAKER_RESET_TIMEOUT: float = getattr(
+    settings,
+    'MEDIA_STORAGE_BREAKER_RESET_TIMEOUT',
+    30
+)
+
+# Every storage request sets or reads a whole resource, so all of them
+# can be retried; methods added later must be listed to be retried
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE', 'MKCOL'}
+# Responses of an overloaded or restarting media server
+RETRY_STATUS_CODES = {502, 503, 504}
+
+# Names generated by upload_to functions: a random UUID and an extension,
+# with the width of image variants in between (see posts.images)
+GENERATED_NAME = re.compile(
+    r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
+    r'(_[0-9]+)?\.[A-Za-z0-9]+'
+)
+
+
+class StorageUnavailable(APIException):
+    """Raised when the media server cannot be reached."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Media storage is unavailable, try again later.'
+    default_code = 'storage_unavailable'
+
+
+class BreakerStats(TypedDict):
+    state: str
+    consecutive_failures: int
+    failures: int
+    retries: int
+    rejected: int
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker guarding the calls to the media server.
+
+    Once `threshold` calls in a row failed, the circuit opens and calls
+    fail fast for `reset_timeout` seconds, so workers are not tied up
+    waiting on a stalled server. A single trial call is then let
+    through: the circuit closes if it succeeds, and opens again
+    otherwise.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        threshold: int = BREAKER_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT
+    ):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go through, counting rejected ones.
+
+        Returns:
+            bool: False while the circuit is open
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at >= self.reset_timeout:
+                    self.state = self.HALF_OPEN
+                    return True
+            elif self.state == self.CLOSED:
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the circuit past the threshold."""
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+
+            if (
+                self.state == self.HALF_OPEN
+                or self.consecutive_failures >= self.threshold
+            ):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def record_retry(self) -> None:
+        """Count a retried request."""
+        with self._lock:
+            self.retries += 1
+
+    def stats(self) -> BreakerStats:
+        """
+        Get the state and error counts of the breaker, for monitoring.
+
+        Returns:
+            BreakerStats: State of the circuit and counters since startup
+        """
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'failures': self.failures,
+                'retries': self.retries,
+                'rejected': self.rejected,
+            }
+
+
+# Breaker shared by every storage of the process
+breaker = CircuitBreaker()
+
+# Session shared by every storage of the process, created on first use
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+# Directories created or found on the media server
+_directories: Set[str] = set()
+_directories_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Get the HTTP session shared by the media storages.
+    Connections to the media server are pooled and kept alive, so
+    requests from any thread skip the TCP handshake once warm.
+
+    Returns:
+        requests.Session: Session with a pool of POOL_SIZE connections
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=POOL_SIZE,
+                pool_maxsize=POOL_SIZE
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+
+    return _session
+
+
+def send_request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Send a request to the media server through the circuit breaker.
+    Requests time out after CONNECT_TIMEOUT seconds connecting and
+    READ_TIMEOUT seconds waiting for data. Idempotent requests failing
+    to connect, timing out or answered with a gateway error are retried
+    up to RETRIES times, after a random delay with exponential backoff
+    so that workers do not retry in lockstep.
+
+    Args:
+        method: HTTP method
+        url: URL of the resource
+        **kwargs: Arguments passed on to the session
+
+    Returns:
+        requests.Response: Response of the media server
+
+    Raises:
+        StorageUnavailable: If the circuit is open, or the media server
+            could not be reached after the retries
+    """
+    if not breaker.allow():
+        raise StorageUnavailable
+
+    attempts = 1 + (RETRIES if method in IDEMPOTENT_METHODS else 0)
+
+    for attempt in range(attempts):
+        if attempt:
+            breaker.record_retry()
+            time.sleep(random.uniform(0, RETRY_BACKOFF * 2 ** attempt))
+
+        try:
+            response = get_session().request(
+                method,
+                url,
+                timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                **kwargs
+            )
+        except (requests.ConnectionError, requests.Timeout):
+            continue
+        except Exception:
+            # Any other error still ends the call, so a half-open
+            # circuit does not wait forever for its trial call
+            breaker.record_failure()
+            raise
+
+        if response.status_code not in RETRY_STATUS_CODES:
+            breaker.record_success()
+            return response
+
+    breaker.record_failure()
+    raise StorageUnavailable
+
+
+def is_generated_name(name: str) -> bool:
+    """
+    Check whether a file name was generated by an upload_to function
+    (see posts.models.post_image_path), so it cannot be taken already.
+
+    Args:
+        name: Name/path of the file
+
+    Returns:
+        bool: True if the file name is a UUID with an extension
+    """
+    return GENERATED_NAME.fullmatch(os.path.basename(name)) is not None
+
+
+class ChunkedBody:
+    """
+    Request body streaming a file in fixed-size chunks.
+    Sized, so the upload is sent with a Content-Length rather than
+    chunked transfer encoding, and iterable again for retries.
+    """
+
+    def __init__(self, content: File, chunk_size: int = CHUNK_SIZE):
+        self.content = content
+        self.chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        return self.content.size
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self.content.chunks(self.chunk_size)
 
 
 class MediaStorage(Storage):
     """
     Custom storage class for handling media files through Nginx.
     Implements basic storage operations using HTTP methods.
+
+    Requests go through a pooled keep-alive session, directories are
+    only created the first time a process writes to them, and UUID
+    names are saved without checking whether they exist, so uploads
+    take a single round trip once warm. Files are streamed in chunks of
+    `chunk_size` bytes, so memory use does not grow with their size.
+    Requests time out, are retried and fail fast while the media server
+    is down (see send_request).
     """
 
-    def __init__(self) -> None:
+    def __init__(self, chunk_size: int = CHUNK_SIZE) -> None:
         """Initialize storage with base URL from settings."""
         self.base_url = settings.MEDIA_URL
+        self.chunk_size = chunk_size
+
+    def _open(self, name: str, mode: str = 'rb') -> File:
+        """
+        Download a file from the storage.
+        The file is streamed into a temporary file, spilling to disk
+        past 16 chunks, rather than read into memory at once.
+
+        Args:
+            name: Name/path of the file
+            mode: Mode to open the file in, only reading is supported
+
+        Returns:
+            File: Downloaded file, positioned at its start
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            StorageUnavailable: If the media server cannot be reached
+        """
+        url = f"{self.base_url}{name}"
+        response = send_request("GET", url, stream=True)
+
+        if response.status_code != 200:
+            response.close()
+            raise FileNotFoundError(f"File not found in storage: {name}")
+
+        file = SpooledTemporaryFile(max_size=16 * self.chunk_size)
+        for chunk in response.iter_content(self.chunk_size):
+            file.write(chunk)
+
+        file.seek(0)
+        return File(file, name)
 
     def _create_directory(self, directory: str) -> bool:
         """
         Create a directory in the storage using MKCOL request.
+        Directories already created by the process are skipped.
 
         Args:
             directory: Path of the directory to create
@@ -25,24 +335,37 @@ class MediaStorage(Storage):
         Returns:
             bool: True if directory was created or already exists
         """
+        if directory in _directories:
+            return True
+
         url = f"{self.base_url}{directory}/"
-        response = requests.request("MKCOL", url)
+        response = send_request("MKCOL", url)
+
+        if response.status_code not in [201, 204, 405]:
+            return False
 
-        return response.status_code in [201, 204, 405]
+        with _directories_lock:
+            _directories.add(directory)
 
-    def _save(self, name: str, content: BinaryIO) -> str:
+        return True
+
+    def _save(self, name: str, content: File) -> str:
         """
-        Save a file to the storage.
+        Save a file to the storage, streaming it from its (temporary
+        upload) file rather than reading it into memory.
+        If its directory was removed since it was created, the directory
+        is created again and the upload retried once.
 
         Args:
             name: Name/path for the file
-            content: File-like object containing the file data
+            content: File containing the file data
 
         Returns:
             str: Name of the saved file
 
         Raises:
             IOError: If directory creation or file save fails
+            StorageUnavailable: If the media server cannot be reached
         """
         directory = os.path.dirname(name)
         if directory:
@@ -50,23 +373,55 @@ class MediaStorage(Storage):
                 raise IOError(f"Failed to create directory: {directory}")
 
         url = f"{self.base_url}{name}"
-
-        content.seek(0)
-        file_content = content.read()
-
+        body = ChunkedBody(content, self.chunk_size)
         headers = {
             'Content-Type': 'application/octet-stream',
         }
 
-        response = requests.put(url, data=file_content, headers=headers)
+        response = send_request("PUT", url, data=body, headers=headers)
+        if response.status_code == 409 and directory:
+            with _directories_lock:
+                _directories.discard(directory)
+
+            if not self._create_directory(directory):
+                raise IOError(f"Failed to create directory: {directory}")
+
+            response = send_request(
+                "PUT",
+                url,
+                data=body,
+                headers=headers
+            )
+
         if response.status_code not in [200, 201, 204]:
-            print(url)
             raise IOError(
                 f"Failed to save file to Nginx: {response.text}"
             )
 
         return name
 
+    def is_name_available(
+        self,
+        name: str,
+        max_length: Optional[int] = None
+    ) -> bool:
+        """
+        Check if a file can be saved under a name.
+        Generated UUID names are assumed to be free, skipping the
+        existence check.
+
+        Args:
+            name: Name/path of the file
+            max_length: Maximum length of the name, if any
+
+        Returns:
+            bool: True if the name is free and short enough
+        """
+        if max_length and len(name) > max_length:
+            return False
+
+        return is_generated_name(name) or not self.exists(name)
+
     def url(self, name: Optional[str]) -> str:
         """
         Get the URL for accessing a file.
@@ -90,7 +445,7 @@ class MediaStorage(Storage):
             bool: True if file exists, False otherwise
         """
         url = f"{self.base_url}{name}"
-        response = requests.head(url)
+        response = send_request("HEAD", url)
 
         return response.status_code == 200
 
@@ -102,4 +457,4 @@ class MediaStorage(Storage):
             name: Name/path of the file to delete
         """
         url = f"{self.base_url}{name}"
-        requests.delete(url)
+        send_request("DELETE", url)
@@ -0,0 +1,265 @@
+from django.db import connection, transaction
+from django.utils import timezone
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+from uuid import UUID
+from .models import Post, Save, Vote
+from .types import SyncOperation, VoteState
+from . import cache
+
+# Vote value set by each vote action, 0 clearing the vote
+VOTE_ACTIONS = {
+    'upvote': Vote.UPVOTE,
+    'downvote': Vote.DOWNVOTE,
+    'unvote': 0,
+}
+# Saved state set by each save action
+SAVE_ACTIONS = {
+    'save': True,
+    'unsave': False,
+}
+SYNC_ACTIONS = (*VOTE_ACTIONS, *SAVE_ACTIONS)
+
+LOCK_POSTS_SQL = """
+    SELECT id FROM {posts} WHERE id = ANY(%(post_ids)s::uuid[])
+    ORDER BY id FOR NO KEY UPDATE
+"""
+
+SYNC_VOTES_SQL = """
+    WITH operations AS (
+        SELECT * FROM unnest(
+            %(user_ids)s::uuid[],
+            %(post_ids)s::uuid[],
+            %(values)s::smallint[],
+            %(timestamps)s::timestamptz[]
+        ) AS operation (user_id, post_id, value, client_ts)
+    ), applied AS (
+        SELECT operation.*, COALESCE(vote.value, 0) AS previous
+        FROM operations operation
+        JOIN {posts} post ON post.id = operation.post_id
+        LEFT JOIN {votes} vote
+            ON vote.user_id = operation.user_id
+            AND vote.post_id = operation.post_id
+        WHERE vote.id IS NULL OR vote.updated_at < operation.client_ts
+    ), written AS (
+        INSERT INTO {votes} (
+            id, user_id, post_id, value, created_at, updated_at
+        )
+        SELECT gen_random_uuid(), user_id, post_id, value, NOW(),
+            client_ts
+        FROM applied
+        ON CONFLICT (user_id, post_id) DO UPDATE SET
+            value = EXCLUDED.value,
+            updated_at = EXCLUDED.updated_at
+    ), changes AS (
+        SELECT post_id, value, 1 AS delta FROM applied
+        UNION ALL SELECT post_id, previous, -1 FROM applied
+    ), counted AS (
+        UPDATE {posts} post SET
+            upvote_count = GREATEST(post.upvote_count + change.upvotes, 0),
+            downvote_count = GREATEST(
+                post.downvote_count + change.downvotes,
+                0
+            )
+        FROM (
+            SELECT
+                post_id,
+                COALESCE(SUM(delta) FILTER (WHERE value = %(upvote)s), 0)
+                    AS upvotes,
+                COALESCE(SUM(delta) FILTER (WHERE value = %(downvote)s), 0)
+                    AS downvotes
+            FROM changes
+            GROUP BY post_id
+        ) change
+        WHERE post.id = change.post_id
+    )
+    SELECT user_id, post_id, value <> previous FROM applied
+"""
+
+SYNC_SAVES_SQL = """
+    WITH operations AS (
+        SELECT * FROM unnest(
+            %(post_ids)s::uuid[],
+            %(saved)s::boolean[],
+            %(timestamps)s::timestamptz[]
+        ) AS operation (post_id, saved, client_ts)
+    ), applied AS (
+        SELECT operation.*
+        FROM operations operation
+        JOIN {posts} post ON post.id = operation.post_id
+        LEFT JOIN {saves} save
+            ON save.user_id = %(user_id)s
+            AND save.post_id = operation.post_id
+        WHERE save.id IS NULL
+            OR COALESCE(save.deleted_at, save.saved_at) < operation.client_ts
+    )
+    INSERT INTO {saves} AS save (post_id, user_id, saved_at, deleted_at)
+    SELECT post_id, %(user_id)s, client_ts,
+        CASE WHEN saved THEN NULL ELSE client_ts END
+    FROM applied
+    ON CONFLICT (post_id, user_id) DO UPDATE SET
+        saved_at = CASE
+            WHEN EXCLUDED.deleted_at IS NULL THEN EXCLUDED.saved_at
+            ELSE save.saved_at
+        END,
+        deleted_at = EXCLUDED.deleted_at
+"""
+
+
+def get_tables() -> Dict[str, str]:
+    """
+    Get the quoted names of the tables written by syncs.
+
+    Returns:
+        dict: Table names, by placeholder
+    """
+    quote = connection.ops.quote_name
+
+    return {
+        'posts': quote(Post._meta.db_table),
+        'votes': quote(Vote._meta.db_table),
+        'saves': quote(Save._meta.db_table),
+    }
+
+
+def get_latest_operations(
+    operations: Iterable[SyncOperation]
+) -> Tuple[Dict[UUID, SyncOperation], Dict[UUID, SyncOperation]]:
+    """
+    Keep the latest vote and save operation on each post.
+    Operations sharing a timestamp are resolved in request order.
+
+    Args:
+        operations: Operations queued by the client
+
+    Returns:
+        tuple: Latest vote operations and latest save operations,
+            by post ID
+    """
+    votes: Dict[UUID, SyncOperation] = {}
+    saves: Dict[UUID, SyncOperation] = {}
+
+    for operation in operations:
+        latest = votes if operation['action'] in VOTE_ACTIONS else saves
+        current = latest.get(operation['post_id'])
+
+        if current is None or current['client_ts'] <= operation['client_ts']:
+            latest[operation['post_id']] = operation
+
+    return votes, saves
+
+
+def apply_votes(votes: Sequence[VoteState]) -> Set[Tuple[UUID, UUID]]:
+    """
+    Set the votes of any number of users, with last-write-wins
+    semantics, in a constant number of set-based statements.
+
+    Each vote is applied only if it is newer than the stored vote of its
+    user on the post; a value of 0 clears the vote, which is kept as a
+    tombstone so that older votes arriving later stay ignored. The posts
+    are locked in ID order first, like single votes, so concurrent votes
+    cannot deadlock or drift the post counters, which are updated along
+    with the votes. Ranking scores are refreshed and cached payloads
+    invalidated for the posts whose counters changed. Votes on missing
+    posts are ignored.
+
+    Args:
+        votes: Votes to set, at most one per user and post
+
+    Returns:
+        set: (user ID, post ID) pairs of the votes applied, leaving out
+            the ones older than the stored vote
+    """
+    if not votes:
+        return set()
+
+    tables = get_tables()
+
+    with transaction.atomic(savepoint=False), connection.cursor() as cursor:
+        cursor.execute(LOCK_POSTS_SQL.format(**tables), {
+            'post_ids': list({str(vote['post_id']) for vote in votes}),
+        })
+        cursor.execute(SYNC_VOTES_SQL.format(**tables), {
+            'user_ids': [str(vote['user_id']) for vote in votes],
+            'post_ids': [str(vote['post_id']) for vote in votes],
+            'values': [vote['value'] for vote in votes],
+            'timestamps': [vote['client_ts'] for vote in votes],
+            'upvote': Vote.UPVOTE,
+            'downvote': Vote.DOWNVOTE,
+        })
+        rows = cursor.fetchall()
+        applied = {
+            (UUID(str(user_id)), UUID(str(post_id)))
+            for user_id, post_id, _ in rows
+        }
+        voted = {
+            UUID(str(post_id)) for _, post_id, changed in rows if changed
+        }
+
+        if voted:
+            Post.objects.filter(pk__in=voted).refresh_scores()
+            cache.invalidate(voted)
+
+    return applied
+
+
+def sync_actions(
+    user_id: UUID,
+    operations: List[SyncOperation]
+) -> Set[UUID]:
+    """
+    Apply a batch of vote and save operations queued by an offline
+    client, with last-write-wins semantics.
+
+    Operations set an absolute state (upvoted, downvoted, unvoted, saved
+    or unsaved) rather than toggling it, so replaying them is idempotent.
+    Each is applied only if it is newer than both the other operations
+    on the same post and the user's stored vote or save, unvotes and
+    unsaves being kept as tombstones to compare against. Timestamps in
+    the future are clamped to the current time, so a skewed clock cannot
+    block later writes.
+
+    Everything is applied in one transaction, with a constant number of
+    set-based statements whatever the batch size (see apply_votes).
+    Operations on missing posts are ignored.
+
+    Args:
+        user_id: ID of the syncing user
+        operations: Operations queued by the client
+
+    Returns:
+        set: IDs of the posts whose votes were applied
+    """
+    now = timezone.now()
+    votes, saves = get_latest_operations(
+        {**operation, 'client_ts': min(operation['client_ts'], now)}
+        for operation in operations
+    )
+
+    with transaction.atomic():
+        applied = apply_votes([
+            {
+                'user_id': user_id,
+                'post_id': post_id,
+                'value': VOTE_ACTIONS[operation['action']],
+                'client_ts': operation['client_ts'],
+            }
+            for post_id, operation in votes.items()
+        ])
+        voted = {post_id for _, post_id in applied}
+
+        if saves:
+            with connection.cursor() as cursor:
+                cursor.execute(SYNC_SAVES_SQL.format(**get_tables()), {
+                    'user_id': user_id,
+                    'post_ids': [str(post_id) for post_id in saves],
+                    'saved': [
+                        SAVE_ACTIONS[operation['action']]
+                        for operation in saves.values()
+                    ],
+                    'timestamps': [
+                        operation['client_ts']
+                        for operation in saves.values()
+                    ],
+                })
+
+    return voted
@@ -0,0 +1,278 @@
+from django.core.cache import cache as default_cache
+from django.urls import reverse
+from rest_framework import status
+from posts.tests.test_setup import APITestSetup, TestSetup
+from posts.models import Post, PostComment
+from posts.serializers import PostReadSerializer
+from posts import cache
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import threading
+import time
+
+
+class SharedCacheTests(TestSetup):
+    """Test suite for the shared payload cache."""
+
+    def test_get_or_build_caches_value(self):
+        """Test a built value is served from the cache afterwards."""
+        builds = []
+
+        def build():
+            builds.append(1)
+            return 'value'
+
+        self.assertEqual(cache.get_or_build('key', build), 'value')
+        self.assertEqual(cache.get_or_build('key', build), 'value')
+        self.assertEqual(len(builds), 1)
+
+    def test_get_or_build_rebuilds_once(self):
+        """Test concurrent misses on one key trigger a single rebuild."""
+        builds = []
+        lock = threading.Lock()
+
+        def build():
+            with lock:
+                builds.append(1)
+            time.sleep(0.2)
+            return 'value'
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            values = list(executor.map(
+                lambda _: cache.get_or_build('hot', build),
+                range(8)
+            ))
+
+        self.assertEqual(values, ['value'] * 8)
+        self.assertEqual(len(builds), 1)
+
+    def test_get_or_build_serves_stale_while_rebuilding(self):
+        """Test a stale value is served while another caller rebuilds it."""
+        default_cache.set('key', 'stale')
+        default_cache.add('key:lock', 1)
+
+        value = cache.get_or_build(
+            'key',
+            lambda: 'fresh',
+            is_fresh=lambda value: value == 'fresh'
+        )
+        self.assertEqual(value, 'stale')
+
+    def test_invalidate_bumps_versions(self):
+        """Test invalidation changes post and feed versions."""
+        feed_version = cache.get_feed_version()
+        post_version = cache.get_post_versions([self.post1.pk])
+
+        cache.invalidate([self.post1.pk])
+        self.assertEqual(cache.get_feed_version(), feed_version)
+        self.assertNotEqual(
+            cache.get_post_versions([self.post1.pk]),
+            post_version
+        )
+
+        cache.invalidate(feed=True)
+        self.assertNotEqual(cache.get_feed_version(), feed_version)
+
+        ranking_version = cache.get_ranking_version()
+        cache.invalidate(ranking=True)
+        self.assertNotEqual(cache.get_ranking_version(), ranking_version)
+
+    def test_evicted_version_is_renewed(self):
+        """Test an evicted version never comes back with an old value."""
+        version = cache.get_feed_version()
+        default_cache.delete(cache.FEED_VERSION_KEY)
+
+        self.assertNotEqual(cache.get_feed_version(), version)
+
+
+class PostViewSetCacheTests(APITestSetup):
+    """Test suite for the cached anonymous post payloads."""
+
+    def setUp(self):
+        super().setUp()
+        self.post_list_url = reverse('post-list')
+        self.post_detail_url = reverse(
+            'post-detail',
+            kwargs={'pk': self.post1.pk}
+        )
+
+    def get_post(self, data, post):
+        """Get a post from a list payload."""
+        return next(item for item in data if item['id'] == str(post.pk))
+
+    def test_list_is_cached(self):
+        """Test anonymous feed requests are served from the cache."""
+        response = self.client.get(self.post_list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.post_list_url)
+
+        self.assertEqual(cached.data, response.data)
+
+    def test_list_cache_keys_on_params(self):
+        """Test pages with different parameters are cached separately."""
+        self.client.get(self.post_list_url)
+        response = self.client.get(self.post_list_url, {'page_size': 1})
+
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_retrieve_is_cached(self):
+        """Test anonymous post requests are served from the cache."""
+        response = self.client.get(self.post_detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.post_detail_url)
+
+        self.assertEqual(cached.data, response.data)
+
+    def test_authenticated_requests_overlay_user_actions(self):
+        """Test authenticated users share the cache with one extra query."""
+        self.client.get(self.post_list_url)
+
+        self.client.force_authenticate(user=self.user2)
+        self.client.post(
+            reverse('post-upvote', kwargs={'pk': self.post1.pk})
+        )
+        self.client.post(reverse('post-save', kwargs={'pk': self.post2.pk}))
+        self.client.get(self.post_list_url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.post_list_url)
+
+        actions = self.get_post(response.data, self.post1)['actions']
+        self.assertTrue(actions['is_upvoted'])
+        self.assertFalse(actions['is_downvoted'])
+        self.assertFalse(actions['is_saved'])
+        self.assertEqual(actions['votes'], 1)
+
+        actions = self.get_post(response.data, self.post2)['actions']
+        self.assertFalse(actions['is_upvoted'])
+        self.assertTrue(actions['is_saved'])
+
+        self.client.get(self.post_detail_url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.post_detail_url)
+        self.assertTrue(response.data['actions']['is_upvoted'])
+
+    def test_shared_payload_has_no_user_actions(self):
+        """Test payloads built for a user are shared without their actions."""
+        self.client.force_authenticate(user=self.user2)
+        self.client.post(
+            reverse('post-upvote', kwargs={'pk': self.post1.pk})
+        )
+        self.client.get(self.post_list_url)
+        self.client.force_authenticate(user=None)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.post_list_url)
+
+        actions = self.get_post(response.data, self.post1)['actions']
+        self.assertFalse(actions['is_upvoted'])
+        self.assertEqual(actions['votes'], 1)
+
+    def test_vote_invalidates_cache(self):
+        """Test votes invalidate the cached post payloads."""
+        self.client.get(self.post_list_url)
+        self.client.get(self.post_detail_url)
+
+        self.client.force_authenticate(user=self.user2)
+        self.client.post(
+            reverse('post-upvote', kwargs={'pk': self.post1.pk})
+        )
+        self.client.force_authenticate(user=None)
+
+        response = self.client.get(self.post_list_url)
+        self.assertEqual(
+            self.get_post(response.data, self.post1)['actions']['votes'],
+            1
+        )
+
+        response = self.client.get(self.post_detail_url)
+        self.assertEqual(response.data['actions']['votes'], 1)
+
+    def test_comment_invalidates_cache(self):
+        """Test comments invalidate the cached post payloads."""
+        self.client.get(self.post_list_url)
+
+        PostComment.objects.create(
+            post=self.post1,
+            user=self.user1,
+            content='Another comment'
+        )
+
+        response = self.client.get(self.post_list_url)
+        self.assertEqual(
+            self.get_post(response.data, self.post1)['actions']['comments'],
+            2
+        )
+
+    def test_topic_write_invalidates_cache(self):
+        """Test topic changes invalidate every cached payload."""
+        self.client.get(self.post_detail_url)
+
+        self.topic1.name = 'Python 3'
+        self.topic1.save()
+
+        response = self.client.get(self.post_detail_url)
+        self.assertEqual(response.data['topics'][0]['name'], 'Python 3')
+
+    def test_post_write_invalidates_cache(self):
+        """Test new and deleted posts invalidate cached feeds."""
+        self.client.get(self.post_list_url)
+
+        self.post2.delete()
+
+        response = self.client.get(self.post_list_url)
+        self.assertEqual(
+            [item['id'] for item in response.data],
+            [str(self.post1.pk)]
+        )
+
+    def test_write_during_build_leaves_list_stale(self):
+        """Test a page read before a concurrent write is not kept fresh."""
+        load_topics = PostReadSerializer.load_topics
+
+        def write_after_read(serializer, post_ids):
+            # Committed by another request once the page rows are read
+            Post.objects.filter(pk=self.post1.pk).update(content='Edited')
+            cache.invalidate([self.post1.pk])
+            return load_topics(serializer, post_ids)
+
+        with mock.patch.object(
+            PostReadSerializer,
+            'load_topics',
+            write_after_read
+        ):
+            self.client.get(self.post_list_url)
+
+        response = self.client.get(self.post_list_url)
+        self.assertEqual(
+            self.get_post(response.data, self.post1)['content'],
+            'Edited'
+        )
+
+    def test_score_change_invalidates_ranked_pages(self):
+        """Test votes moving a post into a ranked page invalidate it."""
+        params = {'sort': 'top', 'page_size': 1}
+        response = self.client.get(self.post_list_url, params)
+        listed = response.data['results'][0]['id']
+        other = self.post2 if listed == str(self.post1.pk) else self.post1
+
+        self.client.force_authenticate(user=self.user2)
+        self.client.post(reverse('post-upvote', kwargs={'pk': other.pk}))
+        self.client.force_authenticate(user=None)
+
+        response = self.client.get(self.post_list_url, params)
+        self.assertEqual(response.data['results'][0]['id'], str(other.pk))
+
+    def test_score_change_keeps_new_pages(self):
+        """Test score changes do not invalidate pages of the new feed."""
+        params = {'page_size': 1}
+        self.client.get(self.post_list_url, params)
+
+        Post.objects.filter(pk=self.post2.pk).refresh_scores()
+
+        with self.assertNumQueries(0):
+            self.client.get(self.post_list_url, params)
@@ -0,0 +1,291 @@
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from posts.tests.test_setup import TestSetup
+from posts.images import (
+    delete_files,
+    get_image_names,
+    process_image,
+    run_image_job,
+)
+from posts.models import Post, PostComment
+from posts.serializers import (
+    PostCommentSerializer,
+    PostReadSerializer,
+    PostSerializer,
+)
+from PIL import Image
+from unittest import mock
+import io
+
+
+def create_image(width, height, image_format='PNG'):
+    """Encode a blank image of the given size."""
+    content = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 80, 40)).save(
+        content,
+        format=image_format
+    )
+
+    return content.getvalue()
+
+
+class ImageVariantsTests(TestSetup):
+    """Test suite for the image variant pipeline."""
+
+    def setUp(self):
+        super().setUp()
+        self.storage = InMemoryStorage(base_url='/media/')
+
+        for model in (Post, PostComment):
+            patcher = mock.patch.object(
+                model._meta.get_field('image'),
+                'storage',
+                self.storage
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.object(
+            PostReadSerializer,
+            'image_storage',
+            self.storage
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def store_image(self, instance, width=800, height=600, name='image.png'):
+        """Store an image for a post or comment, as uploads do."""
+        instance.image.name = self.storage.save(
+            name,
+            ContentFile(create_image(width, height))
+        )
+        type(instance).objects.filter(pk=instance.pk).update(
+            image=instance.image.name
+        )
+
+    def open_variant(self, name):
+        """Open a stored variant image."""
+        return Image.open(self.storage.open(name))
+
+    def test_variants_are_stored(self):
+        """Test smaller variants are stored in WebP and PNG."""
+        self.store_image(self.post1)
+
+        self.assertTrue(process_image(Post, self.post1.pk))
+
+        self.post1.refresh_from_db()
+        self.assertEqual(
+            (self.post1.image_width, self.post1.image_height),
+            (800, 600)
+        )
+        self.assertEqual(
+            self.post1.image_size,
+            self.storage.size(self.post1.image.name)
+        )
+        self.assertEqual(
+            {
+                image_format: sorted(names, key=int)
+                for image_format, names in self.post1.image_variants.items()
+            },
+            {'webp': ['320', '640'], 'png': ['320', '640']}
+        )
+
+        variant = self.open_variant(self.post1.image_variants['webp']['320'])
+        self.assertEqual((variant.format, variant.size), ('WEBP', (320, 240)))
+
+    def test_small_images_have_no_variants(self):
+        """Test images narrower than every variant are only measured."""
+        self.store_image(self.comment1, width=200, height=100)
+
+        process_image(PostComment, self.comment1.pk)
+
+        self.comment1.refresh_from_db()
+        self.assertEqual(self.comment1.image_width, 200)
+        self.assertEqual(self.comment1.image_variants, {})
+
+    def test_replaced_image_is_not_overwritten(self):
+        """Test metadata of a replaced image is dropped."""
+        self.store_image(self.post1)
+
+        def replace_image(instance):
+            Post.objects.filter(pk=instance.pk).update(
+                image='posts/other.png'
+            )
+            return {'width': 1, 'height': 1, 'size': 1, 'variants': {}}
+
+        with mock.patch(
+            'posts.images.build_variants',
+            side_effect=replace_image
+        ):
+            self.assertFalse(process_image(Post, self.post1.pk))
+
+        self.post1.refresh_from_db()
+        self.assertIsNone(self.post1.image_width)
+
+    def test_new_image_is_scheduled(self):
+        """Test saving a new image resets its metadata and queues it."""
+        Post.objects.filter(pk=self.post1.pk).update(
+            image='posts/old.png',
+            image_width=10,
+            image_variants={'webp': {'320': 'posts/old_320.webp'}}
+        )
+        self.post1.refresh_from_db()
+
+        with mock.patch('posts.images.get_executor') as get_executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.post1.content = 'Edited'
+                self.post1.save()
+
+            get_executor().submit.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.post1.image = SimpleUploadedFile(
+                    'new.png',
+                    create_image(10, 10)
+                )
+                self.post1.save()
+
+            get_executor().submit.assert_has_calls([
+                mock.call(
+                    delete_files,
+                    self.storage,
+                    ['posts/old.png', 'posts/old_320.webp']
+                ),
+                mock.call(run_image_job, Post, self.post1.pk),
+            ], any_order=True)
+
+        self.post1.refresh_from_db()
+        self.assertIsNone(self.post1.image_width)
+        self.assertEqual(self.post1.image_variants, {})
+
+    def test_replaced_image_files_are_deleted(self):
+        """Test replacing an image deletes the previous one on commit."""
+        self.store_image(self.post1)
+        process_image(Post, self.post1.pk)
+        self.post1.refresh_from_db()
+        names = get_image_names(
+            self.post1.image.name,
+            self.post1.image_variants
+        )
+
+        def submit(job, *args):
+            if job is delete_files:
+                job(*args)
+
+        with mock.patch('posts.images.get_executor') as get_executor:
+            get_executor().submit.side_effect = submit
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.post1.image = SimpleUploadedFile(
+                    'new.png',
+                    create_image(10, 10)
+                )
+                self.post1.save()
+
+        self.assertEqual(len(names), 5)
+        for name in names:
+            self.assertFalse(self.storage.exists(name))
+        self.assertTrue(self.storage.exists(self.post1.image.name))
+
+    def delete_on_commit(self, instance):
+        """Delete a row, running the file deletions it schedules."""
+        def submit(job, *args):
+            if job is delete_files:
+                job(*args)
+
+        with mock.patch('posts.images.get_executor') as get_executor:
+            get_executor().submit.side_effect = submit
+
+            with self.captureOnCommitCallbacks(execute=True):
+                instance.delete()
+
+    def test_deleted_comment_files_are_deleted(self):
+        """Test deleting a comment deletes its image and variants."""
+        self.store_image(self.comment1)
+        process_image(PostComment, self.comment1.pk)
+        self.comment1.refresh_from_db()
+        names = get_image_names(
+            self.comment1.image.name,
+            self.comment1.image_variants
+        )
+
+        self.delete_on_commit(self.comment1)
+
+        self.assertEqual(len(names), 5)
+        for name in names:
+            self.assertFalse(self.storage.exists(name))
+
+    def test_cascaded_comment_files_are_deleted(self):
+        """Test deleting a post deletes the images of its comments."""
+        self.store_image(self.post1, name='post.png')
+        self.store_image(self.comment1, name='comment.png')
+        process_image(PostComment, self.comment1.pk)
+        self.post1.refresh_from_db()
+        self.comment1.refresh_from_db()
+        names = get_image_names(
+            self.comment1.image.name,
+            self.comment1.image_variants
+        )
+
+        self.delete_on_commit(self.post1)
+
+        self.assertFalse(PostComment.objects.filter(pk=self.comment1.pk))
+        for name in [self.post1.image.name, *names]:
+            self.assertFalse(self.storage.exists(name))
+
+    def test_saves_without_image_skip_lookup(self):
+        """Test saving a row that never had an image reads nothing back."""
+        self.post1.content = 'Edited'
+
+        with CaptureQueriesContext(connection) as queries:
+            self.post1.save()
+
+        self.assertFalse([
+            query for query in queries
+            if query['sql'].startswith('SELECT')
+        ])
+
+        self.post1.refresh_from_db()
+        with CaptureQueriesContext(connection) as queries:
+            self.post1.save()
+
+        self.assertFalse([
+            query for query in queries
+            if query['sql'].startswith('SELECT')
+        ])
+
+    def test_serialized_variants(self):
+        """Test serializers expose the variant URLs by width."""
+        self.store_image(self.post1)
+        self.store_image(self.comment1)
+        process_image(Post, self.post1.pk)
+        process_image(PostComment, self.comment1.pk)
+        self.post1.refresh_from_db()
+        self.comment1.refresh_from_db()
+
+        context = {'request': APIRequestFactory().get('/api/posts/')}
+        data = PostSerializer(self.post1, context=context).data
+
+        self.assertEqual(
+            data['image_variants']['webp']['640w'],
+            'http://testserver/media/'
+            + self.post1.image_variants['webp']['640']
+        )
+        self.assertEqual(data['image_width'], 800)
+
+        row = Post.objects.values(*PostReadSerializer.columns).get(
+            pk=self.post1.pk
+        )
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(PostReadSerializer(row, context=context).data),
+            renderer.render(data)
+        )
+
+        data = PostCommentSerializer(self.comment1, context=context).data
+        self.assertEqual(set(data['image_variants']), {'webp', 'png'})
@@ -1,6 +1,9 @@
-from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 from posts.tests.test_setup import TransactionTestSetup
-from posts.models import Topic, PostComment
+from posts.models import Post, Topic, PostTopic, PostComment, Vote
+from io import StringIO
 
 
 class PostModelTests(TransactionTestSetup):
@@ -14,44 +17,146 @@ class PostModelTests(TransactionTestSetup):
     def test_post_votes(self):
         """Test post voting functionality."""
         # Test upvote
-        self.post1.upvoted_by.add(self.user2)
-        self.assertEqual(self.post1.votes, 1)
-        self.assertTrue(
-            self.post1.upvoted_by.filter(id=self.user2.pk).exists()
+        vote = Vote.objects.create(
+            user=self.user2,
+            post=self.post1,
+            value=Vote.UPVOTE
         )
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post1.votes, 1)
 
-        # Test downvote when user is already upvoted
-        with self.assertRaises(ValidationError):
-            self.post1.downvoted_by.add(self.user2)
+        # Test a second vote by the same user
+        with self.assertRaises(IntegrityError):
+            Vote.objects.create(
+                user=self.user2,
+                post=self.post1,
+                value=Vote.DOWNVOTE
+            )
+
+        # Test switching to a downvote
+        vote.value = Vote.DOWNVOTE
+        vote.save()
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post1.upvote_count, 0)
+        self.assertEqual(self.post1.votes, -1)
 
-        # Ensure the user is still only in upvoted_by
-        self.assertTrue(
-            self.post1.upvoted_by.filter(id=self.user2.pk).exists()
+        # Test removing vote
+        vote.delete()
+        self.post1.refresh_from_db()
+        self.assertFalse(Vote.objects.filter(post=self.post1).exists())
+        self.assertEqual(self.post1.votes, 0)
+
+    def test_post_vote_value_constraint(self):
+        """Test votes only accept up or down values."""
+        with self.assertRaises(IntegrityError):
+            Vote.objects.create(user=self.user2, post=self.post1, value=2)
+
+    def test_post_vote_counters(self):
+        """Test vote counters follow vote creation and deletion."""
+        Vote.objects.create(
+            user=self.user1,
+            post=self.post1,
+            value=Vote.UPVOTE
         )
-        self.assertFalse(
-            self.post1.downvoted_by.filter(id=self.user2.pk).exists()
+        Vote.objects.create(
+            user=self.user2,
+            post=self.post1,
+            value=Vote.DOWNVOTE
         )
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post1.upvote_count, 1)
+        self.assertEqual(self.post1.downvote_count, 1)
+
+        Vote.objects.filter(post=self.post1).delete()
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post1.upvote_count, 0)
+        self.assertEqual(self.post1.downvote_count, 0)
 
-        # Test downvote
-        self.post1.upvoted_by.remove(self.user2)
-        self.post1.downvoted_by.add(self.user2)
-        self.assertFalse(
-            self.post1.upvoted_by.filter(id=self.user2.pk).exists()
+    def test_post_comment_counter(self):
+        """Test comment counter follows comment creation and deletion."""
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post1.comment_count, 1)
+
+        comment = PostComment.objects.create(
+            post=self.post1,
+            user=self.user1,
+            content='Another comment'
         )
-        self.assertTrue(
-            self.post1.downvoted_by.filter(id=self.user2.pk).exists()
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post1.comment_count, 2)
+
+        comment.delete()
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post1.comment_count, 1)
+
+    def test_rebuild_post_counters(self):
+        """Test rebuilding counters that drifted from the relations."""
+        Vote.objects.create(
+            user=self.user2,
+            post=self.post1,
+            value=Vote.UPVOTE
+        )
+        Post.objects.filter(pk=self.post1.pk).update(
+            upvote_count=5,
+            downvote_count=3,
+            comment_count=0
         )
-        self.assertEqual(self.post1.votes, -1)
 
-        # Test removing vote
-        self.post1.downvoted_by.remove(self.user2)
-        self.assertFalse(
-            self.post1.upvoted_by.filter(id=self.user2.pk).exists()
+        call_command('rebuild_post_counters', stdout=StringIO())
+
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post1.upvote_count, 1)
+        self.assertEqual(self.post1.downvote_count, 0)
+        self.assertEqual(self.post1.comment_count, 1)
+
+    def test_post_scores(self):
+        """Test ranking scores follow votes and post age."""
+        self.post1.refresh_from_db()
+        self.post2.refresh_from_db()
+        self.assertEqual(self.post1.top_score, 0)
+        self.assertGreater(self.post2.hot_score, self.post1.hot_score)
+
+        for user in (self.user1, self.user2):
+            Vote.objects.create(user=user, post=self.post1, value=Vote.UPVOTE)
+        Vote.objects.create(
+            user=self.user1,
+            post=self.post2,
+            value=Vote.DOWNVOTE
         )
-        self.assertFalse(
-            self.post1.downvoted_by.filter(id=self.user2.pk).exists()
+        self.post1.refresh_from_db()
+        self.post2.refresh_from_db()
+        self.assertEqual(self.post1.top_score, 2)
+        self.assertEqual(self.post2.top_score, -1)
+        self.assertGreater(self.post1.hot_score, self.post2.hot_score)
+
+    def test_created_post_scores(self):
+        """Test new posts are scored as refreshes score them, on insert."""
+        with CaptureQueriesContext(connection) as queries:
+            post = Post.objects.create(content='Fresh post', user=self.user1)
+
+        self.assertEqual(
+            [query['sql'].split()[0] for query in queries],
+            ['INSERT']
+        )
+        hot_score = post.hot_score
+        Post.objects.filter(pk=post.pk).refresh_scores()
+        post.refresh_from_db()
+        self.assertEqual(post.top_score, 0)
+        self.assertAlmostEqual(post.hot_score, hot_score)
+
+    def test_refresh_post_scores(self):
+        """Test refreshing scores that drifted from the counters."""
+        Post.objects.filter(pk=self.post1.pk).update(
+            upvote_count=10,
+            top_score=0,
+            hot_score=0
         )
-        self.assertEqual(self.post1.votes, 0)
+
+        call_command('refresh_post_scores', days=1, stdout=StringIO())
+
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post1.top_score, 10)
+        self.assertGreater(self.post1.hot_score, 1)
 
     def test_post_save(self):
         """Test post save functionality."""
@@ -73,6 +178,31 @@ class TopicModelTests(TransactionTestSetup):
         self.assertEqual(new_topic.name, 'JavaScript')
         self.assertTrue(self.model.objects.filter(name='JavaScript').exists())
 
+    def test_topic_post_count(self):
+        """Test topic post counter follows posts gaining and losing it."""
+        self.topic1.refresh_from_db()
+        self.assertEqual(self.topic1.post_count, 1)
+
+        self.post2.topics.add(self.topic1)
+        self.topic1.post_set.add(self.post1)
+        self.topic1.refresh_from_db()
+        self.assertEqual(self.topic1.post_count, 2)
+
+        self.post2.topics.remove(self.topic1)
+        self.topic1.refresh_from_db()
+        self.assertEqual(self.topic1.post_count, 1)
+
+        self.post1.delete()
+        self.topic1.refresh_from_db()
+        self.assertEqual(self.topic1.post_count, 0)
+
+    def test_post_topic_created_at(self):
+        """Test post topics carry the creation date of their post."""
+        self.post2.topics.add(self.topic1)
+
+        post_topic = PostTopic.objects.get(post=self.post2, topic=self.topic1)
+        self.assertEqual(post_topic.post_created_at, self.post2.created_at)
+
 
 class PostCommentTests(TransactionTestSetup):
     """Test suite for PostComment model."""
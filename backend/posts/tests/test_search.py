@@ -0,0 +1,320 @@
+from django.core.management import call_command
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from posts.tests.test_setup import APITestSetup
+from accounts.models import User
+from posts.models import Post
+from posts.search import (
+    SQLITE_MATCH_SQL,
+    SQLITE_RANK_SQL,
+    build_match_query,
+    search_posts,
+)
+from importlib import import_module
+import sqlite3
+import unittest
+
+search_migration = import_module('posts.migrations.0012_post_search_vector')
+search_ids_migration = import_module('posts.migrations.0019_post_search_ids')
+
+
+class PostSearchTests(APITestSetup):
+    """Test suite for the post search endpoint."""
+
+    def setUp(self):
+        super().setUp()
+        self.search_url = reverse('post-search')
+        self.guitar_post = Post.objects.create(
+            content='Learning the guitar, one chord at a time',
+            user=self.user1
+        )
+        self.guitar_post.topics.add(self.topic1)
+        self.guitars_post = Post.objects.create(
+            content='Guitars everywhere: my guitar collection of guitars',
+            user=self.user2
+        )
+        self.guitars_post.topics.add(self.topic2)
+
+    def get_ids(self, response):
+        """Get the IDs of the posts of a search response."""
+        return [item['id'] for item in response.data['results']]
+
+    def test_search_ranks_matches(self):
+        """Test matching posts are returned, most relevant first."""
+        response = self.client.get(self.search_url, {'q': 'guitar'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.get_ids(response),
+            [str(self.guitars_post.pk), str(self.guitar_post.pk)]
+        )
+        self.assertIsNone(response.data['next'])
+
+    def test_search_matches_word_forms(self):
+        """Test words are matched regardless of their inflection."""
+        response = self.client.get(self.search_url, {'q': 'chords'})
+        self.assertEqual(self.get_ids(response), [str(self.guitar_post.pk)])
+
+    def test_search_filtered_by_topics(self):
+        """Test search results can be restricted to topics."""
+        response = self.client.get(
+            self.search_url,
+            {'q': 'guitar', 'topics': str(self.topic1.pk)}
+        )
+        self.assertEqual(self.get_ids(response), [str(self.guitar_post.pk)])
+
+        response = self.client.get(
+            self.search_url,
+            {'q': 'guitar', 'topics': f'{self.topic1.pk},{self.topic2.pk}'}
+        )
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_search_paginated(self):
+        """Test paging through search results with a cursor."""
+        for index in range(3):
+            Post.objects.create(content=f'Guitar tab {index}', user=self.user1)
+
+        ids = []
+        response = self.client.get(
+            self.search_url,
+            {'q': 'guitar', 'page_size': 2}
+        )
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            ids += self.get_ids(response)
+            if response.data['next'] is None:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(len(set(ids)), 5)
+        self.assertEqual(ids[0], str(self.guitars_post.pk))
+
+    def test_search_reflects_edits(self):
+        """Test edited and deleted posts are searched by their new content."""
+        self.guitar_post.content = 'Learning the piano instead'
+        self.guitar_post.save()
+        self.guitars_post.delete()
+
+        response = self.client.get(self.search_url, {'q': 'guitar'})
+        self.assertEqual(self.get_ids(response), [])
+
+        response = self.client.get(self.search_url, {'q': 'piano'})
+        self.assertEqual(self.get_ids(response), [str(self.guitar_post.pk)])
+
+    def test_search_user_actions(self):
+        """Test search results carry the requesting user's actions."""
+        self.client.force_authenticate(user=self.user2)
+        self.client.post(
+            reverse('post-upvote', kwargs={'pk': self.guitar_post.pk})
+        )
+
+        response = self.client.get(self.search_url, {'q': 'chord'})
+        actions = response.data['results'][0]['actions']
+        self.assertTrue(actions['is_upvoted'])
+        self.assertEqual(actions['votes'], 1)
+
+    def test_search_without_text(self):
+        """Test searching requires a text."""
+        response = self.client.get(self.search_url, {'q': '  '})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.search_url, {'q': 'a' * 201})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_ignores_query_syntax(self):
+        """Test search operators typed by users never cause errors."""
+        for text in ('"guitar', 'guitar & | !', '-', 'or or'):
+            response = self.client.get(self.search_url, {'q': text})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class SQLiteSearchTests(SimpleTestCase):
+    """Test suite for the SQLite FTS5 search fallback."""
+
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.execute(
+            'CREATE TABLE posts (id TEXT PRIMARY KEY, content TEXT)'
+        )
+        self.connection.executemany(
+            'INSERT INTO posts (id, content) VALUES (?, ?)',
+            [('a', 'Existing guitar post')]
+        )
+        for statement in (
+            search_migration.SQLITE_INSTALL_SQL
+            + search_ids_migration.SQLITE_INSTALL_SQL
+        ):
+            self.connection.execute(statement)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def search(self, text):
+        """Search post IDs as the SQLite search backend does."""
+        match = build_match_query(text)
+        sql = f"""
+            SELECT id FROM posts
+            WHERE id IN ({SQLITE_MATCH_SQL})
+            ORDER BY ({SQLITE_RANK_SQL.format(table='posts')}) DESC, id
+        """.replace('%s', '?')
+
+        return [
+            row[0] for row in self.connection.execute(sql, (match, match))
+        ]
+
+    def test_build_match_query(self):
+        """Test free text is turned into quoted FTS5 words."""
+        self.assertEqual(
+            build_match_query('guitar "chords" OR -tabs*'),
+            '"guitar" "chords" "OR" "tabs"'
+        )
+        self.assertEqual(build_match_query('!?'), '')
+
+    def test_search_indexes_existing_and_new_posts(self):
+        """Test existing posts are indexed and writes are mirrored."""
+        self.connection.executemany(
+            'INSERT INTO posts (id, content) VALUES (?, ?)',
+            [
+                ('b', 'Guitars and more guitars'),
+                ('c', 'Piano lessons'),
+            ]
+        )
+        self.assertEqual(self.search('guitar'), ['b', 'a'])
+
+        self.connection.execute(
+            "UPDATE posts SET content = 'Drum lessons' WHERE id = 'b'"
+        )
+        self.connection.execute("DELETE FROM posts WHERE id = 'c'")
+
+        self.assertEqual(self.search('guitar'), ['a'])
+        self.assertEqual(self.search('lesson'), ['b'])
+        self.assertEqual(self.search('piano'), [])
+
+    def test_search_survives_renumbered_rows(self):
+        """Test the index stays in sync when the posts rowids change."""
+        self.connection.executemany(
+            'INSERT INTO posts (id, content) VALUES (?, ?)',
+            [
+                ('b', 'Piano lessons'),
+                ('c', 'Drum lessons'),
+            ]
+        )
+        # As VACUUM may do, posts having no INTEGER PRIMARY KEY
+        self.connection.execute('UPDATE posts SET rowid = rowid + 10')
+        self.connection.execute("DELETE FROM posts WHERE id = 'b'")
+
+        self.assertEqual(self.search('drum'), ['c'])
+        self.assertEqual(self.search('piano'), [])
+
+        self.connection.execute(
+            "UPDATE posts SET content = 'Guitar lessons' WHERE id = 'c'"
+        )
+        self.assertEqual(self.search('guitar'), ['c', 'a'])
+
+
+class SQLiteRouter:
+    """Route every query to the in-memory SQLite database."""
+
+    def db_for_read(self, model, **hints):
+        return 'search_sqlite'
+
+    def db_for_write(self, model, **hints):
+        return 'search_sqlite'
+
+
+class SQLiteSearchQueryTests(unittest.TestCase):
+    """
+    Test suite for searching posts through the ORM on SQLite, against
+    an in-memory database migrated next to the test database.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        connections.settings['search_sqlite'] = {
+            **connections.settings['default'],
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        }
+
+        # Data migrations query through the default managers, so they are
+        # routed to SQLite as if it were the default database
+        with override_settings(DATABASE_ROUTERS=[SQLiteRouter()]):
+            call_command('migrate', database='search_sqlite', verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['search_sqlite'].close()
+        del connections['search_sqlite']
+        del connections.settings['search_sqlite']
+        super().tearDownClass()
+
+    def setUp(self):
+        self.posts = Post.objects.using('search_sqlite')
+        user, = User.objects.using('search_sqlite').bulk_create([
+            User(username='searcher', email='searcher@example.com'),
+        ])
+        self.guitar_post, self.guitars_post, _ = self.posts.bulk_create([
+            Post(content='Learning the guitar, one chord', user=user),
+            Post(content='Guitars and more guitars', user=user),
+            Post(content='Piano lessons', user=user),
+        ])
+
+    def tearDown(self):
+        # Raw deletes, so no receiver writes to the default database
+        with connections['search_sqlite'].cursor() as cursor:
+            cursor.execute('DELETE FROM posts')
+            cursor.execute('DELETE FROM users')
+
+    def search(self, text):
+        """Search post IDs through the ORM, most relevant first."""
+        return list(
+            search_posts(self.posts.all(), text)
+            .order_by('-search_rank')
+            .values_list('pk', flat=True)
+        )
+
+    def test_migrations_apply(self):
+        """Test every migration applies to SQLite."""
+        executor = MigrationExecutor(connections['search_sqlite'])
+
+        self.assertEqual(
+            executor.migration_plan(executor.loader.graph.leaf_nodes()),
+            []
+        )
+
+    def test_create_post(self):
+        """Test posts are created, scored and indexed on SQLite."""
+        post = self.posts.create(
+            content='Fresh guitar strings',
+            user=self.guitar_post.user
+        )
+
+        self.assertGreater(post.hot_score, 0)
+        self.assertIn(post.pk, self.search('strings'))
+
+    def test_search_ranks_matches(self):
+        """Test matching posts are found and ranked by the FTS5 table."""
+        self.assertEqual(
+            self.search('guitar'),
+            [self.guitars_post.pk, self.guitar_post.pk]
+        )
+        self.assertFalse(search_posts(self.posts.all(), '!?').exists())
+
+    def test_search_reflects_edits(self):
+        """Test edited and deleted posts are searched by their content."""
+        self.posts.filter(pk=self.guitar_post.pk).update(
+            content='Drum lessons'
+        )
+        with connections['search_sqlite'].cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM posts WHERE id = %s',
+                [self.guitars_post.pk.hex]
+            )
+
+        self.assertEqual(self.search('guitar'), [])
+        self.assertEqual(self.search('drum'), [self.guitar_post.pk])
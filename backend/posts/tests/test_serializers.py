@@ -1,6 +1,11 @@
+from django.db.models import Exists, OuterRef, Subquery
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
 from posts.tests.test_setup import TestSetup
+from posts.models import Post, Vote
 from posts.serializers import (
     PostSerializer,
+    PostReadSerializer,
     TopicSerializer,
     PostCommentSerializer
 )
@@ -34,6 +39,82 @@ class PostSerializerTests(TestSetup):
         self.assertIn('content', serializer.errors)
 
 
+class PostReadSerializerTests(TestSetup):
+    """Test suite for PostReadSerializer."""
+
+    serializer = PostReadSerializer
+
+    def setUp(self):
+        super().setUp()
+        self.post1.topics.add(self.topic2)
+        Post.objects.filter(pk=self.post2.pk).update(image='posts/image.png')
+        Vote.objects.create(user=self.user2, post=self.post1, value=1)
+        Vote.objects.create(user=self.user2, post=self.post2, value=-1)
+        self.post1.saved_by.add(self.user2)
+
+        request = APIRequestFactory().get('/api/posts/')
+        self.context = {'request': request}
+
+    def annotate(self, queryset):
+        """Annotate posts with user2's actions."""
+        return queryset.annotate(
+            user_vote=Subquery(
+                Vote.objects.filter(
+                    post_id=OuterRef('id'),
+                    user_id=self.user2.id
+                ).values('value')[:1]
+            ),
+            is_saved=Exists(
+                Post.saved_by.through.objects.filter(
+                    post_id=OuterRef('id'),
+                    user_id=self.user2.id
+                )
+            )
+        )
+
+    def assert_same_json(self, queryset):
+        """Assert both serializers render the posts to the same bytes."""
+        fields = [*self.serializer.columns, *queryset.query.annotations]
+        renderer = JSONRenderer()
+        expected = PostSerializer(
+            queryset.prefetch_related('topics'),
+            many=True,
+            context=self.context
+        ).data
+        data = self.serializer(
+            queryset.values(*fields),
+            many=True,
+            context=self.context
+        ).data
+
+        self.assertEqual(renderer.render(data), renderer.render(expected))
+
+    def test_matches_post_serializer(self):
+        """Test rows serialize to the same JSON as post instances."""
+        self.assert_same_json(Post.objects.select_related('user'))
+
+    def test_matches_post_serializer_with_user_actions(self):
+        """Test annotated rows serialize the same user actions."""
+        self.assert_same_json(self.annotate(Post.objects.all()))
+
+    def test_single_post_serialization(self):
+        """Test serializing a single post row."""
+        row = Post.objects.values(*self.serializer.columns).get(
+            pk=self.post1.pk
+        )
+        data = self.serializer(row, context=self.context).data
+
+        self.post1.refresh_from_db()
+        self.assertEqual(data, PostSerializer(
+            self.post1,
+            context=self.context
+        ).data)
+        self.assertEqual(
+            [topic['name'] for topic in data['topics']],
+            ['Django', 'Python']
+        )
+
+
 class TopicSerializerTests(TestSetup):
     """Test suite for TopicSerializer."""
 
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase, TransactionTestCase
 from rest_framework.test import APITestCase, APIClient
 import abc
@@ -12,6 +13,7 @@ class BaseTestSetup(abc.ABC):
 
     def setUp(self):
         self.client = APIClient()
+        cache.clear()
 
         # Create test users
         self.admin = User.objects.create_superuser(
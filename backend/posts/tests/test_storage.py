@@ -0,0 +1,341 @@
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from posts.storage import (
+    BREAKER_THRESHOLD,
+    CONNECT_TIMEOUT,
+    READ_TIMEOUT,
+    RETRIES,
+    CircuitBreaker,
+    MediaStorage,
+    StorageUnavailable,
+    get_session,
+    is_generated_name,
+)
+from posts.tests.test_setup import APITestSetup
+from posts import storage
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipUnless
+import os
+import requests
+import threading
+import uuid
+
+
+class MediaStorageTests(SimpleTestCase):
+    """Test suite for the media storage HTTP client."""
+
+    def setUp(self):
+        self.statuses = {'MKCOL': [201], 'PUT': [201], 'HEAD': [404]}
+        self.requests = []
+        self.session = mock.Mock()
+        self.session.request.side_effect = self.respond
+
+        for patcher in (
+            mock.patch('posts.storage.get_session', return_value=self.session),
+            mock.patch('posts.storage._directories', set()),
+            mock.patch('posts.storage.breaker', CircuitBreaker()),
+            mock.patch('posts.storage.time.sleep'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.storage = MediaStorage()
+
+    def respond(self, method, url, **kwargs):
+        """Answer with the next status queued for the method."""
+        self.requests.append((method, kwargs['timeout']))
+        statuses = self.statuses[method]
+        result = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+
+        if isinstance(result, Exception):
+            raise result
+
+        return mock.Mock(status_code=result)
+
+    def count(self, method):
+        """Count the requests sent with a method."""
+        return sum(sent == method for sent, _ in self.requests)
+
+    def save(self, name=None):
+        """Save a file, under a generated name by default."""
+        return self.storage.save(
+            name or f'posts/{uuid.uuid4()}.png',
+            ContentFile(b'image')
+        )
+
+    def test_directories_created_once(self):
+        """Test directories are only created by the first upload."""
+        for _ in range(3):
+            self.save()
+
+        self.assertEqual(self.count('MKCOL'), 1)
+        self.assertEqual(self.count('PUT'), 3)
+
+    def test_generated_names_skip_existence_check(self):
+        """Test UUID names are saved without a HEAD request."""
+        name = f'posts/comments/{uuid.uuid4()}.jpg'
+
+        self.assertEqual(self.save(name), name)
+        self.assertEqual(self.count('HEAD'), 0)
+
+        self.save('posts/image.jpg')
+        self.assertEqual(self.count('HEAD'), 1)
+
+    def test_removed_directory_is_created_again(self):
+        """Test uploads to a removed directory create it again."""
+        self.save()
+        self.statuses['PUT'] = [409, 201]
+
+        self.save()
+
+        self.assertEqual(self.count('MKCOL'), 2)
+        self.assertEqual(self.count('PUT'), 3)
+
+    def test_failed_upload(self):
+        """Test failed uploads raise an IOError."""
+        self.statuses['PUT'] = [500]
+
+        with self.assertRaises(IOError):
+            self.save()
+
+    def test_requests_time_out(self):
+        """Test every request sets connect and read timeouts."""
+        self.save()
+
+        self.assertEqual(
+            [timeout for _, timeout in self.requests],
+            [(CONNECT_TIMEOUT, READ_TIMEOUT)] * 2
+        )
+
+    def test_transient_errors_are_retried(self):
+        """Test timeouts and gateway errors are retried."""
+        self.statuses['PUT'] = [requests.Timeout(), 503, 201]
+
+        self.save()
+
+        self.assertEqual(self.count('PUT'), 3)
+        self.assertEqual(storage.breaker.stats()['retries'], 2)
+        self.assertEqual(storage.breaker.stats()['failures'], 0)
+
+    def test_unreachable_storage(self):
+        """Test uploads fail once the retries are exhausted."""
+        self.statuses['MKCOL'] = [requests.ConnectionError()]
+
+        with self.assertRaises(StorageUnavailable):
+            self.save()
+
+        self.assertEqual(self.count('MKCOL'), 1 + RETRIES)
+        self.assertEqual(storage.breaker.stats()['failures'], 1)
+
+    def test_breaker_fails_fast(self):
+        """Test the breaker rejects calls while the storage is down."""
+        self.statuses['MKCOL'] = [requests.ConnectionError()]
+
+        for _ in range(BREAKER_THRESHOLD):
+            with self.assertRaises(StorageUnavailable):
+                self.save()
+
+        sent = len(self.requests)
+        with self.assertRaises(StorageUnavailable):
+            self.save()
+
+        self.assertEqual(len(self.requests), sent)
+        self.assertEqual(storage.breaker.stats(), {
+            'state': CircuitBreaker.OPEN,
+            'consecutive_failures': BREAKER_THRESHOLD,
+            'failures': BREAKER_THRESHOLD,
+            'retries': BREAKER_THRESHOLD * RETRIES,
+            'rejected': 1,
+        })
+
+    def test_breaker_recovers(self):
+        """Test a successful trial call closes the breaker."""
+        self.statuses['MKCOL'] = [requests.ConnectionError()]
+        storage.breaker.reset_timeout = 0
+
+        for _ in range(BREAKER_THRESHOLD):
+            with self.assertRaises(StorageUnavailable):
+                self.save()
+
+        self.statuses['MKCOL'] = [201]
+        self.save()
+
+        self.assertEqual(storage.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_trial_reopens_breaker(self):
+        """Test a trial call failing with any error opens the breaker."""
+        self.statuses['MKCOL'] = [requests.ConnectionError()]
+        storage.breaker.reset_timeout = 0
+
+        for _ in range(BREAKER_THRESHOLD):
+            with self.assertRaises(StorageUnavailable):
+                self.save()
+
+        self.statuses['MKCOL'] = [requests.exceptions.ChunkedEncodingError()]
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            self.save()
+
+        self.assertEqual(storage.breaker.state, CircuitBreaker.OPEN)
+
+        self.statuses['MKCOL'] = [201]
+        self.save()
+
+        self.assertEqual(storage.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_open_downloads_file(self):
+        """Test files are downloaded in chunks, or raise if missing."""
+        self.session.request.side_effect = None
+        self.session.request.return_value = mock.Mock(
+            status_code=200,
+            iter_content=lambda chunk_size: iter([b'ima', b'ge'])
+        )
+
+        with self.storage.open('posts/image.png') as file:
+            self.assertEqual(file.read(), b'image')
+
+        self.session.request.return_value = mock.Mock(status_code=404)
+        with self.assertRaises(FileNotFoundError):
+            self.storage.open('posts/image.png')
+
+    def test_is_generated_name(self):
+        """Test only UUID names are recognized as generated."""
+        self.assertTrue(is_generated_name(f'posts/{uuid.uuid4()}.webp'))
+        self.assertFalse(is_generated_name('posts/placeholder_1.jpg'))
+        self.assertTrue(is_generated_name(f'posts/{uuid.uuid4()}_320.webp'))
+        self.assertFalse(is_generated_name(f'posts/{uuid.uuid4()}'))
+
+
+class StorageSessionTests(SimpleTestCase):
+    """Test suite for the shared media storage session."""
+
+    def test_session_is_shared(self):
+        """Test every storage uses the same pooled session."""
+        session = get_session()
+
+        self.assertIs(get_session(), session)
+        self.assertEqual(
+            session.get_adapter('http://localhost/')._pool_maxsize,
+            10
+        )
+
+
+class MediaServerHandler(BaseHTTPRequestHandler):
+    """WebDAV endpoint discarding uploads, keeping their sizes."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_MKCOL(self):
+        self.reply(201)
+
+    def do_PUT(self):
+        remaining = int(self.headers['Content-Length'])
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 64 * 1024)))
+
+        self.server.received.append(int(self.headers['Content-Length']))
+        self.reply(201)
+
+    def reply(self, status_code):
+        self.send_response(status_code)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def get_rss() -> int:
+    """Get the resident memory of the process, in bytes."""
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+@skipUnless(os.path.exists('/proc/self/statm'), 'Needs procfs')
+class StreamingUploadTests(SimpleTestCase):
+    """Test suite for uploads streamed to the media server."""
+    file_size = 16 * 1024 * 1024
+    uploads = 4
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), MediaServerHandler)
+        self.server.received = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        patcher = mock.patch('posts.storage._directories', set())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.files = []
+        for _ in range(self.uploads):
+            upload = TemporaryUploadedFile(
+                'image.png',
+                'image/png',
+                self.file_size,
+                None
+            )
+            for _ in range(self.file_size // (1024 * 1024)):
+                upload.write(os.urandom(1024 * 1024))
+
+            self.files.append(upload)
+            self.addCleanup(upload.close)
+
+    def test_parallel_uploads_memory(self):
+        """Test parallel uploads keep memory flat, whatever their size."""
+        with override_settings(
+            MEDIA_URL=f'http://127.0.0.1:{self.server.server_port}/media/'
+        ):
+            media_storage = MediaStorage()
+
+        baseline = get_rss()
+        peak = baseline
+        done = threading.Event()
+
+        def sample():
+            nonlocal peak
+            while not done.wait(0.005):
+                peak = max(peak, get_rss())
+
+        sampler = threading.Thread(target=sample)
+        sampler.start()
+
+        try:
+            with ThreadPoolExecutor(self.uploads) as executor:
+                list(executor.map(
+                    lambda upload: media_storage.save(
+                        f'posts/{uuid.uuid4()}.png',
+                        upload
+                    ),
+                    self.files
+                ))
+        finally:
+            done.set()
+            sampler.join()
+
+        self.assertEqual(
+            self.server.received,
+            [self.file_size] * self.uploads
+        )
+        # Buffering a single file would already exceed the budget
+        self.assertLess(peak - baseline, self.file_size)
+
+
+class MediaStorageStatusTests(APITestSetup):
+    """Test suite for the media storage monitoring endpoint."""
+
+    def test_status_requires_admin(self):
+        """Test only administrators can read the breaker state."""
+        url = reverse('media-storage-status')
+
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, storage.breaker.stats())
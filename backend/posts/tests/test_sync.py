@@ -0,0 +1,221 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from posts.tests.test_setup import APITestSetup
+from posts.models import Save, Vote
+from posts.sync import get_latest_operations
+from datetime import timedelta
+import uuid
+
+
+class PostSyncTests(APITestSetup):
+    """Test suite for the vote and save sync endpoint."""
+
+    def setUp(self):
+        super().setUp()
+        self.sync_url = reverse('post-sync')
+        self.now = timezone.now()
+        self.client.force_authenticate(user=self.user2)
+
+    def operation(self, post, action, minutes=0):
+        """Build an operation queued some minutes before now."""
+        return {
+            'post_id': str(post.pk),
+            'action': action,
+            'client_ts': (
+                self.now - timedelta(minutes=minutes)
+            ).isoformat(),
+        }
+
+    def sync(self, *operations):
+        """Send a batch of operations."""
+        return self.client.post(
+            self.sync_url,
+            {'operations': list(operations)},
+            format='json'
+        )
+
+    def get_vote(self, post):
+        """Get the value of user2's vote on a post, if not cleared."""
+        return Vote.objects.filter(
+            user=self.user2,
+            post=post
+        ).exclude(value=0).values_list('value', flat=True).first()
+
+    def test_sync_applies_latest_operations(self):
+        """Test the latest operation on each post wins, in one batch."""
+        response = self.sync(
+            self.operation(self.post1, 'downvote', minutes=1),
+            self.operation(self.post1, 'upvote', minutes=3),
+            self.operation(self.post1, 'save', minutes=2),
+            self.operation(self.post2, 'upvote', minutes=5),
+            self.operation(self.post2, 'unvote', minutes=4),
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [state['id'] for state in response.data],
+            [str(self.post1.pk), str(self.post2.pk)]
+        )
+        self.assertEqual(response.data[0]['actions'], {
+            'votes': -1,
+            'comments': 1,
+            'is_upvoted': False,
+            'is_downvoted': True,
+            'is_saved': True,
+        })
+        self.assertFalse(response.data[1]['actions']['is_upvoted'])
+
+        self.assertEqual(self.get_vote(self.post1), Vote.DOWNVOTE)
+        self.assertIsNone(self.get_vote(self.post2))
+        self.post1.refresh_from_db()
+        self.assertEqual(
+            (self.post1.upvote_count, self.post1.downvote_count),
+            (0, 1)
+        )
+        self.assertEqual(self.post1.top_score, -1)
+
+        save = Save.objects.get(user=self.user2, post=self.post1)
+        self.assertEqual(save.saved_at, self.now - timedelta(minutes=2))
+
+    def test_sync_keeps_newer_server_state(self):
+        """Test operations older than the stored state are ignored."""
+        self.client.post(reverse('post-upvote', kwargs={'pk': self.post1.pk}))
+        self.client.post(reverse('post-save', kwargs={'pk': self.post2.pk}))
+
+        response = self.sync(
+            self.operation(self.post1, 'downvote', minutes=10),
+            self.operation(self.post2, 'unsave', minutes=10),
+        )
+
+        self.assertTrue(response.data[0]['actions']['is_upvoted'])
+        self.assertTrue(response.data[1]['actions']['is_saved'])
+
+        response = self.sync(
+            self.operation(self.post1, 'unvote', minutes=-1),
+            self.operation(self.post2, 'unsave', minutes=-1),
+        )
+
+        self.assertEqual(response.data[0]['actions']['votes'], 0)
+        self.assertFalse(response.data[1]['actions']['is_saved'])
+        self.assertIsNone(self.get_vote(self.post1))
+
+    def test_sync_keeps_newer_deletes(self):
+        """Test operations older than an unvote or unsave stay undone."""
+        self.client.post(reverse('post-upvote', kwargs={'pk': self.post1.pk}))
+        self.client.post(reverse('post-upvote', kwargs={'pk': self.post1.pk}))
+        self.client.post(reverse('post-save', kwargs={'pk': self.post1.pk}))
+        self.client.delete(reverse('post-save', kwargs={'pk': self.post1.pk}))
+        self.sync(
+            self.operation(self.post2, 'unvote', minutes=1),
+            self.operation(self.post2, 'unsave', minutes=1),
+        )
+
+        response = self.sync(
+            self.operation(self.post1, 'upvote', minutes=10),
+            self.operation(self.post1, 'save', minutes=10),
+            self.operation(self.post2, 'downvote', minutes=2),
+            self.operation(self.post2, 'save', minutes=2),
+        )
+
+        for state in response.data:
+            self.assertEqual(state['actions']['votes'], 0)
+            self.assertFalse(state['actions']['is_downvoted'])
+            self.assertFalse(state['actions']['is_saved'])
+
+        self.assertIsNone(self.get_vote(self.post1))
+        self.assertIsNone(self.get_vote(self.post2))
+        self.assertFalse(
+            Save.objects.filter(deleted_at__isnull=True).exists()
+        )
+
+    def test_sync_is_idempotent(self):
+        """Test replaying a batch leaves the state and counters as is."""
+        operations = [
+            self.operation(self.post1, 'upvote'),
+            self.operation(self.post1, 'save'),
+        ]
+
+        self.sync(*operations)
+        response = self.sync(*operations)
+
+        self.assertEqual(response.data[0]['actions']['votes'], 1)
+        self.assertTrue(response.data[0]['actions']['is_saved'])
+        self.assertEqual(Vote.objects.filter(post=self.post1).count(), 1)
+
+    def test_sync_constant_queries(self):
+        """Test a batch runs a constant number of queries."""
+        operations = [
+            self.operation(post, action)
+            for post in (self.post1, self.post2)
+            for action in ('upvote', 'save')
+        ]
+
+        # Savepoints aside: lock, votes, scores, saves and final state
+        with self.assertNumQueries(7):
+            response = self.sync(*operations)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_sync_missing_posts(self):
+        """Test operations on missing posts are marked as such."""
+        missing_id = uuid.uuid4()
+        response = self.sync({
+            'post_id': str(missing_id),
+            'action': 'upvote',
+            'client_ts': self.now.isoformat(),
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [{'id': str(missing_id), 'missing': True}]
+        )
+
+    def test_sync_validation(self):
+        """Test syncs need a bounded list of valid operations."""
+        invalid = (
+            [],
+            [self.operation(self.post1, 'like')],
+            [{**self.operation(self.post1, 'save'), 'client_ts': 'now'}],
+            [self.operation(self.post1, 'save')] * 501,
+        )
+
+        for operations in invalid:
+            response = self.sync(*operations)
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_400_BAD_REQUEST
+            )
+
+    def test_sync_unauthenticated(self):
+        """Test syncing requires authentication."""
+        self.client.force_authenticate(user=None)
+
+        response = self.sync(self.operation(self.post1, 'upvote'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class LatestOperationsTests(SimpleTestCase):
+    """Test suite for the resolution of queued operations."""
+
+    def test_latest_operations(self):
+        """Test votes and saves are resolved separately per post."""
+        post_id = uuid.uuid4()
+        now = timezone.now()
+        operations = [
+            {'post_id': post_id, 'action': 'upvote', 'client_ts': now},
+            {'post_id': post_id, 'action': 'unsave', 'client_ts': now},
+            {'post_id': post_id, 'action': 'unvote', 'client_ts': now},
+            {
+                'post_id': post_id,
+                'action': 'save',
+                'client_ts': now - timedelta(seconds=1),
+            },
+        ]
+
+        votes, saves = get_latest_operations(operations)
+
+        self.assertEqual(votes[post_id]['action'], 'unvote')
+        self.assertEqual(saves[post_id]['action'], 'unsave')
@@ -1,7 +1,32 @@
+from django.db import IntegrityError, connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from posts.tests.test_setup import APITestSetup
-from posts.models import Topic, Post
+from posts.models import (
+    MAX_COMMENT_DEPTH,
+    Topic,
+    Post,
+    PostComment,
+    Save,
+    Vote,
+)
+from datetime import timedelta
+from unittest import mock
+
+
+class RowCounter:
+    """Database execute wrapper counting the rows queries return."""
+
+    def __init__(self):
+        self.rows = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        self.rows += max(context['cursor'].rowcount, 0)
+        return result
 
 
 class PostViewSetTests(APITestSetup):
@@ -33,6 +58,309 @@ class PostViewSetTests(APITestSetup):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 2)  # We created 2 posts in setup
 
+    def test_list_posts_with_cursor_pagination(self):
+        """Test paging through posts with an opaque cursor."""
+        for index in range(3):
+            Post.objects.create(content=f'Paged {index}', user=self.user1)
+
+        response = self.client.get(self.post_list_url, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+        seen = [post['id'] for post in response.data['results']]
+        next_url = response.data['next']
+        while next_url:
+            response = self.client.get(next_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [post['id'] for post in response.data['results']]
+            next_url = response.data['next']
+
+        expected = Post.objects.order_by('-created_at', '-id')
+        self.assertEqual(seen, [str(post.pk) for post in expected])
+
+    def test_list_posts_with_invalid_cursor(self):
+        """Test listing posts with a malformed cursor."""
+        response = self.client.get(self.post_list_url, {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_posts_paginated_user_actions(self):
+        """Test user action annotations on paginated posts."""
+        self.client.force_login(user=self.user2)
+        self.post1.saved_by.add(self.user2)
+
+        response = self.client.get(self.post_list_url, {'page_size': 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        actions = {
+            post['id']: post['actions']
+            for post in response.data['results']
+        }
+        self.assertTrue(actions[str(self.post1.pk)]['is_saved'])
+        self.assertFalse(actions[str(self.post2.pk)]['is_saved'])
+
+    def test_list_posts_user_votes(self):
+        """Test vote flags of the requesting user on listed posts."""
+        self.client.force_login(user=self.user2)
+        Vote.objects.create(
+            user=self.user2,
+            post=self.post1,
+            value=Vote.UPVOTE
+        )
+        Vote.objects.create(
+            user=self.user2,
+            post=self.post2,
+            value=Vote.DOWNVOTE
+        )
+
+        response = self.client.get(self.post_list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        actions = {post['id']: post['actions'] for post in response.data}
+        self.assertTrue(actions[str(self.post1.pk)]['is_upvoted'])
+        self.assertFalse(actions[str(self.post1.pk)]['is_downvoted'])
+        self.assertFalse(actions[str(self.post2.pk)]['is_upvoted'])
+        self.assertTrue(actions[str(self.post2.pk)]['is_downvoted'])
+        self.assertEqual(actions[str(self.post1.pk)]['votes'], 1)
+
+    def test_list_posts_sorted_by_top(self):
+        """Test listing posts ranked by net votes."""
+        Vote.objects.create(
+            user=self.user2,
+            post=self.post1,
+            value=Vote.UPVOTE
+        )
+
+        response = self.client.get(self.post_list_url, {'sort': 'top'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [post['id'] for post in response.data],
+            [str(self.post1.pk), str(self.post2.pk)]
+        )
+
+    def test_list_posts_sorted_by_hot(self):
+        """Test paging through posts ranked by hot score."""
+        for user in (self.user1, self.user2):
+            Vote.objects.create(user=user, post=self.post1, value=Vote.UPVOTE)
+
+        response = self.client.get(
+            self.post_list_url,
+            {'sort': 'hot', 'page_size': 1}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['results'][0]['id'],
+            str(self.post1.pk)
+        )
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['results'][0]['id'],
+            str(self.post2.pk)
+        )
+        self.assertIsNone(response.data['next'])
+
+    def test_list_posts_within_window(self):
+        """Test listing posts restricted to a time window."""
+        Post.objects.filter(pk=self.post2.pk).update(
+            created_at=timezone.now() - timedelta(days=3)
+        )
+
+        response = self.client.get(
+            self.post_list_url,
+            {'sort': 'top', 'window': 'day'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [post['id'] for post in response.data],
+            [str(self.post1.pk)]
+        )
+
+        response = self.client.get(self.post_list_url, {'window': 'week'})
+        self.assertEqual(len(response.data), 2)
+
+    def test_list_posts_with_invalid_sort(self):
+        """Test listing posts with unsupported sort and window."""
+        response = self.client.get(self.post_list_url, {'sort': 'best'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.post_list_url, {'window': 'year'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_posts_by_topic(self):
+        """Test listing posts filtered by one or more topics."""
+        response = self.client.get(
+            self.post_list_url,
+            {'topics': str(self.topic1.pk)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [post['id'] for post in response.data],
+            [str(self.post1.pk)]
+        )
+
+        self.post1.topics.add(self.topic2)
+        response = self.client.get(
+            self.post_list_url,
+            {'topics': f'{self.topic1.pk},{self.topic2.pk}'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [post['id'] for post in response.data],
+            [str(self.post2.pk), str(self.post1.pk)]
+        )
+
+    def test_list_posts_by_topic_paginated(self):
+        """Test paging through a topic feed with a cursor."""
+        for index in range(3):
+            post = Post.objects.create(
+                content=f'Topic post {index}',
+                user=self.user1
+            )
+            post.topics.add(self.topic1)
+
+        params = {'topics': str(self.topic1.pk), 'page_size': 3}
+        response = self.client.get(self.post_list_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        seen = [post['id'] for post in response.data['results']]
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        seen += [post['id'] for post in response.data['results']]
+        self.assertIsNone(response.data['next'])
+
+        expected = Post.objects.filter(topics=self.topic1).order_by(
+            '-created_at',
+            '-id'
+        )
+        self.assertEqual(seen, [str(post.pk) for post in expected])
+
+    def test_list_posts_by_invalid_topic(self):
+        """Test listing posts filtered by an invalid topic id."""
+        response = self.client.get(self.post_list_url, {'topics': 'python'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_posts_fetches_bounded_rows(self):
+        """Test feed queries and rows do not grow with post engagement."""
+        for voter in (self.admin, self.user1, self.user2):
+            Vote.objects.create(user=voter, post=self.post1, value=1)
+        PostComment.objects.bulk_create([
+            PostComment(post=self.post1, user=self.user2, content='Comment')
+            for _ in range(25)
+        ])
+
+        self.client.force_authenticate(user=self.user2)
+
+        for url, params, queries, rows in (
+            # Page IDs, posts, their topic links and the user's actions
+            (self.post_list_url, {'page_size': 20}, 4, 2 + 2 + 2 + 1),
+            (self.post_detail_url, {}, 3, 1 + 1 + 1),
+        ):
+            counter = RowCounter()
+            with CaptureQueriesContext(connection) as context:
+                with connection.execute_wrapper(counter):
+                    response = self.client.get(url, params)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(context.captured_queries), queries)
+            self.assertEqual(counter.rows, rows)
+
+    def test_list_posts_with_comment_preview(self):
+        """Test listing posts with their newest comments in one query."""
+        now = timezone.now()
+        comments = [
+            PostComment.objects.create(
+                post=self.post1,
+                user=self.user1,
+                content=f'Comment {index}',
+                created_at=now + timedelta(minutes=index)
+            )
+            for index in range(4)
+        ]
+        PostComment.objects.create(
+            post=self.post1,
+            user=self.user2,
+            parent=comments[3],
+            content='Reply',
+            created_at=now + timedelta(minutes=5)
+        )
+
+        counter = RowCounter()
+        with CaptureQueriesContext(connection) as context:
+            with connection.execute_wrapper(counter):
+                response = self.client.get(
+                    self.post_list_url,
+                    {'include': 'comment_preview'}
+                )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Page IDs, posts, their topic links and their newest comments
+        # with authors
+        self.assertEqual(len(context.captured_queries), 4)
+        self.assertEqual(counter.rows, 2 + 2 + 2 + 3)
+
+        previews = {
+            post['id']: post['comment_preview'] for post in response.data
+        }
+        self.assertEqual(
+            [comment['id'] for comment in previews[str(self.post1.pk)]],
+            [str(comment.pk) for comment in reversed(comments[1:])]
+        )
+        self.assertEqual(
+            previews[str(self.post1.pk)][0]['user']['username'],
+            'testuser1'
+        )
+        self.assertEqual(previews[str(self.post2.pk)], [])
+
+        response = self.client.get(self.post_list_url)
+        self.assertNotIn('comment_preview', response.data[0])
+
+    def test_list_posts_with_invalid_include(self):
+        """Test listing posts with an unsupported include."""
+        response = self.client.get(self.post_list_url, {'include': 'votes'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_posts(self):
+        """Test fetching posts by ID in request order, in one query."""
+        Vote.objects.create(user=self.user2, post=self.post1, value=1)
+        self.client.force_authenticate(user=self.user2)
+        missing_id = '00000000-0000-0000-0000-000000000000'
+
+        # Posts with the user's actions, and their topic links
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                reverse('post-batch'),
+                {'ids': [str(self.post2.pk), missing_id, str(self.post1.pk)]},
+                format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [post['id'] for post in response.data],
+            [str(self.post2.pk), missing_id, str(self.post1.pk)]
+        )
+        self.assertEqual(response.data[1], {'id': missing_id, 'missing': True})
+        self.assertTrue(response.data[2]['actions']['is_upvoted'])
+        self.assertFalse(response.data[0]['actions']['is_upvoted'])
+        self.assertEqual(
+            response.data[0]['topics'][0]['id'],
+            str(self.topic2.pk)
+        )
+
+    def test_batch_posts_validation(self):
+        """Test batch fetches need a bounded list of valid IDs."""
+        for ids in ([], ['python'], [str(self.post1.pk)] * 101):
+            response = self.client.post(
+                reverse('post-batch'),
+                {'ids': ids},
+                format='json'
+            )
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_400_BAD_REQUEST
+            )
+
     def test_create_post(self):
         """Test creating a new post."""
         self.client.force_login(user=self.user1)
@@ -65,11 +393,13 @@ class PostViewSetTests(APITestSetup):
         # Test upvote
         response = self.client.post(self.post_upvote_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.post1.refresh_from_db()
         self.assertEqual(self.post1.votes, 1)
 
         # Test double upvote (should remove vote)
         response = self.client.post(self.post_upvote_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.post1.refresh_from_db()
         self.assertEqual(self.post1.votes, 0)
 
     def test_downvote_post(self):
@@ -79,13 +409,36 @@ class PostViewSetTests(APITestSetup):
         # Test downvote
         response = self.client.post(self.post_downvote_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.post1.refresh_from_db()
         self.assertEqual(self.post1.votes, -1)
 
         # Test double downvote (should remove vote)
         response = self.client.post(self.post_downvote_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.post1.refresh_from_db()
         self.assertEqual(self.post1.votes, 0)
 
+    def test_vote_missing_post(self):
+        """Test voting on a post that does not exist."""
+        self.client.force_login(user=self.user2)
+        missing_url = reverse('post-upvote', kwargs={'pk': 'missing'})
+
+        response = self.client.post(missing_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_switch_vote_post(self):
+        """Test switching an upvote to a downvote."""
+        self.client.force_login(user=self.user2)
+
+        self.client.post(self.post_upvote_url)
+        response = self.client.post(self.post_downvote_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post1.upvote_count, 0)
+        self.assertEqual(self.post1.downvote_count, 1)
+        self.assertEqual(self.post1.votes, -1)
+
     def test_save_post(self):
         """Test post saving functionality."""
         self.client.force_login(user=self.user2)
@@ -107,18 +460,61 @@ class PostViewSetTests(APITestSetup):
         self.client.force_login(user=self.user2)
         self.post1.saved_by.add(self.user2)
 
-        # Test unsave
+        # Test unsave, kept as a tombstone
         response = self.client.delete(self.post_save_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertNotIn(
-            self.user2,
-            self.post1.saved_by.all()
-        )
+        save = Save.objects.get(post=self.post1, user=self.user2)
+        self.assertIsNotNone(save.deleted_at)
 
         # Test unsave when not saved
         response = self.client.delete(self.post_save_url)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+        # Test saving again
+        response = self.client.post(self.post_save_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        save.refresh_from_db()
+        self.assertIsNone(save.deleted_at)
+
+    def test_save_missing_post(self):
+        """Test saving and unsaving a missing post is not found."""
+        self.client.force_login(user=self.user2)
+        url = reverse(
+            'post-save',
+            kwargs={'pk': '00000000-0000-0000-0000-000000000000'}
+        )
+
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_save_post_deleted_concurrently(self):
+        """Test saving a post deleted while being saved is not found."""
+        self.client.force_login(user=self.user2)
+
+        # The post is found, then deleted before the save is inserted
+        Post.objects.filter(pk=self.post1.pk).delete()
+        checks = iter([True])
+        real_exists = QuerySet.exists
+
+        def exists(queryset):
+            return next(checks, False) or real_exists(queryset)
+
+        error = IntegrityError('posts_saves_post_id_fkey')
+
+        with (
+            mock.patch.object(
+                QuerySet, 'exists', autospec=True, side_effect=exists
+            ),
+            mock.patch.object(Save.objects, 'create', side_effect=error),
+        ):
+            response = self.client.post(self.post_save_url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Save.objects.exists())
+
     def test_unauthorized_post_modification(self):
         """Test unauthorized post modification."""
         self.client.force_login(user=self.user2)
@@ -161,6 +557,333 @@ class PostViewSetTests(APITestSetup):
         )
 
 
+class SavedPostViewSetTests(APITestSetup):
+    """Test suite for SavedPostViewSet."""
+
+    def setUp(self):
+        super().setUp()
+        self.saved_url = reverse('user-saved-posts')
+        self.client.force_authenticate(user=self.user2)
+
+    def save_post(self, post, saved_at):
+        """Save a post for user2 at the given date."""
+        Save.objects.create(post=post, user=self.user2, saved_at=saved_at)
+
+    def get_ids(self, response):
+        """Get the IDs of the posts of a page."""
+        return [item['id'] for item in response.data['results']]
+
+    def test_list_saved_posts(self):
+        """Test saved posts are listed most recently saved first."""
+        now = timezone.now()
+        self.save_post(self.post2, now - timedelta(hours=1))
+        self.save_post(self.post1, now)
+        Save.objects.create(post=self.post2, user=self.user1)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.saved_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.get_ids(response),
+            [str(self.post1.pk), str(self.post2.pk)]
+        )
+        self.assertTrue(response.data['results'][0]['actions']['is_saved'])
+        self.assertIsNone(response.data['next'])
+
+        # Unsaved posts are left out
+        self.client.delete(reverse('post-save', kwargs={'pk': self.post1.pk}))
+        response = self.client.get(self.saved_url)
+        self.assertEqual(self.get_ids(response), [str(self.post2.pk)])
+
+    def test_list_saved_posts_paginated(self):
+        """Test paging through saved posts with a cursor."""
+        now = timezone.now()
+        posts = [
+            Post.objects.create(content=f'Saved {index}', user=self.user1)
+            for index in range(3)
+        ]
+        for index, post in enumerate(posts):
+            self.save_post(post, now - timedelta(minutes=index))
+
+        response = self.client.get(self.saved_url, {'page_size': 2})
+        self.assertEqual(
+            self.get_ids(response),
+            [str(posts[0].pk), str(posts[1].pk)]
+        )
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(self.get_ids(response), [str(posts[2].pk)])
+        self.assertIsNone(response.data['next'])
+
+    def test_list_saved_posts_user_actions(self):
+        """Test saved posts carry the user's votes."""
+        self.save_post(self.post1, timezone.now())
+        self.client.post(
+            reverse('post-upvote', kwargs={'pk': self.post1.pk})
+        )
+
+        response = self.client.get(self.saved_url)
+        actions = response.data['results'][0]['actions']
+        self.assertTrue(actions['is_upvoted'])
+        self.assertEqual(actions['votes'], 1)
+
+    def test_save_action_records_date(self):
+        """Test saving a post through the API records when it was saved."""
+        self.client.post(reverse('post-save', kwargs={'pk': self.post1.pk}))
+
+        save = Save.objects.get(post=self.post1, user=self.user2)
+        self.assertLessEqual(save.saved_at, timezone.now())
+
+        response = self.client.get(self.saved_url)
+        self.assertEqual(self.get_ids(response), [str(self.post1.pk)])
+
+    def test_list_saved_posts_unauthenticated(self):
+        """Test saved posts require authentication."""
+        self.client.force_authenticate(user=None)
+
+        response = self.client.get(self.saved_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class PostCommentViewSetTests(APITestSetup):
+    """Test suite for PostCommentViewSet."""
+
+    def setUp(self):
+        super().setUp()
+        self.comment_list_url = reverse(
+            'post-comments-list',
+            kwargs={'post_pk': self.post1.pk}
+        )
+
+    def create_comments(self, count):
+        """Create comments on post1, one minute apart, newest last."""
+        now = timezone.now()
+        comments = [
+            PostComment(
+                post=self.post1,
+                user=self.user1,
+                content=f'Comment {index}',
+                created_at=now + timedelta(minutes=index)
+            )
+            for index in range(count)
+        ]
+        for comment in comments:
+            comment.path = comment.build_path()
+
+        return PostComment.objects.bulk_create(comments)
+
+    def reply(self, parent, minutes):
+        """Reply to a comment, some minutes after the first comment."""
+        return PostComment.objects.create(
+            post=parent.post,
+            user=self.user2,
+            parent=parent,
+            content=f'Reply to {parent.content}',
+            created_at=self.comment1.created_at + timedelta(minutes=minutes)
+        )
+
+    def thread_url(self, comment):
+        """Get the URL of a comment's thread."""
+        return reverse(
+            'post-comments-thread',
+            kwargs={'post_pk': comment.post_id, 'pk': comment.pk}
+        )
+
+    def test_list_comments(self):
+        """Test listing a post's comments, newest first, in one query."""
+        comments = self.create_comments(2)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.comment_list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [comment['id'] for comment in response.data],
+            [str(comments[1].pk), str(comments[0].pk), str(self.comment1.pk)]
+        )
+        self.assertEqual(response.data[0]['post_id'], str(self.post1.pk))
+        self.assertEqual(response.data[0]['user']['username'], 'testuser1')
+
+    def test_list_comments_paginated(self):
+        """Test paging through comments with a cursor."""
+        comments = self.create_comments(3)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.comment_list_url,
+                {'page_size': 2}
+            )
+        self.assertEqual(
+            [comment['id'] for comment in response.data['results']],
+            [str(comments[2].pk), str(comments[1].pk)]
+        )
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(
+            [comment['id'] for comment in response.data['results']],
+            [str(comments[0].pk), str(self.comment1.pk)]
+        )
+        self.assertIsNone(response.data['next'])
+
+    def test_create_comment(self):
+        """Test commenting on a post."""
+        self.client.force_authenticate(user=self.user1)
+
+        response = self.client.post(self.comment_list_url, self.comment_data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['post_id'], str(self.post1.pk))
+        self.assertEqual(response.data['content'], 'New test comment')
+        self.assertIsNone(response.data['parent_id'])
+        self.assertEqual(response.data['depth'], 0)
+
+    def test_reply_to_comment(self):
+        """Test replying to a comment updates the reply counter."""
+        self.client.force_authenticate(user=self.user2)
+
+        response = self.client.post(
+            self.comment_list_url,
+            {'content': 'A reply', 'parent_id': str(self.comment1.pk)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['parent_id'], str(self.comment1.pk))
+        self.assertEqual(response.data['depth'], 1)
+
+        self.comment1.refresh_from_db()
+        self.assertEqual(self.comment1.reply_count, 1)
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post1.comment_count, 2)
+
+        reply = PostComment.objects.get(pk=response.data['id'])
+        self.assertTrue(reply.path.startswith(self.comment1.path + '.'))
+
+    def test_reply_validation(self):
+        """Test replies stay on their parent's post and depth limit."""
+        self.client.force_authenticate(user=self.user2)
+        other_url = reverse(
+            'post-comments-list',
+            kwargs={'post_pk': self.post2.pk}
+        )
+
+        response = self.client.post(
+            other_url,
+            {'content': 'A reply', 'parent_id': str(self.comment1.pk)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        parent = self.comment1
+        for minutes in range(1, MAX_COMMENT_DEPTH + 1):
+            parent = self.reply(parent, minutes)
+        self.assertEqual(parent.depth, MAX_COMMENT_DEPTH)
+
+        response = self.client.post(
+            self.comment_list_url,
+            {'content': 'Too deep', 'parent_id': str(parent.pk)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_comment_cannot_be_moved(self):
+        """Test a reply cannot be moved to another thread."""
+        reply = self.reply(self.comment1, 1)
+        other = self.create_comments(1)[0]
+        self.client.force_authenticate(user=self.user2)
+
+        response = self.client.patch(
+            reverse(
+                'post-comments-detail',
+                kwargs={'post_pk': self.post1.pk, 'pk': reply.pk}
+            ),
+            {'parent_id': str(other.pk)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_comments_with_replies(self):
+        """Test listing top-level comments with their first replies."""
+        first = self.reply(self.comment1, 1)
+        nested = self.reply(first, 2)
+        self.reply(self.comment1, 3)
+        other = self.create_comments(1)[0]
+        other_reply = self.reply(other, 4)
+
+        response = self.client.get(self.comment_list_url)
+        self.assertEqual(
+            [comment['id'] for comment in response.data],
+            [str(other.pk), str(self.comment1.pk)]
+        )
+        self.assertNotIn('replies', response.data[0])
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.comment_list_url,
+                {'replies': 2}
+            )
+
+        self.assertEqual(
+            [reply['id'] for reply in response.data[0]['replies']],
+            [str(other_reply.pk)]
+        )
+        self.assertEqual(
+            [reply['id'] for reply in response.data[1]['replies']],
+            [str(first.pk), str(nested.pk)]
+        )
+        self.assertEqual(response.data[1]['reply_count'], 2)
+        self.assertEqual(response.data[1]['replies'][1]['depth'], 2)
+
+    def test_comment_thread(self):
+        """Test reading a comment's thread depth-first."""
+        first = self.reply(self.comment1, 1)
+        second = self.reply(self.comment1, 2)
+        nested = self.reply(first, 3)
+        self.reply(self.create_comments(1)[0], 4)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.thread_url(self.comment1))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [comment['id'] for comment in response.data['results']],
+            [
+                str(self.comment1.pk),
+                str(first.pk),
+                str(nested.pk),
+                str(second.pk),
+            ]
+        )
+
+        response = self.client.get(
+            self.thread_url(first),
+            {'page_size': 1}
+        )
+        self.assertEqual(
+            [comment['id'] for comment in response.data['results']],
+            [str(first.pk)]
+        )
+        response = self.client.get(response.data['next'])
+        self.assertEqual(
+            [comment['id'] for comment in response.data['results']],
+            [str(nested.pk)]
+        )
+        self.assertIsNone(response.data['next'])
+
+    def test_delete_comment_thread(self):
+        """Test deleting comments keeps the thread counters in sync."""
+        first = self.reply(self.comment1, 1)
+        self.reply(first, 2)
+        self.reply(self.comment1, 3)
+        self.client.force_authenticate(user=self.user2)
+
+        response = self.client.delete(reverse(
+            'post-comments-detail',
+            kwargs={'post_pk': self.post1.pk, 'pk': first.pk}
+        ))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.comment1.refresh_from_db()
+        self.assertEqual(self.comment1.reply_count, 1)
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post1.comment_count, 2)
+
+
 class TopicViewSetTests(APITestSetup):
     """Test suite for TopicViewSet."""
 
@@ -178,6 +901,11 @@ class TopicViewSetTests(APITestSetup):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 2)  # We created 2 topics in setup
 
+        post_counts = {
+            topic['id']: topic['post_count'] for topic in response.data
+        }
+        self.assertEqual(post_counts[str(self.topic1.pk)], 1)
+
     def test_create_topic(self):
         """Test creating a new topic."""
 
@@ -191,3 +919,29 @@ class TopicViewSetTests(APITestSetup):
         response = self.client.post(self.topic_list_url, {'name': 'React'})
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data['name'], 'React')
+
+    def test_autocomplete_topics(self):
+        """Test topic names are suggested by prefix."""
+        Topic.objects.create(name='PyTorch')
+
+        response = self.client.get(
+            reverse('topic-autocomplete'),
+            {'q': 'py'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [topic['name'] for topic in response.data],
+            ['Python', 'PyTorch']
+        )
+        self.assertEqual(response.data[0]['post_count'], 1)
+
+    def test_autocomplete_topics_after_rename(self):
+        """Test renamed topics are suggested by their new name."""
+        url = reverse('topic-autocomplete')
+        self.client.get(url, {'q': 'dj'})
+
+        self.topic2.name = 'Flask'
+        self.topic2.save()
+
+        response = self.client.get(url, {'q': 'dj'})
+        self.assertEqual(response.data, [])
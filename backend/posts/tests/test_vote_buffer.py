@@ -0,0 +1,189 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from posts.tests.test_setup import APITestSetup
+from posts.models import Vote
+from posts.sync import apply_votes
+from posts.vote_buffer import VoteBuffer
+from unittest import mock
+import uuid
+
+
+@override_settings(POSTS_VOTE_BUFFER=True)
+class VoteBufferTests(APITestSetup):
+    """Test suite for votes written behind through the vote buffer."""
+
+    def setUp(self):
+        super().setUp()
+        self.buffer = VoteBuffer()
+        patcher = mock.patch('posts.vote_buffer._buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client.force_authenticate(user=self.user2)
+        self.upvote_url = reverse('post-upvote', kwargs={'pk': self.post1.pk})
+        self.downvote_url = reverse(
+            'post-downvote',
+            kwargs={'pk': self.post1.pk}
+        )
+        self.detail_url = reverse('post-detail', kwargs={'pk': self.post1.pk})
+
+    def flush(self):
+        """Flush the buffer, running its commit callbacks."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.buffer.flush()
+
+    def get_counters(self):
+        """Get the stored vote counters of post1."""
+        self.post1.refresh_from_db()
+        return self.post1.upvote_count, self.post1.downvote_count
+
+    def test_toggles_are_buffered(self):
+        """Test toggles only read the stored vote once, writing nothing."""
+        with self.assertNumQueries(1):
+            self.client.post(self.upvote_url)
+
+        with self.assertNumQueries(0):
+            self.client.post(self.downvote_url)
+            self.client.post(self.upvote_url)
+
+        self.assertFalse(Vote.objects.exists())
+        self.assertEqual(self.get_counters(), (0, 0))
+        self.assertEqual(len(self.buffer), 1)
+
+    def test_flush_writes_latest_votes(self):
+        """Test a flush writes the latest vote and counters."""
+        self.client.post(self.upvote_url)
+        self.client.post(self.downvote_url)
+        self.client.force_authenticate(user=self.user1)
+        self.client.post(self.upvote_url)
+        self.client.post(self.upvote_url)
+
+        # user1's toggles cancel out, so only user2's vote is written
+        self.assertEqual(self.flush(), 1)
+
+        self.assertEqual(
+            Vote.objects.get(post=self.post1).value,
+            Vote.DOWNVOTE
+        )
+        self.assertEqual(self.get_counters(), (0, 1))
+        self.assertEqual(self.post1.top_score, -1)
+        self.assertEqual(len(self.buffer), 0)
+
+    def test_toggles_after_flush(self):
+        """Test toggles after a flush start from the stored vote."""
+        self.client.post(self.upvote_url)
+        self.flush()
+
+        self.client.post(self.upvote_url)
+        self.flush()
+
+        self.assertFalse(Vote.objects.exclude(value=0).exists())
+        self.assertEqual(self.get_counters(), (0, 0))
+
+    def test_reads_merge_pending_votes(self):
+        """Test reads count the votes not flushed yet."""
+        self.client.post(self.upvote_url)
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data['actions']['votes'], 1)
+        self.assertTrue(response.data['actions']['is_upvoted'])
+
+        response = self.client.get(reverse('post-list'))
+        post = next(
+            post for post in response.data
+            if post['id'] == str(self.post1.pk)
+        )
+        self.assertEqual(post['actions']['votes'], 1)
+        self.assertTrue(post['actions']['is_upvoted'])
+
+        # Other users see the count, but not the vote as theirs
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data['actions']['votes'], 1)
+        self.assertFalse(response.data['actions']['is_upvoted'])
+
+        # Once flushed, the votes are not counted twice
+        self.flush()
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data['actions']['votes'], 1)
+
+    def test_flushed_votes_pending_until_commit(self):
+        """Test flushed votes are only dropped once the write commits."""
+        self.client.post(self.upvote_url)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.buffer.flush()
+
+        self.assertEqual(len(self.buffer), 1)
+        self.assertEqual(self.buffer.get_deltas([self.post1.pk]), {
+            self.post1.pk: 1
+        })
+
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(self.buffer.get_deltas([self.post1.pk]), {})
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data['actions']['votes'], 1)
+
+    def test_vote_missing_post(self):
+        """Test voting on a missing post is not buffered."""
+        response = self.client.post(
+            reverse('post-upvote', kwargs={'pk': uuid.uuid4()})
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(len(self.buffer), 0)
+
+    def test_flush_discards_older_votes(self):
+        """Test votes older than the stored ones are not written."""
+        self.client.post(self.upvote_url)
+        # Cast through another process after the buffered vote
+        Vote.objects.create(
+            user=self.user2,
+            post=self.post1,
+            value=Vote.DOWNVOTE
+        )
+
+        def toggle_during_flush(votes):
+            self.client.post(self.upvote_url)
+            return apply_votes(votes)
+
+        with mock.patch(
+            'posts.vote_buffer.apply_votes',
+            side_effect=toggle_during_flush
+        ):
+            self.assertEqual(self.flush(), 0)
+
+        self.assertEqual(self.get_counters(), (0, 1))
+        # The toggle removes the stored downvote, not the discarded upvote
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data['actions']['votes'], 0)
+        self.assertFalse(response.data['actions']['is_downvoted'])
+
+        self.assertEqual(self.flush(), 1)
+        self.assertFalse(Vote.objects.exclude(value=0).exists())
+        self.assertEqual(self.get_counters(), (0, 0))
+
+    def test_failed_flush_keeps_votes(self):
+        """Test votes are kept when a flush fails, along with later ones."""
+        self.client.post(self.upvote_url)
+
+        def toggle_during_flush(votes):
+            self.client.post(self.downvote_url)
+            raise RuntimeError
+
+        with mock.patch(
+            'posts.vote_buffer.apply_votes',
+            side_effect=toggle_during_flush
+        ):
+            with self.assertRaises(RuntimeError):
+                self.buffer.flush()
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data['actions']['votes'], -1)
+
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(self.get_counters(), (0, 1))
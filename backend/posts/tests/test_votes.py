@@ -0,0 +1,89 @@
+from django.db import connection
+from posts.tests.test_setup import TransactionTestSetup, User
+from posts.models import Vote
+from posts.votes import toggle_vote
+from concurrent.futures import ThreadPoolExecutor
+import uuid
+
+
+class ToggleVoteTests(TransactionTestSetup):
+    """Test suite for atomic vote toggling."""
+
+    def get_vote(self, user) -> int | None:
+        """Get the value of a user's vote on post1, if not cleared."""
+        return Vote.objects.filter(
+            user=user,
+            post=self.post1
+        ).exclude(value=0).values_list('value', flat=True).first()
+
+    def test_toggle_upvote(self):
+        """Test upvoting twice removes the vote."""
+        counters = toggle_vote(self.post1.pk, self.user2.pk, Vote.UPVOTE)
+        self.assertEqual(counters, (1, 0))
+        self.assertEqual(self.get_vote(self.user2), Vote.UPVOTE)
+
+        counters = toggle_vote(self.post1.pk, self.user2.pk, Vote.UPVOTE)
+        self.assertEqual(counters, (0, 0))
+        self.assertIsNone(self.get_vote(self.user2))
+
+    def test_toggle_switches_vote(self):
+        """Test voting the other way replaces the previous vote."""
+        toggle_vote(self.post1.pk, self.user2.pk, Vote.UPVOTE)
+        counters = toggle_vote(self.post1.pk, self.user2.pk, Vote.DOWNVOTE)
+
+        self.assertEqual(counters, (0, 1))
+        self.assertEqual(self.get_vote(self.user2), Vote.DOWNVOTE)
+        self.assertEqual(Vote.objects.filter(post=self.post1).count(), 1)
+
+    def test_toggle_missing_post(self):
+        """Test voting on a post that does not exist."""
+        self.assertIsNone(
+            toggle_vote(uuid.uuid4(), self.user2.pk, Vote.UPVOTE)
+        )
+
+    def test_toggle_invalid_value(self):
+        """Test voting with an invalid value."""
+        with self.assertRaises(ValueError):
+            toggle_vote(self.post1.pk, self.user2.pk, 2)
+
+    def test_concurrent_votes(self):
+        """Test concurrent votes on one post keep counters consistent."""
+        voters = [
+            User.objects.create_user(
+                username=f'voter{index}',
+                email=f'voter{index}@example.com'
+            )
+            for index in range(8)
+        ]
+
+        def vote(args):
+            user, value = args
+            try:
+                return toggle_vote(self.post1.pk, user.pk, value)
+            finally:
+                connection.close()
+
+        # Every voter upvotes while user2 flips between both directions
+        operations = [(user, Vote.UPVOTE) for user in voters]
+        operations += [
+            (self.user2, Vote.UPVOTE),
+            (self.user2, Vote.DOWNVOTE),
+        ] * 4
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(vote, operations))
+
+        votes = Vote.objects.filter(post=self.post1)
+        self.post1.refresh_from_db()
+        self.assertEqual(
+            self.post1.upvote_count,
+            votes.filter(value=Vote.UPVOTE).count()
+        )
+        self.assertEqual(
+            self.post1.downvote_count,
+            votes.filter(value=Vote.DOWNVOTE).count()
+        )
+        self.assertEqual(
+            votes.filter(user__in=voters, value=Vote.UPVOTE).count(),
+            len(voters)
+        )
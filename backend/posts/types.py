@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import TypedDict
 from uuid import UUID
 from posts.models import Topic
@@ -15,3 +16,16 @@ class PostData(TypedDict, total=False):
     content: str
     image: str | None
     topics: list[Topic]
+
+
+class SyncOperation(TypedDict):
+    post_id: UUID
+    action: str
+    client_ts: datetime
+
+
+class VoteState(TypedDict):
+    user_id: UUID
+    post_id: UUID
+    value: int
+    client_ts: datetime
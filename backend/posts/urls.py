@@ -1,6 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PostViewSet, TopicViewSet, PostCommentViewSet
+from .views import (
+    MediaStorageStatusView,
+    PostViewSet,
+    TopicViewSet,
+    PostCommentViewSet,
+    SavedPostViewSet,
+)
 
 router = DefaultRouter()
 router.register(r'posts', PostViewSet)
@@ -12,5 +18,15 @@ router.register(
 )
 
 urlpatterns = [
+    path(
+        'users/me/saved/',
+        SavedPostViewSet.as_view({'get': 'list'}),
+        name='user-saved-posts'
+    ),
+    path(
+        'media/status/',
+        MediaStorageStatusView.as_view(),
+        name='media-storage-status'
+    ),
     path('', include(router.urls)),
 ]
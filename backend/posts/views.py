@@ -3,46 +3,440 @@ from rest_framework.authentication import (
     SessionAuthentication,
     TokenAuthentication
 )
-from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
-from django.db.models import QuerySet
+from rest_framework.serializers import BaseSerializer
+from rest_framework.views import APIView
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef, QuerySet
+from django.utils import timezone
+from accounts.autocomplete import AutocompleteMixin
 from accounts.permissions import IsAdminOrReadOnly, IsOwnerOrReadOnly
 from accounts.models import User
-from .models import Post, Topic, PostComment
-from .serializers import PostSerializer, TopicSerializer, PostCommentSerializer
-from .mixins import PostActionsMixin
+from .models import Post, Topic, PostTopic, PostComment, Save, Vote
+from .serializers import (
+    PostSerializer,
+    PostReadSerializer,
+    TopicSerializer,
+    PostCommentSerializer,
+    PostBatchSerializer,
+    PostSyncSerializer,
+    PostActionsSummarySerializer,
+)
+from .mixins import PostActionsMixin, SharedCacheMixin
+from .pagination import (
+    CommentCursorPagination,
+    CommentThreadPagination,
+    PostCursorPagination,
+    PostSearchPagination,
+    SavedPostCursorPagination,
+)
+from .search import search_posts
+from .storage import breaker as storage_breaker
+from .sync import sync_actions
+from .votes import toggle_vote
+from .vote_buffer import get_vote_buffer, is_enabled as is_vote_buffered
+from datetime import timedelta
+from typing import List, Optional, Sequence, Type
+from uuid import UUID
 
 
-class TopicViewSet(viewsets.ModelViewSet):
+class TopicViewSet(AutocompleteMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing Topic objects.
-    Provides CRUD operations for topics, with admin-only write permissions.
+    Provides CRUD operations for topics, with admin-only write permissions,
+    and topic name suggestions through `autocomplete`.
     """
     queryset = Topic.objects.all()
     serializer_class = TopicSerializer
+    autocomplete_field = 'name'
+    autocomplete_columns = ('id', 'name', 'post_count')
     authentication_classes = (TokenAuthentication,)
     permission_classes = [IsAdminOrReadOnly]
 
 
-class PostViewSet(PostActionsMixin, viewsets.ModelViewSet):
+class PostViewSet(SharedCacheMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing Post objects.
     Provides CRUD operations and additional actions for post interactions.
     Includes functionality for voting and saving posts.
+    Listing supports opt-in cursor pagination through `page_size`/`cursor`,
+    ranked feeds through `sort` (new, hot, top) and `window`
+    (day, week, all), topic feeds through `topics` (comma-separated ids),
+    and the newest comments of each post through
+    `include=comment_preview`.
+    List and retrieve payloads are served from a cache shared by all users.
+    Posts are searched by content through `search` (`q`), ranked by
+    relevance and combinable with `topics`, and fetched by ID in bulk
+    through `batch`. Votes and saves queued offline are applied through
+    `sync`.
     """
     queryset = Post.objects.all()
     serializer_class = PostSerializer
+    read_serializer_class = PostReadSerializer
+    read_actions = ('list', 'retrieve', 'search', 'batch')
+    pagination_class = PostCursorPagination
+    search_pagination_class = PostSearchPagination
     parser_classes = (MultiPartParser, FormParser)
     authentication_classes = (SessionAuthentication,)
     permission_classes = [IsOwnerOrReadOnly]
     prefetch_related_fields = {
-        'comments',
-        'upvoted_by',
-        'downvoted_by',
         'topics'
     }
+    sort_orderings = {
+        'new': ('-created_at', '-id'),
+        'hot': ('-hot_score', '-id'),
+        'top': ('-top_score', '-id'),
+    }
+    feed_windows = {
+        'day': timedelta(days=1),
+        'week': timedelta(weeks=1),
+        'all': None,
+    }
+    topic_feed_ordering = ('-topic_created_at', '-id')
+    max_feed_topics = 20
+    max_search_length = 200
+    list_includes = ('comment_preview',)
+    comment_preview_size = 3
+
+    def get_queryset(self) -> QuerySet[Post]:
+        """
+        Get the post queryset, restricted to the requested time window
+        and ordered by the requested sort when listing, restricted to
+        the posts matching the search text when searching, as flat rows
+        when listing, retrieving or searching.
+
+        Returns:
+            QuerySet: Posts for the current action
+        """
+        queryset = super().get_queryset()
+
+        if self.action == 'list':
+            window = self.get_window()
+            if window is not None:
+                queryset = queryset.filter(
+                    created_at__gte=timezone.now() - window
+                )
+
+            queryset = self.filter_topics(queryset, self.get_topic_ids())
+            queryset = queryset.order_by(*self.get_ordering())
+
+        if self.action == 'search':
+            queryset = search_posts(queryset, self.get_search_text())
+            queryset = self.filter_topics(queryset, self.get_topic_ids())
+            queryset = queryset.order_by(*self.get_ordering())
+
+        if self.action in self.read_actions:
+            queryset = self.get_read_queryset(queryset)
+
+        return queryset
+
+    def get_serializer_context(self) -> dict:
+        """
+        Add the number of comments to preview per post to the serializer
+        context, when listing with `include=comment_preview`.
+
+        Returns:
+            dict: Serializer context
+        """
+        context = super().get_serializer_context()
+
+        if self.action == 'list' and 'comment_preview' in self.get_includes():
+            context['comment_preview_size'] = self.comment_preview_size
+
+        return context
+
+    def get_includes(self) -> List[str]:
+        """
+        Get the optional payload parts selected by the `include`
+        query parameter.
+
+        Returns:
+            List[str]: Included parts, empty when none are requested
+
+        Raises:
+            ValidationError: If a part is not supported
+        """
+        value = self.request.query_params.get('include', '')
+        includes = [part.strip() for part in value.split(',') if part.strip()]
+
+        for include in includes:
+            if include not in self.list_includes:
+                raise ValidationError({
+                    'include': 'Must be one of: '
+                               f"{', '.join(self.list_includes)}."
+                })
+
+        return includes
+
+    def get_serializer_class(self) -> Type[BaseSerializer]:
+        """
+        Get the flat read serializer when listing or retrieving posts.
+
+        Returns:
+            Type[BaseSerializer]: Serializer class to use
+        """
+        if self.action in self.read_actions:
+            return self.read_serializer_class
+
+        return super().get_serializer_class()
+
+    def filter_topics(
+        self,
+        queryset: QuerySet,
+        topic_ids: List[UUID]
+    ) -> QuerySet:
+        """
+        Restrict the feed to posts having any of the given topics.
+
+        A single topic is joined directly, since a post has each topic
+        once, exposing the topic feed index columns for ordering.
+        Several topics are matched with a semi-join so posts under more
+        than one of them are not repeated.
+
+        Args:
+            queryset: Posts to filter
+            topic_ids: IDs of the topics to keep, if any
+
+        Returns:
+            QuerySet: Filtered posts
+        """
+        if not topic_ids:
+            return queryset
+
+        if len(topic_ids) == 1:
+            return queryset.filter(
+                post_topics__topic_id=topic_ids[0]
+            ).annotate(
+                topic_created_at=F('post_topics__post_created_at')
+            )
+
+        return queryset.filter(
+            Exists(
+                PostTopic.objects.filter(
+                    post_id=OuterRef('pk'),
+                    topic_id__in=topic_ids
+                )
+            )
+        )
+
+    def get_topic_ids(self) -> List[UUID]:
+        """
+        Get the topic IDs selected by the `topics` query parameter.
+
+        Returns:
+            List[UUID]: Distinct topic IDs, empty when not filtering
+
+        Raises:
+            ValidationError: If an ID is invalid or too many are given
+        """
+        value = self.request.query_params.get('topics', '')
+        topic_ids = []
+
+        for topic_id in filter(None, value.split(',')):
+            try:
+                topic_ids.append(UUID(topic_id.strip()))
+            except ValueError:
+                raise ValidationError({
+                    'topics': f'"{topic_id}" is not a valid topic id.'
+                })
+
+        topic_ids = list(dict.fromkeys(topic_ids))
+        if len(topic_ids) > self.max_feed_topics:
+            raise ValidationError({
+                'topics': f'At most {self.max_feed_topics} topics '
+                          'can be selected.'
+            })
+
+        return topic_ids
+
+    def get_ordering(self) -> Sequence[str]:
+        """
+        Get the feed ordering selected by the `sort` query parameter.
+        Ranked orderings read the stored, indexed post scores.
+        Search results are ordered by relevance.
+
+        Returns:
+            Sequence[str]: Ordering fields, ending with a unique one
+
+        Raises:
+            ValidationError: If the sort is not supported
+        """
+        if self.action == 'search':
+            return self.search_pagination_class.ordering
+
+        sort = self.request.query_params.get('sort', 'new')
+
+        if sort not in self.sort_orderings:
+            raise ValidationError({
+                'sort': f"Must be one of: {', '.join(self.sort_orderings)}."
+            })
+
+        if sort == 'new' and len(self.get_topic_ids()) == 1:
+            return self.topic_feed_ordering
+
+        return self.sort_orderings[sort]
+
+    def is_ranked_list(self) -> bool:
+        """
+        Tell whether the requested feed is ordered by ranking scores.
+
+        Returns:
+            bool: True for the hot and top feeds
+        """
+        return self.get_ordering() in (
+            self.sort_orderings['hot'],
+            self.sort_orderings['top'],
+        )
+
+    def get_window(self) -> Optional[timedelta]:
+        """
+        Get the feed time window selected by the `window` query parameter.
+
+        Returns:
+            timedelta | None: Maximum post age, or None for all posts
+
+        Raises:
+            ValidationError: If the window is not supported
+        """
+        window = self.request.query_params.get('window', 'all')
+
+        if window not in self.feed_windows:
+            raise ValidationError({
+                'window': f"Must be one of: {', '.join(self.feed_windows)}."
+            })
+
+        return self.feed_windows[window]
+
+    def get_search_text(self) -> str:
+        """
+        Get the search text given by the `q` query parameter.
+
+        Returns:
+            str: Search text, stripped
+
+        Raises:
+            ValidationError: If the text is missing or too long
+        """
+        text = self.request.query_params.get('q', '').strip()
+
+        if not text:
+            raise ValidationError({'q': 'A search text is required.'})
+
+        if len(text) > self.max_search_length:
+            raise ValidationError({
+                'q': f'At most {self.max_search_length} characters '
+                     'can be searched.'
+            })
+
+        return text
+
+    @action(detail=False, methods=['get'])
+    def search(self, request) -> Response:
+        """
+        Search posts by content, most relevant first.
+        Results are always paginated with a cursor over (rank, id).
+
+        Args:
+            request: Request object with the `q` search text and
+                optional `topics`, `page_size` and `cursor`
+
+        Returns:
+            Response: Page of matching posts and the next page link
+        """
+        paginator = self.search_pagination_class()
+        page = paginator.paginate_queryset(
+            self.get_queryset(),
+            request,
+            view=self
+        )
+        serializer = self.get_serializer(page, many=True)
+
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        parser_classes=[JSONParser, FormParser, MultiPartParser]
+    )
+    def batch(self, request) -> Response:
+        """
+        Fetch posts by ID, along with the requesting user's actions,
+        in a single query.
+
+        Args:
+            request: Request object with the `ids` of the posts
+
+        Returns:
+            Response: Posts in request order, with a missing marker
+                in place of those that do not exist
+        """
+        serializer = PostBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        post_ids = serializer.validated_data['ids']
+
+        rows = self.get_queryset().filter(pk__in=post_ids).order_by()
+        posts = {
+            post['id']: post
+            for post in self.get_serializer(rows, many=True).data
+        }
+
+        return Response([
+            posts.get(str(post_id), {'id': str(post_id), 'missing': True})
+            for post_id in post_ids
+        ])
+
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[IsAuthenticated],
+        parser_classes=[JSONParser]
+    )
+    def sync(self, request) -> Response:
+        """
+        Apply the votes and saves queued by an offline client.
+        Operations set absolute states and are resolved with
+        last-write-wins on their `client_ts` (see posts.sync).
+
+        Args:
+            request: Request object with the `operations` to apply,
+                each with a `post_id`, an `action` (upvote, downvote,
+                unvote, save or unsave) and a `client_ts`
+
+        Returns:
+            Response: Final actions on each post, in request order,
+                with a missing marker in place of posts that do not exist
+        """
+        serializer = PostSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data['operations']
+
+        sync_actions(request.user.pk, operations)
+
+        post_ids = list(dict.fromkeys(
+            operation['post_id'] for operation in operations
+        ))
+        posts = self._annotate_user_actions(
+            Post.objects.filter(pk__in=post_ids).only(
+                'id', 'upvote_count', 'downvote_count', 'comment_count'
+            ),
+            request.user.pk
+        )
+        states = {
+            post.pk: {
+                'id': str(post.pk),
+                'actions': PostActionsSummarySerializer(post).data,
+            }
+            for post in posts
+        }
+
+        return Response([
+            states.get(post_id, {'id': str(post_id), 'missing': True})
+            for post_id in post_ids
+        ])
 
     @action(
         detail=True,
@@ -62,18 +456,7 @@ class PostViewSet(PostActionsMixin, viewsets.ModelViewSet):
         Returns:
             Response: Empty response with success status
         """
-        post: Post = self.get_object()
-        user: User = request.user
-
-        if user in post.downvoted_by.all():
-            post.downvoted_by.remove(user)
-
-        if user in post.upvoted_by.all():
-            post.upvoted_by.remove(user)
-        else:
-            post.upvoted_by.add(user)
-
-        return Response(status=status.HTTP_200_OK)
+        return self._toggle_vote(Vote.UPVOTE)
 
     @action(
         detail=True,
@@ -93,16 +476,34 @@ class PostViewSet(PostActionsMixin, viewsets.ModelViewSet):
         Returns:
             Response: Empty response with success status
         """
-        post: Post = self.get_object()
-        user: User = request.user
+        return self._toggle_vote(Vote.DOWNVOTE)
 
-        if user in post.upvoted_by.all():
-            post.upvoted_by.remove(user)
+    def _toggle_vote(self, value: int) -> Response:
+        """
+        Toggle the authenticated user's vote on the requested post.
+        Skips loading the post and its voters: the vote is flipped
+        directly in the database, or in the vote buffer when votes are
+        written behind (see posts.vote_buffer).
 
-        if user in post.downvoted_by.all():
-            post.downvoted_by.remove(user)
-        else:
-            post.downvoted_by.add(user)
+        Args:
+            value: Vote.UPVOTE or Vote.DOWNVOTE
+
+        Returns:
+            Response: Empty response with success status
+
+        Raises:
+            NotFound: If the post does not exist
+        """
+        try:
+            post_id = UUID(str(self.kwargs['pk']))
+        except ValueError:
+            raise NotFound
+
+        toggle = (
+            get_vote_buffer().toggle if is_vote_buffered() else toggle_vote
+        )
+        if toggle(post_id, self.request.user.pk, value) is None:
+            raise NotFound
 
         return Response(status=status.HTTP_200_OK)
 
@@ -116,6 +517,9 @@ class PostViewSet(PostActionsMixin, viewsets.ModelViewSet):
         Handle saving/unsaving of a post.
         POST: Saves the post for the authenticated user
         DELETE: Removes the post from user's saved posts
+        Skips loading the post and its savers: saves are inserted and
+        marked deleted directly, relying on the unique (post, user)
+        constraint. Unsaves are kept as tombstones for syncs (see Save).
 
         Args:
             request: Request object containing user data
@@ -123,23 +527,58 @@ class PostViewSet(PostActionsMixin, viewsets.ModelViewSet):
 
         Returns:
             Response: Empty response with success status
+
+        Raises:
+            NotFound: If the post does not exist
         """
-        post: Post = self.get_object()
+        try:
+            post_id = UUID(str(pk))
+        except ValueError:
+            raise NotFound
+
         user: User = request.user
+        posts = Post.objects.filter(pk=post_id)
 
         if request.method == 'POST':
-            if user not in post.saved_by.all():
-                post.saved_by.add(user)
-            else:
-                return Response(
-                    {'details': 'Post already saved'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+            if not posts.exists():
+                raise NotFound
+
+            try:
+                with transaction.atomic():
+                    Save.objects.create(post_id=post_id, user=user)
+            except IntegrityError:
+                # Either the (post, user) save exists, possibly unsaved,
+                # or the post was deleted since it was checked
+                saves = Save.objects.filter(post_id=post_id, user=user)
+
+                if saves.filter(deleted_at__isnull=False).update(
+                    saved_at=timezone.now(),
+                    deleted_at=None
+                ):
+                    return Response(status=status.HTTP_200_OK)
+
+                if saves.exists():
+                    return Response(
+                        {'details': 'Post already saved'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+                if not posts.exists():
+                    raise NotFound
+
+                raise
 
         if request.method == 'DELETE':
-            if user in post.saved_by.all():
-                post.saved_by.remove(user)
-            else:
+            deleted = Save.objects.filter(
+                post_id=post_id,
+                user=user,
+                deleted_at__isnull=True
+            ).update(deleted_at=timezone.now())
+
+            if not deleted:
+                if not posts.exists():
+                    raise NotFound
+
                 return Response(
                     {'details': 'Post not saved'},
                     status=status.HTTP_400_BAD_REQUEST
@@ -148,33 +587,176 @@ class PostViewSet(PostActionsMixin, viewsets.ModelViewSet):
         return Response(status=status.HTTP_200_OK)
 
 
+class SavedPostViewSet(PostActionsMixin):
+    """
+    ViewSet listing the authenticated user's saved posts,
+    most recently saved first.
+    Pages are read from the (user, saved_at) save index, with cursor
+    pagination over (saved_at, id).
+    """
+    queryset = Post.objects.all()
+    serializer_class = PostReadSerializer
+    read_serializer_class = PostReadSerializer
+    pagination_class = SavedPostCursorPagination
+    authentication_classes = (SessionAuthentication,)
+    permission_classes = [IsAuthenticated]
+    http_method_names = ['get']
+
+    def get_queryset(self) -> QuerySet:
+        """
+        Get the posts saved by the authenticated user as flat rows,
+        annotated with their save date and the user's actions.
+
+        Returns:
+            QuerySet: Saved posts, most recently saved first
+        """
+        queryset = super().get_queryset().filter(
+            saves__user_id=self.request.user.pk,
+            saves__deleted_at__isnull=True
+        ).annotate(
+            saved_at=F('saves__saved_at')
+        ).order_by(*self.pagination_class.ordering)
+
+        return self.get_read_queryset(queryset)
+
+
 class PostCommentViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing PostComment objects.
     Provides CRUD operations for comments on specific posts.
-    Comments are filtered by post_id from the URL.
+    Comments are filtered by post_id from the URL. Listing returns the
+    top-level comments, newest first, with opt-in cursor pagination
+    through `page_size`/`cursor` and their first replies through
+    `replies`; whole threads are read through `thread`.
     """
     serializer_class = PostCommentSerializer
+    pagination_class = CommentCursorPagination
+    thread_pagination_class = CommentThreadPagination
     authentication_classes = (SessionAuthentication,)
     permission_classes = [IsOwnerOrReadOnly]
+    max_reply_limit = 10
 
     def get_queryset(self) -> QuerySet[PostComment]:
         """
         Filter comments to only return those belonging to the specified post.
+        Authors are joined in the same query. Listed top-level comments
+        are read in order from the (post, created_at, id) comment
+        listing index.
 
         Returns:
             QuerySet: Filtered comments for the specified post
         """
-        return PostComment.objects.filter(post_id=self.kwargs['post_pk'])
+        queryset = PostComment.objects.filter(
+            post_id=self.kwargs['post_pk']
+        ).select_related(
+            'user'
+        )
+
+        if self.action == 'list':
+            queryset = queryset.filter(parent__isnull=True)
+
+        return queryset.order_by(*self.pagination_class.ordering)
+
+    def get_serializer_context(self) -> dict:
+        """
+        Add the post and the number of replies to list per comment
+        to the serializer context.
+
+        Returns:
+            dict: Serializer context
+        """
+        context = super().get_serializer_context()
+        context['post_id'] = self.kwargs.get('post_pk')
+
+        if self.action == 'list':
+            context['reply_limit'] = self.get_reply_limit()
+
+        return context
+
+    def get_reply_limit(self) -> int:
+        """
+        Get the number of replies to list under each comment,
+        requested through `replies`, within bounds.
+
+        Returns:
+            int: Number of replies, 0 to list none
+        """
+        try:
+            limit = int(self.request.query_params['replies'])
+        except (KeyError, ValueError):
+            return 0
+
+        return min(max(limit, 0), self.max_reply_limit)
 
     def perform_create(self, serializer) -> None:
         """
         Set the authenticated user and post_id when creating a new comment.
+        Runs in a transaction so the post comment and parent reply
+        counters stay in sync.
 
         Args:
             serializer: Validated serializer instance
         """
-        serializer.save(
-            user=self.request.user,
-            post_id=self.kwargs['post_pk']
+        with transaction.atomic():
+            serializer.save(
+                user=self.request.user,
+                post_id=self.kwargs['post_pk']
+            )
+
+    def perform_destroy(self, instance: PostComment) -> None:
+        """
+        Delete a comment and its replies along with their counter updates.
+
+        Args:
+            instance: Comment to delete
+        """
+        with transaction.atomic():
+            instance.delete()
+
+    @action(detail=True, methods=['get'])
+    def thread(self, request, post_pk=None, pk=None) -> Response:
+        """
+        Get a comment followed by all of its replies, depth-first with
+        sibling replies oldest first, read as one range of the
+        (post, path) thread index.
+
+        Args:
+            request: Request object with optional `page_size`
+                and `cursor`
+            post_pk: ID of the post
+            pk: ID of the comment heading the thread
+
+        Returns:
+            Response: Page of thread comments and the next page link
+        """
+        comment = self.get_object()
+
+        paginator = self.thread_pagination_class()
+        page = paginator.paginate_queryset(
+            PostComment.objects.subtree(comment).select_related('user'),
+            request,
+            view=self
         )
+        serializer = self.get_serializer(page, many=True)
+
+        return paginator.get_paginated_response(serializer.data)
+
+
+class MediaStorageStatusView(APIView):
+    """
+    View exposing the media storage circuit breaker to administrators,
+    for monitoring. Counters are kept per process.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request) -> Response:
+        """
+        Get the state and error counts of the media storage breaker.
+
+        Args:
+            request: Request object
+
+        Returns:
+            Response: Breaker state and counters of the serving process
+        """
+        return Response(storage_breaker.stats())
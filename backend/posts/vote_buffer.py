@@ -0,0 +1,425 @@
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+from .models import Post, Vote
+from .sync import apply_votes
+from .types import VoteState
+import atexit
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+BUFFER_INTERVAL: float = getattr(settings, 'POSTS_VOTE_BUFFER_INTERVAL', 0.25)
+
+# Vote of a user on a post: (stored value, buffered value, time of the
+# last toggle), values being Vote.UPVOTE, Vote.DOWNVOTE or 0 for none
+PendingVote = Tuple[int, int, datetime]
+VoteKey = Tuple[UUID, UUID]
+
+
+def is_enabled() -> bool:
+    """
+    Check whether votes are written behind through the vote buffer.
+
+    Returns:
+        bool: True if the POSTS_VOTE_BUFFER setting is on
+    """
+    return getattr(settings, 'POSTS_VOTE_BUFFER', False)
+
+
+def get_counter_deltas(stored: int, value: int) -> Tuple[int, int]:
+    """
+    Get the changes to a post's vote counters when a vote changes.
+
+    Args:
+        stored: Previous vote value, 0 for none
+        value: New vote value, 0 for none
+
+    Returns:
+        tuple: Changes to the (upvote, downvote) counters
+    """
+    return (
+        (value == Vote.UPVOTE) - (stored == Vote.UPVOTE),
+        (value == Vote.DOWNVOTE) - (stored == Vote.DOWNVOTE),
+    )
+
+
+class VoteBuffer:
+    """
+    Write-behind buffer of toggled votes, held in process memory.
+
+    Toggling a vote only reads the user's stored vote the first time the
+    pair is seen, then updates the buffered value in memory. A background
+    thread flushes the buffer every `interval` seconds, coalesced to the
+    latest value per (user, post), through a single set-based statement
+    for every post (see posts.sync.apply_votes). Until then, reads merge
+    the pending counter changes and user votes in.
+
+    Buffered votes are lost if the process dies before a flush, and other
+    processes only see them once flushed.
+    """
+
+    def __init__(self, interval: float = BUFFER_INTERVAL):
+        self.interval = interval
+        self._pending: Dict[VoteKey, PendingVote] = {}
+        self._flushing: Dict[VoteKey, PendingVote] = {}
+        # Pending (upvote, downvote) counter changes, by post ID
+        self._deltas: Dict[UUID, Tuple[int, int]] = {}
+        self._flushing_deltas: Dict[UUID, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._flushing)
+
+    def toggle(
+        self,
+        post_id: UUID,
+        user_id: UUID,
+        value: int
+    ) -> Optional[int]:
+        """
+        Toggle a user's vote on a post in the buffer.
+
+        Args:
+            post_id: ID of the post to vote on
+            user_id: ID of the voting user
+            value: Vote.UPVOTE or Vote.DOWNVOTE
+
+        Returns:
+            int | None: New vote value, 0 if the vote was removed,
+                or None if the post does not exist
+
+        Raises:
+            ValueError: If value is not a valid vote
+        """
+        if value not in (Vote.UPVOTE, Vote.DOWNVOTE):
+            raise ValueError(f"Invalid vote value: {value}")
+
+        key = (user_id, post_id)
+        with self._lock:
+            known = key in self._pending or key in self._flushing
+
+        loaded = 0
+        if not known:
+            vote = self._load_vote(post_id, user_id)
+            if vote is None:
+                return None
+            loaded = vote
+
+        with self._lock:
+            if key in self._pending:
+                stored, current, _ = self._pending[key]
+            elif key in self._flushing:
+                # Stored once the running flush commits
+                stored = current = self._flushing[key][1]
+            else:
+                stored = current = loaded
+
+            buffered = 0 if current == value else value
+            self._pending[key] = (stored, buffered, timezone.now())
+            self._add_deltas(
+                self._deltas,
+                post_id,
+                get_counter_deltas(current, buffered)
+            )
+
+        return buffered
+
+    def flush(self) -> int:
+        """
+        Write the buffered votes to the database.
+        The flushed votes stay pending until the write commits, and if
+        writing fails, they are kept for the next flush. Votes older than
+        the stored ones are discarded, and later toggles of them rebased
+        on the stored votes.
+
+        Returns:
+            int: Number of votes written
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._flushing, self._pending = self._pending, {}
+                self._flushing_deltas, self._deltas = self._deltas, {}
+
+            votes: List[VoteState] = [
+                {
+                    'user_id': user_id,
+                    'post_id': post_id,
+                    'value': value,
+                    'client_ts': toggled_at,
+                }
+                for (user_id, post_id), (stored, value, toggled_at)
+                in self._flushing.items()
+                if value != stored
+            ]
+
+            try:
+                with transaction.atomic():
+                    applied = apply_votes(votes)
+                    self._discard_skipped({
+                        (vote['user_id'], vote['post_id'])
+                        for vote in votes
+                    } - applied)
+                    # Dropped as the votes commit, so reads never count
+                    # them on top of the stored counters
+                    transaction.on_commit(self._clear_flushing)
+            except Exception:
+                with self._lock:
+                    self._requeue()
+                    self._flushing, self._flushing_deltas = {}, {}
+                raise
+
+            return len(applied)
+
+    def get_deltas(self, post_ids: Iterable[UUID]) -> Dict[UUID, int]:
+        """
+        Get the net vote changes pending on the given posts.
+
+        Args:
+            post_ids: IDs of the posts
+
+        Returns:
+            dict: Net vote change of the posts with pending votes
+        """
+        deltas = {}
+
+        with self._lock:
+            for post_id in post_ids:
+                upvotes, downvotes = 0, 0
+                for pending in (self._deltas, self._flushing_deltas):
+                    up, down = pending.get(post_id, (0, 0))
+                    upvotes, downvotes = upvotes + up, downvotes + down
+
+                if upvotes or downvotes:
+                    deltas[post_id] = upvotes - downvotes
+
+        return deltas
+
+    def get_votes(
+        self,
+        user_id: UUID,
+        post_ids: Iterable[UUID]
+    ) -> Dict[UUID, int]:
+        """
+        Get a user's pending votes on the given posts.
+
+        Args:
+            user_id: ID of the user
+            post_ids: IDs of the posts
+
+        Returns:
+            dict: Pending vote value (0 for none), by post ID
+        """
+        votes = {}
+
+        with self._lock:
+            for post_id in post_ids:
+                key = (user_id, post_id)
+                pending = self._pending.get(key) or self._flushing.get(key)
+                if pending is not None:
+                    votes[post_id] = pending[1]
+
+        return votes
+
+    def start(self) -> None:
+        """Start flushing the buffer in a background thread."""
+        self._thread = threading.Thread(
+            target=self._run,
+            name='vote-buffer-flusher',
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread, once it flushed the buffer."""
+        self._stopped.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """Flush the buffer every interval until stopped."""
+        while not self._stopped.wait(self.interval):
+            self._flush_in_background()
+
+        self._flush_in_background()
+        connection.close()
+
+    def _flush_in_background(self) -> None:
+        """Flush the buffer, logging errors instead of raising them."""
+        if not len(self):
+            return
+
+        close_old_connections()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Error flushing buffered votes')
+
+    def _load_vote(self, post_id: UUID, user_id: UUID) -> Optional[int]:
+        """
+        Load a user's stored vote on a post.
+
+        Args:
+            post_id: ID of the post
+            user_id: ID of the user
+
+        Returns:
+            int | None: Vote value, 0 for none, or None if the post
+                does not exist
+        """
+        row = Post.objects.filter(pk=post_id).values_list(
+            'pk',
+            Subquery(
+                Vote.objects.filter(
+                    post_id=OuterRef('pk'),
+                    user_id=user_id
+                ).values_list('value')[:1]
+            )
+        ).first()
+
+        if row is None:
+            return None
+
+        return row[1] or 0
+
+    def _discard_skipped(self, skipped: Set[VoteKey]) -> None:
+        """
+        Drop the flushed votes that were not applied, a newer vote being
+        stored, along with their counter changes.
+
+        Args:
+            skipped: (user ID, post ID) pairs of the votes not applied
+        """
+        stored = {
+            key: self._load_vote(key[1], key[0]) or 0
+            for key in skipped
+        }
+
+        with self._lock:
+            for key, value in stored.items():
+                previous, flushed, _ = self._flushing.pop(key)
+                post_id = key[1]
+                self._add_deltas(
+                    self._flushing_deltas,
+                    post_id,
+                    get_counter_deltas(flushed, previous)
+                )
+
+                if key in self._pending:
+                    # Toggled from the flushed vote, now from the stored one
+                    _, current, toggled_at = self._pending[key]
+                    self._pending[key] = (value, current, toggled_at)
+                    self._add_deltas(
+                        self._deltas,
+                        post_id,
+                        get_counter_deltas(value, flushed)
+                    )
+
+    def _clear_flushing(self) -> None:
+        """Drop the votes of a committed flush from the buffer."""
+        with self._lock:
+            self._flushing, self._flushing_deltas = {}, {}
+
+    def _requeue(self) -> None:
+        """Merge the votes of a failed flush back into the buffer."""
+        for key, (stored, value, toggled_at) in self._flushing.items():
+            if key in self._pending:
+                # Later toggles were based on the value being flushed
+                _, value, toggled_at = self._pending[key]
+
+            self._pending[key] = (stored, value, toggled_at)
+
+        self._deltas = {}
+        for (_, post_id), (stored, value, _) in self._pending.items():
+            self._add_deltas(
+                self._deltas,
+                post_id,
+                get_counter_deltas(stored, value)
+            )
+
+    @staticmethod
+    def _add_deltas(
+        deltas: Dict[UUID, Tuple[int, int]],
+        post_id: UUID,
+        change: Tuple[int, int]
+    ) -> None:
+        """Add a counter change to the pending deltas of a post."""
+        up, down = deltas.get(post_id, (0, 0))
+        deltas[post_id] = (up + change[0], down + change[1])
+
+
+# Buffer shared by the threads of the process, created on first use
+_buffer: Optional[VoteBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_vote_buffer() -> VoteBuffer:
+    """
+    Get the process vote buffer, starting its flusher on first use.
+
+    Returns:
+        VoteBuffer: Vote buffer of the process
+    """
+    global _buffer
+
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = VoteBuffer()
+            _buffer.start()
+            atexit.register(_buffer.stop)
+
+    return _buffer
+
+
+def merge_pending_votes(
+    items: List[dict],
+    user_id: Optional[UUID] = None
+) -> List[dict]:
+    """
+    Merge the buffered votes into serialized posts.
+
+    Args:
+        items: Serialized posts, with their actions
+        user_id: ID of the requesting user, if authenticated
+
+    Returns:
+        list: Copies of the posts with pending votes counted
+    """
+    if _buffer is None or not len(_buffer):
+        return items
+
+    post_ids = [UUID(item['id']) for item in items if 'actions' in item]
+    deltas = _buffer.get_deltas(post_ids)
+    votes = _buffer.get_votes(user_id, post_ids) if user_id else {}
+
+    if not deltas and not votes:
+        return items
+
+    merged = []
+    for item in items:
+        if 'actions' not in item:
+            merged.append(item)
+            continue
+
+        post_id = UUID(item['id'])
+        actions = {
+            **item['actions'],
+            'votes': item['actions']['votes'] + deltas.get(post_id, 0),
+        }
+        if post_id in votes:
+            actions['is_upvoted'] = votes[post_id] == Vote.UPVOTE
+            actions['is_downvoted'] = votes[post_id] == Vote.DOWNVOTE
+
+        merged.append({**item, 'actions': actions})
+
+    return merged
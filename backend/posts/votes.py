@@ -0,0 +1,110 @@
+from django.db import connection, transaction
+from typing import Dict, Optional, Tuple, Union
+from uuid import UUID
+from .models import Post, Vote
+from . import cache
+import uuid
+
+LOCK_POST_SQL = """
+    SELECT 1 FROM {posts} WHERE id = %(post_id)s FOR NO KEY UPDATE
+"""
+
+TOGGLE_VOTE_SQL = """
+    WITH previous AS (
+        SELECT value FROM {votes}
+        WHERE user_id = %(user_id)s AND post_id = %(post_id)s
+    ), toggled AS (
+        INSERT INTO {votes} AS vote (
+            id, user_id, post_id, value, created_at, updated_at
+        )
+        VALUES (%(id)s, %(user_id)s, %(post_id)s, %(value)s, NOW(), NOW())
+        ON CONFLICT (user_id, post_id) DO UPDATE SET
+            value = CASE
+                WHEN vote.value = EXCLUDED.value THEN 0
+                ELSE EXCLUDED.value
+            END,
+            updated_at = NOW()
+        RETURNING value
+    ), changes AS (
+        SELECT value, -1 AS delta FROM previous
+        UNION ALL SELECT value, 1 FROM toggled
+    )
+    UPDATE {posts} SET
+        upvote_count = GREATEST(
+            upvote_count + (
+                SELECT COALESCE(SUM(delta), 0) FROM changes
+                WHERE value = %(upvote)s
+            ),
+            0
+        ),
+        downvote_count = GREATEST(
+            downvote_count + (
+                SELECT COALESCE(SUM(delta), 0) FROM changes
+                WHERE value = %(downvote)s
+            ),
+            0
+        )
+    WHERE id = %(post_id)s
+    RETURNING upvote_count, downvote_count
+"""
+
+
+def toggle_vote(
+    post_id: UUID,
+    user_id: UUID,
+    value: int
+) -> Optional[Tuple[int, int]]:
+    """
+    Toggle a user's vote on a post in a constant number of statements.
+
+    Clears the vote if it was already cast, switches it if it was cast
+    the other way, or adds it otherwise, updating the post counters in
+    the same statement. Cleared votes are kept as tombstones with a value
+    of 0 (see Vote). The post row is locked first so concurrent votes
+    on a post always acquire their locks in the same order and cannot
+    deadlock, and the stored vote read before the upsert cannot change
+    underneath it. The ranking scores
+    are refreshed from the new counters while the post is still locked,
+    and the post's cached payloads are invalidated.
+
+    Args:
+        post_id: ID of the post to vote on
+        user_id: ID of the voting user
+        value: Vote.UPVOTE or Vote.DOWNVOTE
+
+    Returns:
+        tuple | None: Updated (upvote_count, downvote_count),
+            or None if the post does not exist
+
+    Raises:
+        ValueError: If value is not a valid vote
+    """
+    if value not in (Vote.UPVOTE, Vote.DOWNVOTE):
+        raise ValueError(f"Invalid vote value: {value}")
+
+    quote = connection.ops.quote_name
+    tables = {
+        'posts': quote(Post._meta.db_table),
+        'votes': quote(Vote._meta.db_table),
+    }
+    params: Dict[str, Union[UUID, int]] = {
+        'id': uuid.uuid4(),
+        'post_id': post_id,
+        'user_id': user_id,
+        'value': value,
+        'upvote': Vote.UPVOTE,
+        'downvote': Vote.DOWNVOTE,
+    }
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(LOCK_POST_SQL.format(**tables), params)
+        if cursor.fetchone() is None:
+            return None
+
+        cursor.execute(TOGGLE_VOTE_SQL.format(**tables), params)
+        counters = cursor.fetchone()
+
+        Post.objects.filter(pk=post_id).refresh_scores()
+        cache.invalidate([post_id])
+
+        return counters
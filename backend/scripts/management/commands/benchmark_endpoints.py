@@ -0,0 +1,496 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from posts.models import Topic, Post, PostTopic, PostComment, Vote
+from posts.sync import SYNC_ACTIONS
+from datetime import timedelta
+from pathlib import Path
+from statistics import quantiles
+from typing import Any, Callable, Dict, List, Tuple
+from tqdm import tqdm
+import json
+import random
+import time
+import tracemalloc
+
+BUDGETS_PATH = Path(__file__).resolve().parents[2] / 'benchmark_budgets.json'
+
+DATASETS = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+METRICS = ('queries', 'rows', 'p50_ms', 'p95_ms', 'peak_kb')
+
+Scenario = Callable[[APIClient, random.Random], Any]
+
+
+class QueryCounter:
+    """Database execute wrapper counting queries and the rows they return."""
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        self.queries += 1
+        self.rows += max(context['cursor'].rowcount, 0)
+        return result
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds a benchmark database and checks the query count, rows '
+        'fetched, latency and peak memory of the API against budgets'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dataset',
+            choices=list(DATASETS),
+            default='10k',
+            help='Number of seeded posts',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Number of timed requests per endpoint',
+        )
+        parser.add_argument(
+            '--budgets',
+            type=Path,
+            default=BUDGETS_PATH,
+            help='JSON file with the budgets of each dataset',
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Keep the seeded database between runs',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed of the generated data and requests',
+        )
+
+    def handle(self, *args, **kwargs):
+        dataset: str = kwargs['dataset']
+        count: int = kwargs['requests']
+        keepdb: bool = kwargs['keepdb']
+        rng = random.Random(kwargs['seed'])
+
+        budgets = json.loads(kwargs['budgets'].read_text())[dataset]
+
+        database = f"{settings.DATABASES['default']['NAME']}_bench_{dataset}"
+        connection.settings_dict['TEST']['NAME'] = database
+        old_name = connection.settings_dict['NAME']
+
+        connection.creation.create_test_db(
+            verbosity=0,
+            autoclobber=True,
+            keepdb=keepdb
+        )
+        try:
+            if not Post.objects.exists():
+                self.seed(DATASETS[dataset], rng)
+
+            # Roll writes back so kept databases stay as seeded
+            with transaction.atomic():
+                results = self.run_scenarios(count, rng)
+                transaction.set_rollback(True)
+        finally:
+            connection.creation.destroy_test_db(
+                old_name,
+                verbosity=0,
+                keepdb=keepdb
+            )
+
+        self.report(dataset, results, budgets)
+
+    def seed(self, post_count: int, rng: random.Random) -> None:
+        """
+        Seed users, topics, posts, post topics, votes, saves and comments,
+        with their denormalized counters set up front.
+
+        Args:
+            post_count: Number of posts to create
+            rng: Random generator of the data
+        """
+        batch_size = 5000
+        users = User.objects.bulk_create([
+            User(username=f'user{index}', email=f'user{index}@example.com')
+            for index in range(max(post_count // 20, 50))
+        ], batch_size=batch_size)
+        topics = Topic.objects.bulk_create([
+            Topic(name=f'Topic {index}') for index in range(10)
+        ])
+
+        for start in tqdm(
+            range(0, post_count, batch_size),
+            desc='Seeding posts',
+            unit='batch'
+        ):
+            size = min(batch_size, post_count - start)
+            posts = [
+                Post(user=rng.choice(users), content=f'Post {start + index}')
+                for index in range(size)
+            ]
+
+            votes, comments, saves = [], [], []
+            for post in posts:
+                for voter in rng.sample(users, rng.randint(0, 4)):
+                    if rng.random() < 0.7:
+                        vote = Vote(user=voter, post=post, value=Vote.UPVOTE)
+                        post.upvote_count += 1
+                    else:
+                        vote = Vote(user=voter, post=post, value=Vote.DOWNVOTE)
+                        post.downvote_count += 1
+                    votes.append(vote)
+
+                # The second comment of a post replies to the first
+                post.comment_count = rng.randint(0, 2)
+                parent = None
+                for _ in range(post.comment_count):
+                    comment = PostComment(
+                        user=rng.choice(users),
+                        post=post,
+                        parent=parent,
+                        content='Comment'
+                    )
+                    comment.path = comment.build_path()
+                    comments.append(comment)
+                    if parent is not None:
+                        parent.reply_count += 1
+                    parent = comment
+
+                if rng.random() < 0.5:
+                    saves.append(Post.saved_by.through(
+                        post=post,
+                        user=rng.choice(users)
+                    ))
+
+            Post.objects.bulk_create(posts)
+            PostTopic.objects.bulk_create([
+                PostTopic(
+                    post=post,
+                    topic=topic,
+                    post_created_at=post.created_at
+                )
+                for post in posts
+                for topic in rng.sample(topics, rng.randint(1, 3))
+            ])
+            Vote.objects.bulk_create(votes)
+            PostComment.objects.bulk_create(comments)
+            Post.saved_by.through.objects.bulk_create(saves)
+
+        Post.objects.refresh_scores()
+        for topic in topics:
+            topic.post_count = PostTopic.objects.filter(topic=topic).count()
+        Topic.objects.bulk_update(topics, ['post_count'])
+
+    def get_scenarios(self, rng: random.Random) -> Dict[str, Scenario]:
+        """
+        Get the benchmarked requests, by name.
+
+        Args:
+            rng: Random generator of the requested objects
+
+        Returns:
+            dict: Callables sending one request with a client
+        """
+        post_ids = rng.sample(
+            list(Post.objects.order_by('pk').values_list('pk', flat=True)),
+            1000
+        )
+        thread_ids = rng.sample(
+            list(PostComment.objects.filter(
+                parent__isnull=True
+            ).order_by('pk').values_list('post_id', 'pk')),
+            1000
+        )
+        users = rng.sample(list(User.objects.order_by('pk')), 100)
+        post_numbers = range(Post.objects.count())
+        topic_ids = list(Topic.objects.order_by('pk').values_list(
+            'pk',
+            flat=True
+        ))
+
+        def as_user(client: APIClient, rng: random.Random) -> User:
+            user = rng.choice(users)
+            client.force_authenticate(user=user)
+            return user
+
+        def feed(client, rng):
+            return client.get('/api/posts/', {'page_size': 20})
+
+        def feed_hot(client, rng):
+            as_user(client, rng)
+            return client.get(
+                '/api/posts/',
+                {'page_size': 20, 'sort': 'hot', 'window': 'week'}
+            )
+
+        def feed_topic(client, rng):
+            return client.get(
+                '/api/posts/',
+                {'page_size': 20, 'topics': rng.choice(topic_ids)}
+            )
+
+        def feed_preview(client, rng):
+            return client.get(
+                '/api/posts/',
+                {'page_size': 20, 'include': 'comment_preview'}
+            )
+
+        def search(client, rng):
+            return client.get(
+                '/api/posts/search/',
+                {'q': f'post {rng.choice(post_numbers)}', 'page_size': 20}
+            )
+
+        def detail(client, rng):
+            as_user(client, rng)
+            return client.get(f'/api/posts/{rng.choice(post_ids)}/')
+
+        def batch(client, rng):
+            as_user(client, rng)
+            ids = [str(post_id) for post_id in rng.sample(post_ids, 20)]
+            return client.post(
+                '/api/posts/batch/',
+                {'ids': ids},
+                format='json'
+            )
+
+        def vote(client, rng):
+            as_user(client, rng)
+            return client.post(f'/api/posts/{rng.choice(post_ids)}/upvote/')
+
+        def save(client, rng):
+            as_user(client, rng)
+            response = client.post(
+                f'/api/posts/{rng.choice(post_ids)}/save/'
+            )
+            return response if response.status_code != 400 else None
+
+        def sync(client, rng):
+            as_user(client, rng)
+            now = timezone.now()
+            operations = [
+                {
+                    'post_id': str(post_id),
+                    'action': rng.choice(SYNC_ACTIONS),
+                    'client_ts': (now - timedelta(seconds=index)).isoformat(),
+                }
+                for index, post_id in enumerate(rng.sample(post_ids, 20))
+            ]
+            return client.post(
+                '/api/posts/sync/',
+                {'operations': operations},
+                format='json'
+            )
+
+        def saved(client, rng):
+            as_user(client, rng)
+            return client.get('/api/users/me/saved/', {'page_size': 20})
+
+        def comments(client, rng):
+            return client.get(
+                f'/api/posts/{rng.choice(post_ids)}/comments/',
+                {'page_size': 20}
+            )
+
+        def comment_replies(client, rng):
+            return client.get(
+                f'/api/posts/{rng.choice(post_ids)}/comments/',
+                {'page_size': 20, 'replies': 3}
+            )
+
+        def thread(client, rng):
+            post_id, comment_id = rng.choice(thread_ids)
+            return client.get(
+                f'/api/posts/{post_id}/comments/{comment_id}/thread/'
+            )
+
+        def comment(client, rng):
+            as_user(client, rng)
+            return client.post(
+                f'/api/posts/{rng.choice(post_ids)}/comments/',
+                {'content': 'Benchmark comment'}
+            )
+
+        def user(client, rng):
+            return client.get(f'/api/users/{rng.choice(users).pk}/')
+
+        return {
+            'feed': feed,
+            'feed_hot': feed_hot,
+            'feed_topic': feed_topic,
+            'feed_preview': feed_preview,
+            'search': search,
+            'detail': detail,
+            'batch': batch,
+            'vote': vote,
+            'save': save,
+            'sync': sync,
+            'saved': saved,
+            'comments': comments,
+            'comment_replies': comment_replies,
+            'thread': thread,
+            'comment': comment,
+            'user': user,
+        }
+
+    def run_scenarios(
+        self,
+        count: int,
+        rng: random.Random
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Send the benchmarked requests and measure them.
+        Caches are cleared before every request, so the database path
+        is measured. Memory is traced in a separate pass, as tracing
+        slows requests down.
+
+        Args:
+            count: Number of timed requests per scenario
+            rng: Random generator of the requested objects
+
+        Returns:
+            dict: Worst query count, rows fetched and peak memory,
+                and p50/p95 latency of each scenario
+        """
+        results = {}
+
+        for name, scenario in tqdm(
+            self.get_scenarios(rng).items(),
+            desc='Benchmarking',
+            unit='endpoint'
+        ):
+            client = APIClient()
+            timings: List[float] = []
+            queries: List[int] = []
+            rows: List[int] = []
+
+            while len(timings) < count:
+                measured, elapsed = self.measure(client, scenario, rng)
+                if measured is None:
+                    continue
+
+                timings.append(elapsed * 1000)
+                queries.append(measured[0])
+                rows.append(measured[1])
+
+            peak = 0
+            tracemalloc.start()
+            for _ in range(5):
+                cache.clear()
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                scenario(client, rng)
+                peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+            tracemalloc.stop()
+
+            percentiles = quantiles(timings, n=100)
+            results[name] = {
+                'queries': max(queries),
+                'rows': max(rows),
+                'p50_ms': round(percentiles[49], 2),
+                'p95_ms': round(percentiles[94], 2),
+                'peak_kb': round(peak / 1024, 1),
+            }
+
+        return results
+
+    def measure(
+        self,
+        client: APIClient,
+        scenario: Scenario,
+        rng: random.Random
+    ) -> Tuple[Tuple[int, int] | None, float]:
+        """
+        Send one request, counting its queries and rows.
+
+        Args:
+            client: API client to send the request with
+            scenario: Callable sending the request
+            rng: Random generator of the requested object
+
+        Returns:
+            tuple: (query count, rows fetched), or None if the request
+                was skipped, and the request duration in seconds
+
+        Raises:
+            CommandError: If the request failed
+        """
+        cache.clear()
+        counter = QueryCounter()
+
+        with connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            response = scenario(client, rng)
+            elapsed = time.perf_counter() - start
+
+        if response is None:
+            return None, elapsed
+
+        if response.status_code >= 400:
+            raise CommandError(
+                f'{response.request["PATH_INFO"]} failed with status '
+                f'{response.status_code}'
+            )
+
+        return (counter.queries, counter.rows), elapsed
+
+    def report(
+        self,
+        dataset: str,
+        results: Dict[str, Dict[str, float]],
+        budgets: Dict[str, Dict[str, float]]
+    ) -> None:
+        """
+        Print the measurements and fail on budgets exceeded.
+
+        Args:
+            dataset: Name of the benchmarked dataset
+            results: Measurements of each scenario
+            budgets: Budgets of each scenario
+
+        Raises:
+            CommandError: If any measurement is over its budget
+        """
+        failures: List[str] = []
+
+        self.stdout.write(f'\nDataset {dataset}:')
+        self.stdout.write(f"{'endpoint':<12}" + ''.join(
+            f'{metric:>18}' for metric in METRICS
+        ))
+
+        for name, measured in results.items():
+            cells = []
+            for metric in METRICS:
+                budget = budgets.get(name, {}).get(metric)
+                cells.append(f'{measured[metric]:>9} / {budget!s:>6}')
+
+                if budget is not None and measured[metric] > budget:
+                    failures.append(
+                        f'{name} {metric}: {measured[metric]} > {budget}'
+                    )
+
+            self.stdout.write(f'{name:<12}' + ''.join(
+                f'{cell:>18}' for cell in cells
+            ))
+
+        if failures:
+            raise CommandError(
+                'Budgets exceeded:\n' + '\n'.join(failures)
+            )
+
+        self.stdout.write(self.style.SUCCESS('\nAll budgets met'))
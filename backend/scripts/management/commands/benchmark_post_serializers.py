@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from posts.models import Post
+from posts.serializers import PostSerializer, PostReadSerializer
+from typing import Any, Callable
+import time
+
+
+class Command(BaseCommand):
+    help = 'Compares the throughput of the post model and read serializers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=1000,
+            help='Number of existing posts serialized per run',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of runs per serializer, the best one is reported',
+        )
+
+    def handle(self, *args, **kwargs):
+        limit: int = kwargs['posts']
+        repeat: int = kwargs['repeat']
+
+        posts = Post.objects.order_by('-created_at', '-id')[:limit]
+
+        def serialize_instances() -> Any:
+            queryset = posts.select_related('user').prefetch_related('topics')
+            return PostSerializer(queryset, many=True).data
+
+        def serialize_rows() -> Any:
+            queryset = posts.values(*PostReadSerializer.columns)
+            return PostReadSerializer(queryset, many=True).data
+
+        renderer = JSONRenderer()
+        expected = renderer.render(serialize_instances())
+        if renderer.render(serialize_rows()) != expected:
+            raise CommandError('Serializers rendered different JSON')
+
+        rows = len(posts)
+        if not rows:
+            raise CommandError('No posts to serialize')
+
+        for name, serialize in (
+            ('PostSerializer', serialize_instances),
+            ('PostReadSerializer', serialize_rows),
+        ):
+            elapsed = self.measure(serialize, repeat)
+            self.stdout.write(
+                f'{name}: {rows} rows in {elapsed * 1000:.1f} ms '
+                f'({rows / elapsed:,.0f} rows/s)'
+            )
+
+    def measure(self, serialize: Callable[[], Any], repeat: int) -> float:
+        """
+        Measure the best time to fetch and serialize the posts.
+
+        Args:
+            serialize: Callable fetching and serializing the posts
+            repeat: Number of runs
+
+        Returns:
+            float: Best run duration, in seconds
+        """
+        timings = []
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            serialize()
+            timings.append(time.perf_counter() - start)
+
+        return min(timings)
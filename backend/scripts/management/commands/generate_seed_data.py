@@ -1,141 +1,520 @@
-from django.core.management.base import BaseCommand
-from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+from datetime import timedelta
 from faker import Faker
+from PIL import Image, ImageDraw
 from accounts.models import User
-from posts.models import Topic, Post, PostComment
-import random
-import requests
-from typing import List
+from posts.models import (
+    MAX_COMMENT_DEPTH,
+    ImageModel,
+    Topic,
+    Post,
+    PostTopic,
+    PostComment,
+    Vote,
+)
+from posts import cache
+from posts.images import store_variants
+from typing import Any, Dict, List, Tuple
+from uuid import UUID
 from tqdm import tqdm
+import io
+import multiprocessing
+import os
+import random
 
+TOPIC_NAMES = [
+    "📚 Education", "🎬 Entertainment", "👗 Fashion",
+    "💰 Finance & Investing", "🍽️ Food & Cooking",
+    "🏥 Health & Wellness", "🌿 Lifestyle", "⚽ Sports",
+    "💻 Technology", "✈️ Travel"
+]
 
-class Command(BaseCommand):
-    help = 'Generates fake data for testing'
-
-    def __init__(self):
-        super().__init__()
-        self.faker = Faker()
-
-    def get_random_image(self) -> SimpleUploadedFile | None:
-        """Get a random image from picsum.photos"""
-        width = random.randint(400, 800)
-        height = random.randint(400, 800)
-        url = f"https://picsum.photos/{width}/{height}"
-        response = requests.get(url)
-        if response.status_code == 200:
-            return SimpleUploadedFile(
-                name=f"random_image_{random.randint(1, 1000)}.jpg",
-                content=response.content,
-                content_type='image/jpeg'
-            )
-        return None
-
-    def create_users(self, count: int) -> List[User]:
-        """Create fake users"""
-        users = []
-        for _ in tqdm(range(count), desc="Creating users", unit="user"):
-            username = self.faker.user_name()
-            while User.objects.filter(username=username).exists():
-                username = self.faker.user_name()
-
-            email = self.faker.email()
-            while User.objects.filter(email=email).exists():
-                email = self.faker.email()
-
-            user = User.objects.create(
-                username=username,
-                email=email,
-                password='testpass123'
-            )
-            users.append(user)
-        return users
+TEXT_POOL_SIZE = 500
 
-    def create_topics(self) -> List[Topic]:
-        """Create fake topics"""
-        topics = []
-        topic_names = [
-            "📚 Education", "🎬 Entertainment", "👗 Fashion",
-            "💰 Finance & Investing", "🍽️ Food & Cooking",
-            "🏥 Health & Wellness", "🌿 Lifestyle", "⚽ Sports",
-            "💻 Technology", "✈️ Travel"
-        ]
-        for topic_name in tqdm(
-            topic_names,
-            desc="Creating topics",
-            unit="topic"
-        ):
-            topic, _ = Topic.objects.get_or_create(name=topic_name)
-            topics.append(topic)
-        return topics
+# Seed data shared with forked workers
+_context: Dict[str, Any] = {}
 
-    def create_posts(
-        self,
-        users: List[User],
-        topics: List[Topic],
-        count: int
-    ) -> List[Post]:
-        """Create fake posts"""
-        posts = []
-        for _ in tqdm(range(count), desc="Creating posts", unit="post"):
-            # 30% chance of having an image
-            image = self.get_random_image() if random.random() < 0.3 else None
-
-            post = Post.objects.create(
-                user=random.choice(users),
-                content=self.faker.text(max_nb_chars=500),
-                image=image
-            )
 
-            # Add 1-3 random topics
-            post_topics = random.sample(topics, random.randint(1, 3))
-            post.topics.set(post_topics)
+def split(total: int, chunk_size: int) -> List[Tuple[int, int, int]]:
+    """
+    Split a row count into chunks.
 
-            # Add random votes
-            voters = random.sample(users, random.randint(0, len(users)//2))
-            for voter in voters:
-                if random.random() < 0.7:  # 70% chance of upvote
-                    post.upvoted_by.add(voter)
-                else:
-                    post.downvoted_by.add(voter)
+    Args:
+        total: Number of rows
+        chunk_size: Maximum number of rows per chunk
 
-            # Add random saves
-            savers = random.sample(users, random.randint(0, len(users)//4))
-            post.saved_by.set(savers)
+    Returns:
+        list: (chunk index, first row, row count) of each chunk
+    """
+    return [
+        (index, start, min(chunk_size, total - start))
+        for index, start in enumerate(range(0, total, chunk_size))
+    ]
 
-            posts.append(post)
-        return posts
 
-    def create_comments(
-        self,
-        users: List[User],
-        posts: List[Post],
-        count: int
+def share(total: int, part: Tuple[int, int], whole: int) -> int:
+    """
+    Get the share of a total matching a part of a whole,
+    rounded so the shares of consecutive parts add up to the total.
+
+    Args:
+        total: Amount to share
+        part: Tuple of the first unit and number of units of the part
+        whole: Number of units of the whole
+
+    Returns:
+        int: Share of the part
+    """
+    start, count = part
+    return (total * (start + count)) // whole - (total * start) // whole
+
+
+def make_uuid(rng: random.Random) -> UUID:
+    """Generate a reproducible random UUID."""
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+def attach_image(instance: ImageModel, content: bytes, directory: str) -> None:
+    """
+    Store a copy of a placeholder image as the image of a post or
+    comment, along with its variants and metadata, as processed uploads
+    end up, so each row owns its files.
+
+    Args:
+        instance: Unsaved post or comment
+        content: Encoded placeholder image
+        directory: Directory of the model's uploads
+    """
+    storage = instance.image.storage
+    name = storage.save(
+        os.path.join(directory, f'{instance.pk}.jpg'),
+        ContentFile(content)
+    )
+
+    with Image.open(io.BytesIO(content)) as image:
+        instance.image = name
+        instance.image_width, instance.image_height = image.size
+        instance.image_size = len(content)
+        instance.image_variants = store_variants(
+            storage,
+            name,
+            image,
+            image.format
+        )
+
+
+def seed_users(chunk: Tuple[int, int, int]) -> int:
+    """
+    Create a chunk of users with unique usernames and emails.
+
+    Args:
+        chunk: (chunk index, first user, user count)
+
+    Returns:
+        int: Number of created users
+    """
+    index, start, count = chunk
+    # Existing users are mixed in so reruns do not reuse primary keys
+    seed = f"{_context['seed']}:users:{_context['user_offset']}:{index}"
+    rng = random.Random(seed)
+    faker = Faker()
+    faker.seed_instance(seed)
+
+    # Usernames are numbered after existing users to keep them unique
+    offset = _context['user_offset']
+
+    users = []
+    for number in range(offset + start, offset + start + count):
+        username = f'{faker.user_name()[:40]}{number}'
+        users.append(User(
+            id=make_uuid(rng),
+            username=username,
+            email=f'{username}@{faker.free_email_domain()}',
+            password=_context['password'],
+        ))
+
+    User.objects.bulk_create(users, batch_size=_context['batch_size'])
+
+    return count
+
+
+def seed_posts(chunk: Tuple[int, int, int]) -> Counter:
+    """
+    Create a chunk of posts along with their share of topics, votes,
+    saves and comments, with denormalized counters and scores.
+
+    Args:
+        chunk: (chunk index, first post, post count)
+
+    Returns:
+        Counter: Number of posts created under each topic ID
+    """
+    index, start, count = chunk
+    options = _context
+    # Existing posts are mixed in so reruns do not reuse primary keys
+    seed = f"{options['seed']}:posts:{options['post_offset']}:{index}"
+    rng = random.Random(seed)
+    faker = Faker()
+    faker.seed_instance(seed)
+
+    user_ids: List[UUID] = options['user_ids']
+    topic_ids: List[UUID] = options['topic_ids']
+    images: List[bytes] = options['images']
+    now = options['now']
+    spread = options['days'] * 24 * 60 * 60
+
+    # Generating text is the slowest part, so each chunk draws from a pool
+    texts = [faker.text(max_nb_chars=500) for _ in range(TEXT_POOL_SIZE)]
+
+    posts: List[Post] = []
+    for _ in range(count):
+        post = Post(
+            id=make_uuid(rng),
+            user_id=rng.choice(user_ids),
+            content=rng.choice(texts),
+        )
+        if images and rng.random() < options['post_image_ratio']:
+            attach_image(post, rng.choice(images), 'posts')
+
+        post.created_at = now - timedelta(seconds=rng.randint(0, spread))
+        posts.append(post)
+
+    votes: Dict[Tuple[UUID, int], int] = {}
+    for _ in range(share(options['votes'], (start, count), options['posts'])):
+        key = (rng.choice(user_ids), rng.randrange(count))
+        # 70% chance of upvote
+        votes[key] = Vote.UPVOTE if rng.random() < 0.7 else Vote.DOWNVOTE
+
+    saves = {
+        (rng.choice(user_ids), rng.randrange(count))
+        for _ in range(
+            share(options['saves'], (start, count), options['posts'])
+        )
+    }
+
+    comments = []
+    threads: Dict[int, List[PostComment]] = {}
+    for _ in range(
+        share(options['comments'], (start, count), options['posts'])
     ):
-        """Create fake comments"""
-        for _ in tqdm(range(count), desc="Creating comments", unit="comment"):
-            # 20% chance of having an image
-            image = self.get_random_image() if random.random() < 0.2 else None
-
-            PostComment.objects.create(
-                user=random.choice(users),
-                post=random.choice(posts),
-                content=self.faker.text(max_nb_chars=500),
-                image=image
+        post_index = rng.randrange(count)
+        post = posts[post_index]
+        post.comment_count += 1
+
+        # Replies go to an earlier comment of the same post
+        thread = threads.setdefault(post_index, [])
+        parent = (
+            rng.choice(thread)
+            if thread and rng.random() < options['reply_ratio']
+            else None
+        )
+        if parent is not None and parent.depth >= MAX_COMMENT_DEPTH:
+            parent = None
+
+        comment = PostComment(
+            id=make_uuid(rng),
+            user_id=rng.choice(user_ids),
+            post=post,
+            parent=parent,
+            content=rng.choice(texts),
+        )
+        if images and rng.random() < options['comment_image_ratio']:
+            attach_image(
+                comment,
+                rng.choice(images),
+                os.path.join('posts', 'comments')
             )
 
+        comment.path = comment.build_path()
+        if parent is not None:
+            parent.reply_count += 1
+
+        thread.append(comment)
+        comments.append(comment)
+
+    for (_, post_index), value in votes.items():
+        if value == Vote.UPVOTE:
+            posts[post_index].upvote_count += 1
+        else:
+            posts[post_index].downvote_count += 1
+
+    topic_counts: Counter[UUID] = Counter()
+    batch_size = options['batch_size']
+
+    with transaction.atomic():
+        Post.objects.bulk_create(posts, batch_size=batch_size)
+
+        post_topics = []
+        for post in posts:
+            # Add 1-3 random topics
+            for topic_id in rng.sample(topic_ids, rng.randint(1, 3)):
+                topic_counts[topic_id] += 1
+                post_topics.append(PostTopic(
+                    post=post,
+                    topic_id=topic_id,
+                    post_created_at=post.created_at,
+                ))
+        PostTopic.objects.bulk_create(post_topics, batch_size=batch_size)
+
+        Vote.objects.bulk_create([
+            Vote(
+                id=make_uuid(rng),
+                user_id=user_id,
+                post=posts[post_index],
+                value=value
+            )
+            for (user_id, post_index), value in votes.items()
+        ], batch_size=batch_size)
+        Post.saved_by.through.objects.bulk_create([
+            Post.saved_by.through(
+                user_id=user_id,
+                post_id=posts[post_index].pk
+            )
+            for user_id, post_index in sorted(saves)
+        ], batch_size=batch_size)
+        PostComment.objects.bulk_create(comments, batch_size=batch_size)
+
+        Post.objects.filter(
+            pk__in=[post.pk for post in posts]
+        ).refresh_scores()
+
+    return topic_counts
+
+
+def close_connections() -> None:
+    """Close database connections inherited by a forked worker."""
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates deterministic fake data for development and load testing '
+        'with bulk inserts, parallel workers and local placeholder images'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=50,
+            help='Number of users to create',
+        )
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=100,
+            help='Number of posts to create',
+        )
+        parser.add_argument(
+            '--comments',
+            type=int,
+            default=200,
+            help='Number of comments to create',
+        )
+        parser.add_argument(
+            '--votes',
+            type=int,
+            default=1000,
+            help='Number of votes to cast, duplicate votes are dropped',
+        )
+        parser.add_argument(
+            '--saves',
+            type=int,
+            default=300,
+            help='Number of posts to save, duplicate saves are dropped',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Spread post creation dates over the last N days',
+        )
+        parser.add_argument(
+            '--images',
+            type=int,
+            default=10,
+            help='Number of placeholder images copied to posts and comments, '
+                 'each row storing its own file and variants, '
+                 '0 to skip images and media storage altogether',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed, the same seed generates the same data '
+                 'on the same database',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of parallel worker processes',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Number of users or posts created by a worker at a time',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Number of rows per insert statement',
+        )
+
     def handle(self, *args, **kwargs):
+        if kwargs['users'] < 1 and kwargs['posts'] > 0:
+            raise CommandError('Posts need at least one user')
+
         self.stdout.write('Starting seed data generation...\n')
 
-        # Create base data
-        users = self.create_users(count=50)
-        topics = self.create_topics()
-        posts = self.create_posts(users, topics, count=100)
-        self.create_comments(users, posts, count=200)
+        _context.update(
+            seed=kwargs['seed'],
+            posts=kwargs['posts'],
+            comments=kwargs['comments'],
+            votes=kwargs['votes'],
+            saves=kwargs['saves'],
+            days=kwargs['days'],
+            batch_size=kwargs['batch_size'],
+            password=make_password('testpass123'),
+            post_image_ratio=0.3,
+            comment_image_ratio=0.2,
+            reply_ratio=0.4,
+            now=timezone.now(),
+        )
+        workers: int = kwargs['workers']
+        chunk_size: int = kwargs['chunk_size']
+
+        _context['user_offset'] = User.objects.count()
+
+        self.run(
+            seed_users,
+            split(kwargs['users'], chunk_size),
+            workers,
+            'Creating users'
+        )
+
+        _context['post_offset'] = Post.objects.count()
+        _context['images'] = self.create_images(kwargs['images'])
+        _context['topic_ids'] = [topic.pk for topic in self.create_topics()]
+        _context['user_ids'] = list(
+            User.objects.order_by('pk').values_list('pk', flat=True)
+        )
+
+        topic_counts = Counter()
+        for counts in self.run(
+            seed_posts,
+            split(kwargs['posts'], chunk_size),
+            workers,
+            'Creating posts'
+        ):
+            topic_counts.update(counts)
+
+        topics = list(Topic.objects.filter(pk__in=topic_counts))
+        for topic in topics:
+            topic.post_count += topic_counts[topic.pk]
+        Topic.objects.bulk_update(topics, ['post_count'])
+
+        cache.invalidate(feed=True)
 
         self.stdout.write('\n' + self.style.SUCCESS(
             f'Successfully created:'
-            f'\n- {len(users)} users'
-            f'\n- {len(topics)} topics'
-            f'\n- {len(posts)} posts'
-            f'\n- 200 comments'
+            f'\n- {kwargs["users"]} users'
+            f'\n- {len(_context["topic_ids"])} topics'
+            f'\n- {kwargs["posts"]} posts'
+            f'\n- {kwargs["comments"]} comments'
+            f'\n- up to {kwargs["votes"]} votes'
+            f'\n- up to {kwargs["saves"]} saves'
         ))
+
+    def run(
+        self,
+        function,
+        chunks: List[Tuple[int, int, int]],
+        workers: int,
+        description: str
+    ) -> List[Any]:
+        """
+        Run a seeding function over chunks, in parallel worker processes
+        when there is more than one worker and chunk.
+
+        Args:
+            function: Function seeding a chunk
+            chunks: Chunks to seed
+            workers: Number of worker processes
+            description: Progress bar description
+
+        Returns:
+            list: Results of each chunk
+        """
+        progress = tqdm(total=len(chunks), desc=description, unit='chunk')
+
+        if workers < 2 or len(chunks) < 2:
+            results = []
+            for chunk in chunks:
+                results.append(function(chunk))
+                progress.update()
+            progress.close()
+            return results
+
+        # Forked workers must not share the parent's connections
+        connections.close_all()
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=close_connections
+        ) as executor:
+            results = []
+            for result in executor.map(function, chunks):
+                results.append(result)
+                progress.update()
+
+        progress.close()
+        return results
+
+    def create_topics(self) -> List[Topic]:
+        """Create the fixed set of topics"""
+        return [
+            Topic.objects.get_or_create(name=topic_name)[0]
+            for topic_name in TOPIC_NAMES
+        ]
+
+    def create_images(self, count: int) -> List[bytes]:
+        """
+        Generate placeholder images locally, stored by the workers as
+        a copy for each post or comment with an image.
+
+        Args:
+            count: Number of images to generate
+
+        Returns:
+            list: Encoded JPEG images
+        """
+        rng = random.Random(_context['seed'])
+        images = []
+
+        for _ in tqdm(range(count), desc='Creating images', unit='image'):
+            width, height = rng.randint(400, 800), rng.randint(400, 800)
+            color = tuple(rng.randrange(256) for _ in range(3))
+
+            image = Image.new('RGB', (width, height), color)
+            ImageDraw.Draw(image).text(
+                (width // 2, height // 2),
+                f'{width}x{height}',
+                fill=(255, 255, 255),
+                anchor='mm'
+            )
+
+            content = io.BytesIO()
+            image.save(content, format='JPEG', quality=80)
+            images.append(content.getvalue())
+
+        return images
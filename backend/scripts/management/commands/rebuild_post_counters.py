@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from posts.models import Post
+from posts import cache
+from tqdm import tqdm
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the denormalized vote and comment counters of posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of posts updated per transaction',
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size: int = kwargs['batch_size']
+        post_ids = list(
+            Post.objects.order_by('pk').values_list('pk', flat=True)
+        )
+
+        for start in tqdm(
+            range(0, len(post_ids), batch_size),
+            desc="Rebuilding counters",
+            unit="batch"
+        ):
+            batch = post_ids[start:start + batch_size]
+
+            with transaction.atomic():
+                posts = Post.objects.filter(pk__in=batch)
+                posts.rebuild_counters()
+                posts.refresh_scores()
+
+        cache.invalidate(feed=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully rebuilt counters for {len(post_ids)} posts'
+        ))
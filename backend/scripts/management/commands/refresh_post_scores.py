@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from posts.models import Post
+from posts import cache
+from datetime import timedelta
+from tqdm import tqdm
+
+
+class Command(BaseCommand):
+    help = 'Refreshes the stored hot and top ranking scores of posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Only refresh posts created in the last N days',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of posts updated per transaction',
+        )
+
+    def handle(self, *args, **kwargs):
+        days: int | None = kwargs['days']
+        batch_size: int = kwargs['batch_size']
+
+        posts = Post.objects.order_by('pk')
+        if days is not None:
+            posts = posts.filter(
+                created_at__gte=timezone.now() - timedelta(days=days)
+            )
+
+        post_ids = list(posts.values_list('pk', flat=True))
+
+        for start in tqdm(
+            range(0, len(post_ids), batch_size),
+            desc="Refreshing scores",
+            unit="batch"
+        ):
+            batch = post_ids[start:start + batch_size]
+
+            with transaction.atomic():
+                Post.objects.filter(pk__in=batch).refresh_scores()
+
+        cache.invalidate(feed=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully refreshed scores for {len(post_ids)} posts'
+        ))